@@ -0,0 +1,96 @@
+# benchmarks/bench_domains.py
+"""
+Simulated run time of a send with a per-domain cooldown: sheet order with the
+cooldown sleeping inline (the old behaviour) versus rejections_core.schedule_by_domain.
+Time is simulated, so the benchmark finishes instantly whatever the settings.
+
+    python benchmarks/bench_domains.py
+    python benchmarks/bench_domains.py --rows 5000 --cooldown 10 --rate 1 --lookahead 200
+"""
+
+import argparse
+import random
+import sys
+from collections import Counter
+from pathlib import Path
+from typing import Callable, Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rejections_core import DomainCooldown, recipient_domain, schedule_by_domain  # noqa: E402
+
+
+def consumer_mix(rows: int, rnd: random.Random) -> List[str]:
+    """Mostly webmail: 60% gmail, 15% outlook, 10% yahoo, 5% icloud, 10% long tail."""
+    big = [("gmail.com", 60), ("outlook.com", 15), ("yahoo.com", 10), ("icloud.com", 5)]
+    domains = [d for d, _ in big] + [f"tail{i}.org" for i in range(200)]
+    weights = [w for _, w in big] + [10 / 200] * 200
+    return rnd.choices(domains, weights, k=rows)
+
+
+def corporate_zipf(rows: int, rnd: random.Random) -> List[str]:
+    """Referrals/agency pipelines: 300 company domains with Zipf-like popularity."""
+    domains = [f"company{i}.com" for i in range(300)]
+    return rnd.choices(domains, [1 / (i + 1) for i in range(300)], k=rows)
+
+
+DISTRIBUTIONS: Dict[str, Callable[[int, random.Random], List[str]]] = {
+    "consumer": consumer_mix,
+    "consumer-sorted": lambda n, rnd: sorted(consumer_mix(n, rnd)),  # sheet sorted by email
+    "corporate": corporate_zipf,
+}
+
+
+class SimClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+def simulate(addresses: List[str], *, cooldown: float, rate: float, send_secs: float,
+             lookahead: int, scheduled: bool) -> float:
+    """Simulated seconds for a sequential run over `addresses`."""
+    clock = SimClock()
+    gap = DomainCooldown(cooldown, clock=clock)
+    order = (schedule_by_domain(addresses, cooldown, address=lambda a: a, lookahead=lookahead, clock=clock)
+             if scheduled else addresses)
+    next_token = 0.0
+    for addr in order:
+        clock.now += gap.reserve(addr)                 # domain cooldown (sleep)
+        clock.now = max(clock.now, next_token)         # token bucket at `rate`
+        next_token = clock.now + (1 / rate if rate else 0.0)
+        clock.now += send_secs                         # Gmail round trip
+    return clock.now
+
+
+def lower_bound(addresses: List[str], *, cooldown: float, rate: float, send_secs: float) -> float:
+    busiest = max(Counter(recipient_domain(a) for a in addresses).values())
+    pace = max(1 / rate if rate else 0.0, send_secs)
+    return max((len(addresses) - 1) * pace, (busiest - 1) * cooldown) + send_secs
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=2000)
+    ap.add_argument("--cooldown", type=float, default=5.0, help="seconds between sends to one domain")
+    ap.add_argument("--rate", type=float, default=2.0, help="overall messages/sec (0 = unlimited)")
+    ap.add_argument("--send-secs", type=float, default=0.25, help="simulated Gmail latency")
+    ap.add_argument("--lookahead", type=int, default=500)
+    ap.add_argument("--seed", type=int, default=7)
+    args = ap.parse_args()
+
+    print(f"{args.rows} rows · cooldown {args.cooldown:g}s · rate {args.rate:g}/s · "
+          f"send {args.send_secs:g}s · lookahead {args.lookahead}")
+    print(f"{'distribution':<16} {'sheet order':>12} {'scheduled':>10} {'lower bound':>12} {'speedup':>8}")
+    for name, make in DISTRIBUTIONS.items():
+        addresses = [f"user{i}@{d}" for i, d in enumerate(make(args.rows, random.Random(args.seed)))]
+        kw = dict(cooldown=args.cooldown, rate=args.rate, send_secs=args.send_secs)
+        fifo = simulate(addresses, lookahead=args.lookahead, scheduled=False, **kw)
+        sched = simulate(addresses, lookahead=args.lookahead, scheduled=True, **kw)
+        bound = lower_bound(addresses, **kw)
+        print(f"{name:<16} {fifo:>11.0f}s {sched:>9.0f}s {bound:>11.0f}s {fifo / sched:>7.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,102 @@
+# benchmarks/bench_mime.py
+"""
+Bytes allocated and time per message: the previous email-package MIME tree
+(MIMEMultipart + as_bytes) versus rejections_core.build_mime, and the media-upload
+path (build_message, no base64url) used for large messages.
+
+    python benchmarks/bench_mime.py                      # no attachment, 100 KB, 1 MB, 5 MB
+    python benchmarks/bench_mime.py --sizes 0,2000000 --messages 50
+"""
+
+import argparse
+import base64
+import gc
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+from email.mime.base import MIMEBase
+from email.mime.multipart import MIMEMultipart
+from email.mime.text import MIMEText
+from email.utils import formatdate, make_msgid
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from rejections_core import build_message, build_mime  # noqa: E402
+
+_legacy_parts = {}
+
+
+def legacy_build_mime(sender, to, subject, text, html=None, attachments=()):
+    """The previous build_mime, including its cached, pre-encoded attachment part."""
+    msg = MIMEMultipart("mixed")
+    alt = MIMEMultipart("alternative")
+    alt.attach(MIMEText(text, "plain"))
+    if html:
+        alt.attach(MIMEText(html, "html"))
+    msg.attach(alt)
+    msg["From"] = sender
+    msg["To"] = to
+    msg["Subject"] = subject
+    msg["Date"] = formatdate(localtime=True)
+    msg["Message-ID"] = make_msgid()
+    for a in attachments:
+        part = _legacy_parts.get(a)
+        if part is None:
+            part = MIMEBase("application", "pdf")
+            part.set_payload(base64.encodebytes(Path(a).read_bytes()).decode("ascii"))
+            part["Content-Transfer-Encoding"] = "base64"
+            part.add_header("Content-Disposition", f'attachment; filename="{Path(a).name}"')
+            _legacy_parts[a] = part
+        msg.attach(part)
+    return {"raw": base64.urlsafe_b64encode(msg.as_bytes()).decode()}
+
+
+def measure(build, messages: int):
+    """(peak bytes for one message, mean seconds per message)."""
+    build()  # warm caches (attachment encoding happens once per run either way)
+    gc.collect()
+    tracemalloc.start()
+    build()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    t0 = time.perf_counter()
+    for _ in range(messages):
+        build()
+    return peak, (time.perf_counter() - t0) / messages
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--sizes", default="0,100000,1000000,5000000", help="attachment sizes in bytes (0 = none)")
+    ap.add_argument("--messages", type=int, default=20, help="messages per timing run")
+    args = ap.parse_args()
+
+    text = (ROOT / "EXAMPLE_TEMPLATE.txt").read_text(encoding="utf-8")
+    html = (ROOT / "EXAMPLE_TEMPLATE.html").read_text(encoding="utf-8")
+    common = dict(sender="Recruiting <jobs@example.com>", to="candidate@example.org",
+                  subject="Update on your application", text=text, html=html)
+
+    print(f"{'attachment':>10} {'builder':<16} {'peak KiB/msg':>13} {'x message':>10} {'ms/msg':>8}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in (int(x) for x in args.sizes.split(",")):
+            attachments = []
+            if size:
+                path = Path(tmp) / f"offer_{size}.pdf"
+                path.write_bytes(os.urandom(size))
+                attachments = [str(path)]
+            message_len = len(build_message(**common, attachments=attachments))
+            builders = (
+                ("email package", lambda: legacy_build_mime(**common, attachments=attachments)),
+                ("build_mime", lambda: build_mime(**common, attachments=attachments)),
+                ("media upload", lambda: build_message(**common, attachments=attachments)),
+            )
+            for label, build in builders:
+                peak, secs = measure(build, args.messages)
+                print(f"{size:>10} {label:<16} {peak / 1024:>13.0f} {peak / message_len:>9.1f}x {secs * 1000:>8.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,348 @@
+# benchmarks/bench_pipeline.py
+"""
+Full-pipeline benchmark over the in-memory fakes in rejections_fakes: synthetic
+applicant sheets are read, turned into records, filtered, rendered, built into
+messages, "sent" and marked sent, and each stage reports rows/sec, p50/p99 per-row
+latency and peak RSS. An end-to-end run_sender pass over the same sheet follows.
+
+Each row count runs in a fresh process so RSS figures don't carry over. read,
+to_records and filter are timed per page and spread evenly over its rows; the other
+stages are timed per row (per batch with --batch-size). Injected 429s/500s go through
+the real retry path, so their backoff shows up in the send/write_status latencies.
+
+    python benchmarks/bench_pipeline.py                          # 1k, 10k, 100k rows
+    python benchmarks/bench_pipeline.py --rows 500000 --json after.json --compare before.json
+    python benchmarks/bench_pipeline.py --rows 10000 --gmail-latency 0.002 --rate-limit-rate 0.001 --retry-after 0
+"""
+
+import argparse
+import itertools
+import json
+import multiprocessing
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import rejections_core as rc  # noqa: E402
+from rejections_fakes import FakeGmailService, FakeSheetsService, Faults, synthetic_sheet  # noqa: E402
+
+STAGES = ("read", "to_records", "filter", "render", "build_mime", "send", "write_status")
+SHEET_ID = "bench-spreadsheet"
+TAB = "Applicants"
+
+
+def rss_bytes() -> int:
+    """Current resident set size (Linux), else the peak so far from getrusage."""
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except OSError:
+        import resource
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+        return peak if sys.platform == "darwin" else peak * 1024
+
+
+class Stage:
+    def __init__(self):
+        self.rows = 0
+        self.seconds = 0.0
+        self.latencies = array("d")
+        self.peak_rss = 0
+
+    def add(self, seconds: float, rows: int = 1):
+        self.rows += rows
+        self.seconds += seconds
+        if rows == 1:
+            self.latencies.append(seconds)
+        elif rows:
+            self.latencies.extend(itertools.repeat(seconds / rows, rows))
+
+    def sample(self):
+        self.peak_rss = max(self.peak_rss, rss_bytes())
+
+    def result(self) -> dict:
+        lat = sorted(self.latencies)
+
+        def pct(p: float) -> float:
+            return lat[min(len(lat) - 1, int(p * len(lat)))] * 1000 if lat else 0.0
+
+        return {"rows": self.rows, "seconds": round(self.seconds, 4),
+                "rows_per_sec": round(self.rows / self.seconds, 1) if self.seconds else None,
+                "p50_ms": round(pct(0.50), 4), "p99_ms": round(pct(0.99), 4),
+                "peak_rss_mb": round(self.peak_rss / 2**20, 1)}
+
+
+def make_fakes(values, params: dict):
+    def faults(latency: float, seed: int) -> Faults:
+        return Faults(latency=latency, jitter=params["jitter"], error_rate=params["error_rate"],
+                      rate_limit_rate=params["rate_limit_rate"], retry_after=params["retry_after"], seed=seed)
+    return (FakeSheetsService(values, TAB, faults(params["sheets_latency"], params["seed"])),
+            FakeGmailService(faults(params["gmail_latency"], params["seed"] + 1)))
+
+
+def make_config(params: dict, attachments, ledger: str) -> dict:
+    return {
+        "credentials": "credentials.json", "token": "token.json",
+        "spreadsheet_id": SHEET_ID, "tab": TAB, "read_range": "A:Z",
+        "sender": "Recruiting <jobs@example.com>", "reply_to": "", "cc": "", "bcc": "",
+        "subject": "Update on your {{ role }} application",
+        "text_template": str(ROOT / "EXAMPLE_TEMPLATE.txt"), "html_template": str(ROOT / "EXAMPLE_TEMPLATE.html"),
+        "attachments": attachments, "dry_run": False, "test_to_self": False, "preview_n": 0,
+        "throttle": 0, "rate": 0, "domain_throttle": 0, "ledger": ledger,
+        "page_rows": params["page_rows"], "batch_size": params["batch_size"], "workers": params["workers"],
+        "render_processes": params["render_processes"], "render_cache_size": params["render_cache"],
+        "status_flush_rows": params["flush_rows"],
+    }
+
+
+def measure_stages(values, config: dict, params: dict) -> dict:
+    """Run the pipeline page by page, one stage at a time over each page."""
+    ssvc, gsvc = make_fakes(values, params)
+    stats = {name: Stage() for name in STAGES}
+    rc.RETRY_STATS.reset()
+
+    t0 = time.perf_counter()
+    headers, header_row = rc.read_header_row(ssvc, SHEET_ID, TAB, config["read_range"])
+    stats["read"].add(time.perf_counter() - t0, 0)
+    hdr_index = {h.lower(): i for i, h in enumerate(headers)}
+    screen = rc.RowScreen(hdr_index, dedupe="sheet")
+    templates = rc.TemplateSet(config["subject"], config["text_template"], config["html_template"],
+                               config["render_cache_size"])
+    pages = rc.iter_sheet_pages(ssvc, SHEET_ID, TAB, config["read_range"], start_row=header_row + 1,
+                                page_rows=config["page_rows"], prefetch=False)
+    status = rc.StatusWriter(ssvc, SHEET_ID, TAB, hdr_index["sent_status"], hdr_index["sent_at"],
+                             flush_rows=config["status_flush_rows"], flush_secs=3600)
+    batch = max(1, min(config["batch_size"], rc.GMAIL_BATCH_LIMIT))
+    clock = time.perf_counter
+
+    while True:
+        t0 = clock()
+        page = next(pages, None)
+        if page is None:
+            break
+        first_row, rows = page
+        stats["read"].add(clock() - t0, len(rows))
+        stats["read"].sample()
+
+        t0 = clock()
+        offsets = screen.page(rows, first_row)
+        stats["filter"].add(clock() - t0, len(rows))
+        stats["filter"].sample()
+
+        t0 = clock()
+        eligible = rc.records_from_rows(headers, [rows[k] for k in offsets], first_row,
+                                        row_numbers=[first_row + k for k in offsets])
+        stats["to_records"].add(clock() - t0, len(eligible))
+        stats["to_records"].sample()
+
+        rendered = []
+        it = rc.render_rows(eligible, templates, config, processes=config["render_processes"])
+        while True:
+            t0 = clock()
+            item = next(it, None)
+            if item is None:
+                break
+            stats["render"].add(clock() - t0)
+            if item[1] is not None:
+                rendered.append(item)
+        stats["render"].sample()
+
+        bodies = []
+        for rec, fields, _ in rendered:
+            t0 = clock()
+            bodies.append((rec, rc.message_body(fields, config)))
+            stats["build_mime"].add(clock() - t0)
+        stats["build_mime"].sample()
+        del rendered
+
+        sent = []
+        for k in range(0, len(bodies), batch):
+            chunk = bodies[k:k + batch]
+            t0 = clock()
+            if batch > 1:
+                results = rc.send_gmail_batch(gsvc, [(rec, body) for rec, body in chunk])
+                sent.extend(rec for rec, _, err in results if err is None)
+            else:
+                try:
+                    rc.send_gmail(gsvc, chunk[0][1])
+                    sent.append(chunk[0][0])
+                except Exception:
+                    pass
+            stats["send"].add(clock() - t0, len(chunk))
+        stats["send"].sample()
+        del bodies
+
+        for rec in sent:
+            t0 = clock()
+            status.add(rec["_row_number"])
+            stats["write_status"].add(clock() - t0)
+        stats["write_status"].sample()
+
+    t0 = clock()
+    status.flush()
+    stats["write_status"].seconds += clock() - t0
+    return {"stages": {name: s.result() for name, s in stats.items()},
+            "sent": gsvc.sent, "sheet_reads": ssvc.reads, "sheet_writes": ssvc.writes,
+            "injected": {"sheets": ssvc.faults.injected, "gmail": gsvc.faults.injected},
+            "retries": rc.RETRY_STATS.snapshot()}
+
+
+class _CountingLog:
+    def __init__(self):
+        self.lines = 0
+        self.fatal = None
+
+    def put(self, msg: str):
+        self.lines += 1
+        if msg.startswith("FATAL"):
+            self.fatal = msg
+
+
+def measure_end_to_end(values, config: dict, params: dict) -> dict:
+    """rejections_core.run_sender over the fakes: prefetch, ledger, logging and all."""
+    ssvc, gsvc = make_fakes(values, params)
+    rc.load_creds = lambda *a, **k: None
+    rc.sheets_service = lambda creds: ssvc
+    rc.gmail_service = lambda creds: gsvc
+    logq = _CountingLog()
+    before = rss_bytes()
+    t0 = time.perf_counter()
+    rc.run_sender(config, logq, threading.Event())
+    elapsed = time.perf_counter() - t0
+    if logq.fatal:
+        raise RuntimeError(logq.fatal)
+    import resource
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak if sys.platform == "darwin" else peak * 1024
+    return {"rows": len(values) - 1, "sent": gsvc.sent, "seconds": round(elapsed, 4),
+            "rows_per_sec": round((len(values) - 1) / elapsed, 1),
+            "sent_per_sec": round(gsvc.sent / elapsed, 1),
+            "start_rss_mb": round(before / 2**20, 1), "peak_rss_mb": round(peak / 2**20, 1),
+            "log_lines": logq.lines, "retries": rc.RETRY_STATS.snapshot()}
+
+
+def run_size(rows: int, params: dict) -> dict:
+    """One row count, in its own process (see main)."""
+    t0 = time.perf_counter()
+    values = synthetic_sheet(rows, cols=params["cols"], seed=params["seed"])
+    out = {"rows": rows, "generate_seconds": round(time.perf_counter() - t0, 2),
+           "sheet_rss_mb": round(rss_bytes() / 2**20, 1)}
+    with tempfile.TemporaryDirectory() as tmp:
+        attachments = []
+        if params["attachment_kb"]:
+            path = Path(tmp) / "attachment.pdf"
+            path.write_bytes(os.urandom(params["attachment_kb"] * 1024))
+            attachments = [str(path)]
+        out.update(measure_stages(values, make_config(params, attachments, str(Path(tmp) / "ledger.db")), params))
+        if params["end_to_end"]:
+            out["end_to_end"] = measure_end_to_end(
+                values, make_config(params, attachments, str(Path(tmp) / "ledger_e2e.db")), params)
+    return out
+
+
+def git_version() -> str | None:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def print_result(res: dict):
+    retries = res["retries"]
+    print(f"\n{res['rows']} rows · sheet {res['sheet_rss_mb']} MiB RSS · sent {res['sent']} · "
+          f"{res['sheet_reads']} read(s), {res['sheet_writes']} write(s) · "
+          f"{retries['retries']} retries, {retries['wait_seconds']:.1f}s waited")
+    print(f"{'stage':<13} {'rows':>8} {'secs':>8} {'rows/sec':>11} {'p50 ms':>9} {'p99 ms':>9} {'peak RSS MiB':>13}")
+    for name, s in res["stages"].items():
+        rate = f"{s['rows_per_sec']:>11.0f}" if s["rows_per_sec"] else f"{'-':>11}"
+        print(f"{name:<13} {s['rows']:>8} {s['seconds']:>8.2f} {rate} {s['p50_ms']:>9.3f} {s['p99_ms']:>9.3f} "
+              f"{s['peak_rss_mb']:>13.1f}")
+    e2e = res.get("end_to_end")
+    if e2e:
+        print(f"{'run_sender':<13} {e2e['rows']:>8} {e2e['seconds']:>8.2f} {e2e['rows_per_sec']:>11.0f} "
+              f"{'':>9} {'':>9} {e2e['peak_rss_mb']:>13.1f}   ({e2e['sent_per_sec']:.0f} sent/sec)")
+
+
+def compare(results: list, baseline_path: str):
+    """Print rows/sec and peak RSS against an earlier --json file, matching on row count."""
+    old = {r["rows"]: r for r in json.loads(Path(baseline_path).read_text(encoding="utf-8"))["results"]}
+    if not any(r["rows"] in old for r in results):
+        print(f"\n{baseline_path} has no results for these row counts.")
+        return
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'rows':>8} {'stage':<13} {'rows/sec':>11} {'before':>11} {'change':>8} {'RSS MiB':>8} {'before':>8}")
+    for res in results:
+        prev = old.get(res["rows"])
+        if not prev:
+            continue
+        pairs = [(n, s, prev["stages"].get(n)) for n, s in res["stages"].items()]
+        if "end_to_end" in res and "end_to_end" in prev:
+            pairs.append(("run_sender", res["end_to_end"], prev["end_to_end"]))
+        for name, new, before in pairs:
+            if not before or not new["rows_per_sec"] or not before["rows_per_sec"]:
+                continue
+            change = new["rows_per_sec"] / before["rows_per_sec"] - 1
+            print(f"{res['rows']:>8} {name:<13} {new['rows_per_sec']:>11.0f} {before['rows_per_sec']:>11.0f} "
+                  f"{change:>+7.0%} {new['peak_rss_mb']:>8.1f} {before['peak_rss_mb']:>8.1f}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", default="1000,10000,100000", help="comma-separated row counts (1k-500k)")
+    ap.add_argument("--cols", type=int, default=26)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--page-rows", type=int, default=rc.DEFAULT_PAGE_ROWS)
+    ap.add_argument("--batch-size", type=int, default=0, help="send through Gmail batch requests of this size")
+    ap.add_argument("--workers", type=int, default=1, help="sender threads for the run_sender pass")
+    ap.add_argument("--render-processes", type=int, default=0)
+    ap.add_argument("--render-cache", type=int, default=1024)
+    ap.add_argument("--flush-rows", type=int, default=50, help="rows per sent_status write-back")
+    ap.add_argument("--attachment-kb", type=int, default=0, help="attach a file of this size to every message")
+    ap.add_argument("--sheets-latency", type=float, default=0.0, help="seconds per Sheets call")
+    ap.add_argument("--gmail-latency", type=float, default=0.0, help="seconds per Gmail call or batch")
+    ap.add_argument("--jitter", type=float, default=0.0, help="extra random latency, up to this many seconds")
+    ap.add_argument("--error-rate", type=float, default=0.0, help="share of calls failing with a 500")
+    ap.add_argument("--rate-limit-rate", type=float, default=0.0, help="share of calls failing with a 429")
+    ap.add_argument("--retry-after", type=float, default=None, help="Retry-After seconds on injected 429s")
+    ap.add_argument("--no-end-to-end", dest="end_to_end", action="store_false",
+                    help="skip the run_sender pass")
+    ap.add_argument("--json", help="write results here")
+    ap.add_argument("--compare", help="earlier --json output to compare against")
+    args = ap.parse_args()
+
+    params = {k: v for k, v in vars(args).items() if k not in ("rows", "json", "compare")}
+    sizes = [int(float(x)) for x in args.rows.split(",")]
+    print(f"{os.cpu_count()} CPU(s) · page {args.page_rows} · batch {args.batch_size or '-'} · "
+          f"latency sheets {args.sheets_latency:g}s / gmail {args.gmail_latency:g}s · "
+          f"errors {args.error_rate:g} · 429s {args.rate_limit_rate:g}")
+    results = []
+    spawn = multiprocessing.get_context("spawn")
+    for n in sizes:
+        with ProcessPoolExecutor(1, mp_context=spawn) as pool:  # fresh process: clean RSS per size
+            res = pool.submit(run_size, n, params).result()
+        print_result(res)
+        results.append(res)
+
+    if args.json:
+        doc = {"version": git_version(), "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+               "python": platform.python_version(), "platform": platform.platform(),
+               "cpus": os.cpu_count(), "params": params, "results": results}
+        Path(args.json).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+    if args.compare:
+        compare(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
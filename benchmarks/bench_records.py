@@ -0,0 +1,82 @@
+# benchmarks/bench_records.py
+"""
+Memory benchmark: compact Record rows (rejections_core.to_records) versus the
+previous dict-of-strings representation.
+
+    python benchmarks/bench_records.py                  # 10k, 100k, 500k rows
+    python benchmarks/bench_records.py --rows 10000,50000 --cols 26
+"""
+
+import argparse
+import gc
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Dict, List
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+from rejections_core import get_headers_index, to_records  # noqa: E402
+
+BASE_HEADERS = ["email", "name", "role", "company", "stage", "reason", "application_date",
+                "send", "skip", "sent_status", "sent_at"]
+
+
+def synthetic_values(rows: int, cols: int) -> List[List[str]]:
+    """Header + rows; per-person cells are unique strings, the rest are shared like real exports."""
+    headers = (BASE_HEADERS + [f"extra_{i}" for i in range(max(0, cols - len(BASE_HEADERS)))])[:cols]
+    filler = "Lorem ipsum dolor sit amet, consectetur adipiscing elit."
+    values = [headers]
+    for r in range(rows):
+        row = [f"candidate{r}@example{r % 50}.com", f"Candidate {r}", "Backend Engineer", "Acme",
+               "onsite", "", "2025-08-01", "yes", "", "", ""]
+        row += [filler] * (cols - len(row))
+        values.append(row[:cols])
+    return values
+
+
+def dict_records(values: List[List[str]]) -> List[Dict[str, str]]:
+    """The previous to_records representation: one full dict per row."""
+    headers, idx = get_headers_index(values)
+    headers_lc = [h.lower() for h in headers]
+    rows = []
+    for r, row in enumerate(values[1:], start=2):
+        rec = {h: (row[idx[h]].strip() if idx[h] < len(row) else "") for h in headers_lc}
+        rec["_row_number"] = r
+        rows.append(rec)
+    return rows
+
+
+def measure(build, values):
+    """(retained bytes, peak bytes, seconds); timing is a separate untraced build."""
+    gc.collect()
+    t0 = time.perf_counter()
+    result = build(values)
+    elapsed = time.perf_counter() - t0
+    del result
+    gc.collect()
+    tracemalloc.start()
+    result = build(values)
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    del result
+    return current, peak, elapsed
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", default="10000,100000,500000", help="comma-separated row counts")
+    ap.add_argument("--cols", type=int, default=26, help="columns per row (default A:Z)")
+    args = ap.parse_args()
+
+    print(f"{'rows':>8} {'repr':<7} {'retained MiB':>13} {'peak MiB':>9} {'B/row':>7} {'secs':>6}")
+    for n in (int(x) for x in args.rows.split(",")):
+        values = synthetic_values(n, args.cols)
+        for label, build in (("dict", dict_records), ("record", lambda v: to_records(v)[0])):
+            current, peak, elapsed = measure(build, values)
+            print(f"{n:>8} {label:<7} {current / 2**20:>13.1f} {peak / 2**20:>9.1f} {current / n:>7.0f} {elapsed:>6.2f}")
+        del values
+
+
+if __name__ == "__main__":
+    main()
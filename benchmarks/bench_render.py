@@ -0,0 +1,53 @@
+# benchmarks/bench_render.py
+"""
+Template rendering throughput: in-thread rendering versus the process pool of
+rejections_core.render_rows, using the bundled EXAMPLE_TEMPLATE.txt/.html.
+
+    python benchmarks/bench_render.py                     # 20k rows, 1/2/4 processes
+    python benchmarks/bench_render.py --rows 50000 --processes 1,2,4,8 --chunk 128
+"""
+
+import argparse
+import os
+import sys
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+from rejections_core import TemplateSet, records_from_rows, render_rows  # noqa: E402
+
+HEADERS = ["email", "name", "role", "company", "stage", "reason", "application_date", "send"]
+
+
+def synthetic_records(rows: int):
+    data = [[f"candidate{r}@example{r % 50}.com", f"Candidate {r}", "Backend Engineer", "Acme",
+             "onsite", "", "2025-08-01", "yes"] for r in range(rows)]
+    return records_from_rows(HEADERS, data, 2)
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=20000)
+    ap.add_argument("--processes", default="1,2,4", help="comma-separated; 1 = render in this thread")
+    ap.add_argument("--chunk", type=int, default=64, help="rows per chunk sent to a worker")
+    args = ap.parse_args()
+
+    templates = TemplateSet("Update on your {{ role }} application",
+                            str(ROOT / "EXAMPLE_TEMPLATE.txt"), str(ROOT / "EXAMPLE_TEMPLATE.html"))
+    config = {"sender_name": "Recruiting Team", "sender_title": "Talent Acquisition"}
+    records = synthetic_records(args.rows)
+
+    print(f"{args.rows} rows · chunk {args.chunk} · {os.cpu_count()} CPU(s)")
+    print(f"{'processes':>9} {'secs':>7} {'rows/sec':>10} {'speedup':>8}")
+    baseline = None
+    for n in (int(x) for x in args.processes.split(",")):
+        t0 = time.perf_counter()
+        count = sum(1 for _ in render_rows(records, templates, config, processes=n, chunk_size=args.chunk))
+        elapsed = time.perf_counter() - t0
+        baseline = baseline or elapsed
+        print(f"{n:>9} {elapsed:>7.2f} {count / elapsed:>10.0f} {baseline / elapsed:>7.2f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,172 @@
+# benchmarks/bench_screen.py
+"""
+Row screening over synthetic applicant sheets. rejections_core.RowScreen checks the
+gate columns one at a time, validates addresses and catches duplicate recipients,
+and only builds Records for eligible rows. It is timed against the per-row paths:
+a Record for every row then is_eligible (the row filter RowScreen replaced), and the same
+plus address and duplicate checks done row by row.
+
+Pages are screened as run_sender reads them (--page-rows). --sent sets how much of
+the sheet is already sent: a first send (0.05) against a re-run (0.9). --dupes and
+--invalid plant duplicate and malformed addresses. --prior fills a temporary send
+ledger whose email_index (load timed separately) catches rows emailed in an earlier
+run. Timings are the best of --repeat passes.
+
+    python benchmarks/bench_screen.py                        # 100k and 500k rows
+    python benchmarks/bench_screen.py --rows 1000000 --sent 0.5 --prior 200000 --json screen.json
+"""
+
+import argparse
+import json
+import random
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import rejections_core as rc  # noqa: E402
+from rejections_fakes import synthetic_sheet  # noqa: E402
+
+
+def planted_sheet(rows: int, sent: float, params: dict) -> list:
+    """synthetic_sheet with --dupes/--invalid shares of its addresses replaced."""
+    values = synthetic_sheet(rows, cols=params["cols"], seed=params["seed"], sent_share=sent)
+    rnd = random.Random(params["seed"])
+    for row in values[1:]:
+        roll = rnd.random()
+        if roll < params["dupes"]:
+            row[0] = rnd.choice(values[1:])[0].upper()
+        elif roll < params["dupes"] + params["invalid"]:
+            row[0] = row[0].replace("@", " at ")
+    return values
+
+
+def prior_index(values: list, prior: int, seed: int) -> tuple:
+    """(email_index, seconds to load it) from a temporary ledger with `prior` earlier sends."""
+    if not prior:
+        return None, 0.0
+    rnd = random.Random(seed + 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        ledger = rc.SendLedger(Path(tmp) / "ledger.db")
+        picks = rnd.sample(range(1, len(values)), min(prior, len(values) - 1))
+        with ledger._lock, ledger._db:
+            ledger._db.executemany(
+                "INSERT OR REPLACE INTO sends (spreadsheet_id, tab, row_number, email, sent_at, synced)"
+                " VALUES ('S', ?, ?, ?, '2025-09-01T10:00:00+00:00', 1)",
+                [("Other" if n % 2 else "Applicants", n, values[n][0].lower()) for n in picks],
+            )
+        t0 = time.perf_counter()
+        index = ledger.email_index("S", "Applicants", everywhere=True)
+        elapsed = time.perf_counter() - t0
+        ledger.close()
+    return index, elapsed
+
+
+def best_of(repeat: int, run) -> tuple:
+    """`run()` returns (result, seconds); the result of the fastest of `repeat` runs."""
+    return min((run() for _ in range(max(1, repeat))), key=lambda r: r[1])
+
+
+def is_eligible(rec: dict, hdr_index: dict) -> bool:
+    """The old per-Record filter: send==yes if that column exists, skip, sent and required fields."""
+    if rc.is_yes(rec.get("skip", "")):
+        return False
+    if "send" in hdr_index and not rc.is_yes(rec.get("send", "")):
+        return False
+    if rec.get("sent_status", "").strip().lower() == "sent":
+        return False
+    return bool(rec.get("email") and rec.get("name") and rec.get("role") and rec.get("company"))
+
+
+def per_row(values: list, page_rows: int) -> tuple:
+    headers = values[0]
+    hdr_index = {h.lower(): i for i, h in enumerate(headers)}
+    eligible = 0
+    t0 = time.perf_counter()
+    for first in range(1, len(values), page_rows):
+        rows = values[first:first + page_rows]
+        eligible += sum(1 for rec in rc.records_from_rows(headers, rows, first + 1) if is_eligible(rec, hdr_index))
+    return eligible, time.perf_counter() - t0
+
+
+def per_row_checked(values: list, page_rows: int) -> tuple:
+    """per_row plus RowScreen's address and in-sheet duplicate checks, one record at a time."""
+    headers = values[0]
+    hdr_index = {h.lower(): i for i, h in enumerate(headers)}
+    seen = set()
+    eligible = 0
+    t0 = time.perf_counter()
+    for first in range(1, len(values), page_rows):
+        for rec in rc.records_from_rows(headers, values[first:first + page_rows], first + 1):
+            email = rec.get("email", "").lower()
+            if rec.get("sent_status", "").lower() == "sent":
+                seen.add(email)
+            if not is_eligible(rec, hdr_index) or not rc.email_valid(email) or email in seen:
+                continue
+            seen.add(email)
+            eligible += 1
+    return eligible, time.perf_counter() - t0
+
+
+def screened(values: list, page_rows: int, dedupe: str, prior) -> tuple:
+    headers = values[0]
+    screen = rc.RowScreen({h.lower(): i for i, h in enumerate(headers)}, dedupe=dedupe, prior=prior)
+    eligible = 0
+    t0 = time.perf_counter()
+    for first in range(1, len(values), page_rows):
+        eligible += len(screen.records(headers, values[first:first + page_rows], first + 1))
+    return (eligible, screen), time.perf_counter() - t0
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", default="100000,500000", help="comma-separated sheet sizes")
+    ap.add_argument("--sent", default="0.05,0.9", help="comma-separated shares of rows already sent")
+    ap.add_argument("--cols", type=int, default=26)
+    ap.add_argument("--page-rows", type=int, default=rc.DEFAULT_PAGE_ROWS)
+    ap.add_argument("--dupes", type=float, default=0.01, help="share of rows repeating an earlier address")
+    ap.add_argument("--invalid", type=float, default=0.005, help="share of rows with a malformed address")
+    ap.add_argument("--prior", type=int, default=50000, help="earlier sends in the ledger (0 = none)")
+    ap.add_argument("--repeat", type=int, default=3, help="passes per measurement (best is reported)")
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", help="write results here")
+    args = ap.parse_args()
+
+    params = vars(args)
+    print(f"{args.cols} columns · pages of {args.page_rows} · {args.dupes:.1%} duplicates · "
+          f"{args.invalid:.1%} invalid · {args.prior} earlier sends · best of {args.repeat}")
+    print(f"{'rows':>8} {'sent':>5} {'per-row':>8} {'+checks':>8} {'screen':>7} {'vs per-row':>11} "
+          f"{'vs +checks':>11} {'+prior':>7} {'index':>6} {'eligible':>9} {'invalid':>8} {'dupes':>6} {'earlier':>8}")
+    results = []
+    for n in (int(x) for x in args.rows.split(",")):
+        for sent in (float(x) for x in args.sent.split(",")):
+            values = planted_sheet(n, sent, params)
+            prior, index_secs = prior_index(values, args.prior, args.seed)
+            old_eligible, old_secs = best_of(args.repeat, lambda: per_row(values, args.page_rows))
+            _, checked_secs = best_of(args.repeat, lambda: per_row_checked(values, args.page_rows))
+            _, sheet_secs = best_of(args.repeat, lambda: screened(values, args.page_rows, "sheet", None))
+            (new_eligible, screen), new_secs = best_of(
+                args.repeat, lambda: screened(values, args.page_rows, "all" if prior else "sheet", prior))
+            c = screen.counts
+            res = {"rows": n, "sent_share": sent, "per_row_seconds": round(old_secs, 3),
+                   "per_row_checked_seconds": round(checked_secs, 3), "screen_seconds": round(sheet_secs, 3),
+                   "screen_prior_seconds": round(new_secs, 3), "index_seconds": round(index_secs, 3),
+                   "speedup": round(old_secs / sheet_secs, 2), "speedup_checked": round(checked_secs / sheet_secs, 2),
+                   "eligible_per_row": old_eligible, "eligible": new_eligible, "rejected": dict(c),
+                   # rows the per-row filter would have sent that screening holds back
+                   "consistent": old_eligible == new_eligible + c["invalid"] + c["duplicate"] + c["sent_before"]}
+            print(f"{n:>8} {sent:>5.0%} {old_secs:>8.2f} {checked_secs:>8.2f} {sheet_secs:>7.2f} "
+                  f"{res['speedup']:>10.1f}x {res['speedup_checked']:>10.1f}x {new_secs:>7.2f} {index_secs:>6.2f} "
+                  f"{new_eligible:>9} {c['invalid']:>8} {c['duplicate']:>6} {c['sent_before']:>8}"
+                  f"{'' if res['consistent'] else '  (counts disagree!)'}")
+            results.append(res)
+    print("Times in seconds. +prior also checks the earlier sends in the ledger; index is loading them.")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"params": params, "results": results}, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
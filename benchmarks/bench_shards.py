@@ -0,0 +1,125 @@
+# benchmarks/bench_shards.py
+"""
+Multi-account sending over the in-memory Gmail fakes: the same rows are sent through
+rejections_core.send_sharded from 1, 2, 4… accounts, each paced at --rate msgs/sec
+with --gmail-latency per call, and the table shows throughput, how rows were split
+and whether every row was sent exactly once. Accounts can be given a --daily-limit,
+so quota exhaustion and the moving of queued rows to other accounts can be exercised
+offline. --rates gives the accounts different paces (e.g. 2,1,1) to check that the
+split follows them.
+
+    python benchmarks/bench_shards.py
+    python benchmarks/bench_shards.py --rows 2000 --accounts 1,2,4,8 --rate 50 --gmail-latency 0.01
+    python benchmarks/bench_shards.py --rows 600 --accounts 3 --daily-limit 150 --rates 3,2,1
+"""
+
+import argparse
+import collections
+import json
+import sys
+import threading
+import time
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(ROOT))
+import rejections_core as rc  # noqa: E402
+from rejections_fakes import FakeGmailService, Faults, synthetic_sheet  # noqa: E402
+
+CONFIG = {
+    "sender": "Recruiting <jobs@example.com>", "reply_to": "", "cc": "", "bcc": "", "attachments": [],
+    "subject": "Update on your {{ role }} application",
+    "text_template": str(ROOT / "EXAMPLE_TEMPLATE.txt"), "html_template": str(ROOT / "EXAMPLE_TEMPLATE.html"),
+}
+
+
+def prepared_rows(rows: int, seed: int) -> list:
+    """(rec, to_addr, fields) for every eligible synthetic row, rendered up front."""
+    records, _ = rc.to_records(synthetic_sheet(rows, seed=seed, sent_share=0, skip_share=0, no_share=0))
+    templates = rc.TemplateSet(CONFIG["subject"], CONFIG["text_template"], CONFIG["html_template"], 1024)
+    items = []
+    for rec in records:
+        fields = rc.render_row(rec, templates, CONFIG)
+        if fields:
+            items.append((rec, fields["to"], fields))
+    return items
+
+
+def run_accounts(items: list, rates: list, params: dict) -> dict:
+    fakes = [FakeGmailService(Faults(latency=params["gmail_latency"], jitter=params["jitter"], seed=params["seed"] + n),
+                              address=f"sender{n + 1}@example.com", daily_limit=params["daily_limit"])
+             for n in range(len(rates))]
+    shards = [rc.SenderShard(g.address, f"token{n + 1}.json", rc.TokenBucket(rate, params["burst"]),
+                             params["daily_limit"], gsvc=g) for n, (g, rate) in enumerate(zip(fakes, rates))]
+    sched = rc.ShardScheduler(shards)
+    marked = collections.Counter()
+    by_sender = collections.Counter()
+    lock = threading.Lock()
+
+    def mark_sent(rec, address: str):
+        with lock:
+            marked[rec["_row_number"]] += 1
+            by_sender[address] += 1
+
+    log_lines = []
+    rc.RETRY_STATS.reset()
+    rc.METRICS.reset()
+    t0 = time.perf_counter()
+    sent = rc.send_sharded(
+        iter(items), sched=sched, build=lambda fields, address: rc.message_body(fields, {**CONFIG, "sender": address}),
+        mark_sent=mark_sent, workers=params["workers"], cooldown=rc.DomainCooldown(0), log=log_lines.append,
+        stop_event=threading.Event(),
+    )
+    elapsed = time.perf_counter() - t0
+    accepted = sum(g.sent for g in fakes)
+    return {"accounts": len(rates), "rates": rates, "seconds": round(elapsed, 3), "sent": sent,
+            "sent_per_sec": round(sent / elapsed, 1) if elapsed else None,
+            "split": [by_sender[s.address] for s in shards],
+            "exhausted": [s.exhausted for s in shards],
+            "duplicates": sum(1 for n in marked.values() if n > 1),
+            "consistent": accepted == sent == sum(marked.values()),
+            "unsent": len(items) - sent, "errors": [line for line in log_lines if "Error" in line][:3]}
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--rows", type=int, default=1000)
+    ap.add_argument("--accounts", default="1,2,4", help="comma-separated account counts")
+    ap.add_argument("--rate", type=float, default=100.0, help="msgs/sec per account (0 = unpaced)")
+    ap.add_argument("--rates", help="comma-separated per-account rates; overrides --rate and --accounts")
+    ap.add_argument("--burst", type=int, default=1)
+    ap.add_argument("--daily-limit", type=int, default=0, help="messages each account may send (0 = no limit)")
+    ap.add_argument("--workers", type=int, default=2, help="sender threads per account")
+    ap.add_argument("--gmail-latency", type=float, default=0.005, help="seconds per Gmail call")
+    ap.add_argument("--jitter", type=float, default=0.0)
+    ap.add_argument("--seed", type=int, default=7)
+    ap.add_argument("--json", help="write results here")
+    args = ap.parse_args()
+
+    params = vars(args)
+    items = prepared_rows(args.rows, args.seed)
+    plans = ([[float(r) for r in args.rates.split(",")]] if args.rates
+             else [[args.rate] * int(n) for n in args.accounts.split(",")])
+    print(f"{len(items)} rows · {args.workers} thread(s)/account · latency {args.gmail_latency:g}s · "
+          f"daily limit {args.daily_limit or '-'}")
+    print(f"{'accounts':>8} {'secs':>8} {'sent/sec':>9} {'speed-up':>9} {'sent':>6} {'unsent':>7} {'dupes':>6}  split")
+    results = []
+    for rates in plans:
+        res = run_accounts(items, rates, params)
+        base = results[0]["sent_per_sec"] if results else res["sent_per_sec"]
+        split = " / ".join(f"{n}{'*' if x else ''}" for n, x in zip(res["split"], res["exhausted"]))
+        print(f"{res['accounts']:>8} {res['seconds']:>8.2f} {res['sent_per_sec']:>9.0f} "
+              f"{res['sent_per_sec'] / base:>8.1f}x {res['sent']:>6} {res['unsent']:>7} {res['duplicates']:>6}  {split}"
+              f"{'' if res['consistent'] else '  (counts disagree!)'}")
+        for line in res["errors"]:
+            print(f"         {line.strip()}")
+        results.append(res)
+    if any(any(r["exhausted"]) for r in results):
+        print("* = account reached its daily limit during the run")
+    if args.json:
+        Path(args.json).write_text(json.dumps({"params": params, "results": results}, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,134 @@
+# benchmarks/bench_startup.py
+"""
+Startup cost of the entry points: each target is imported in a fresh interpreter under
+`python -X importtime`, and the cumulative times of its heaviest imports are reported
+along with the wall time of `rejections_cli.py --help`. The GUI is only measured
+when customtkinter is installed.
+
+Import times are medians over --runs fresh interpreters. Python's own startup
+(site, encodings, .pth hooks) is included in the wall time but not in the import table.
+
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --runs 15 --top 15 --json after.json --compare before.json
+"""
+
+import argparse
+import compileall
+import importlib.util
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+TARGETS = ("rejections_core", "rejections_cli", "gui_rejections_app")
+
+
+def import_times(module: str) -> dict:
+    """Cumulative microseconds per top-level import of `module`, from one fresh interpreter."""
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", f"import {module}"], cwd=ROOT,
+                          capture_output=True, text=True, timeout=120)
+    if proc.returncode:
+        raise RuntimeError(proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else f"import {module} failed")
+    entries = []
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line.split("|")
+        depth = (len(name) - len(name.lstrip()) - 1) // 2   # " " + two spaces per nesting level
+        entries.append((depth, name.strip(), int(cumulative)))
+    # A module's line follows those of everything it imported, so the target's direct
+    # imports are the depth-1 entries between the previous top-level line and its own.
+    end = next(i for i, (depth, name, _) in enumerate(entries) if depth == 0 and name == module)
+    times = {module: entries[end][2]}
+    for depth, name, cumulative in reversed(entries[:end]):
+        if depth == 0:
+            break
+        if depth == 1:
+            times[name] = cumulative
+    return times
+
+
+def wall_time(args: list) -> float:
+    t0 = time.perf_counter()
+    subprocess.run([sys.executable, *args], cwd=ROOT, capture_output=True, timeout=120, check=True)
+    return time.perf_counter() - t0
+
+
+def measure(module: str, runs: int, top: int) -> dict:
+    samples = [import_times(module) for _ in range(runs)]
+    names = set().union(*samples)
+    median_us = {n: statistics.median(s.get(n, 0) for s in samples) for n in names}
+    total = median_us.pop(module, 0)
+    heaviest = sorted(median_us.items(), key=lambda kv: kv[1], reverse=True)[:top]
+    return {"module": module, "import_ms": round(total / 1000, 1),
+            "heaviest": [{"name": n, "ms": round(us / 1000, 1)} for n, us in heaviest]}
+
+
+def git_version() -> str | None:
+    try:
+        return subprocess.run(["git", "describe", "--always", "--dirty"], cwd=ROOT, capture_output=True,
+                              text=True, timeout=10).stdout.strip() or None
+    except Exception:
+        return None
+
+
+def print_result(res: dict):
+    print(f"\n{res['module']}: {res['import_ms']:.1f} ms to import")
+    for imp in res["heaviest"]:
+        share = imp["ms"] / res["import_ms"] if res["import_ms"] else 0
+        print(f"   {imp['name']:<40} {imp['ms']:>8.1f} ms {share:>6.0%}")
+
+
+def compare(results: dict, baseline_path: str):
+    """Print import and --help times against an earlier --json file."""
+    old = json.loads(Path(baseline_path).read_text(encoding="utf-8"))
+    before = {r["module"]: r["import_ms"] for r in old["results"]}
+    print(f"\nCompared with {baseline_path}:")
+    print(f"{'':<28} {'ms':>9} {'before':>9} {'change':>8}")
+    rows = [(r["module"], r["import_ms"], before.get(r["module"])) for r in results["results"]]
+    rows.append(("rejections_cli.py --help", results["cli_help_ms"], old.get("cli_help_ms")))
+    for name, new, prev in rows:
+        if not prev:
+            continue
+        print(f"{name:<28} {new:>9.1f} {prev:>9.1f} {new / prev - 1:>+7.0%}")
+
+
+def main():
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    ap.add_argument("--runs", type=int, default=7, help="fresh interpreters per measurement")
+    ap.add_argument("--top", type=int, default=10, help="heaviest imports to list per target")
+    ap.add_argument("--json", help="write results here")
+    ap.add_argument("--compare", help="earlier --json output to compare against")
+    args = ap.parse_args()
+
+    targets = [t for t in TARGETS if t != "gui_rejections_app" or importlib.util.find_spec("customtkinter")]
+    if len(targets) < len(TARGETS):
+        print("customtkinter is not installed; skipping the GUI.")
+    # write .pyc files even under PYTHONDONTWRITEBYTECODE, so source compiles aren't timed
+    compileall.compile_dir(ROOT, maxlevels=0, quiet=1)
+    results = [measure(t, args.runs, args.top) for t in targets]
+    for res in results:
+        print_result(res)
+    wall_time(["-c", "pass"])  # warm the page cache and .pyc files
+    bare = statistics.median(wall_time(["-c", "pass"]) for _ in range(args.runs)) * 1000
+    cli = statistics.median(wall_time(["rejections_cli.py", "--help"]) for _ in range(args.runs)) * 1000
+    print(f"\nrejections_cli.py --help: {cli:.0f} ms wall ({bare:.0f} ms of it is a bare `python -c pass`)")
+
+    doc = {"version": git_version(), "created": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+           "python": platform.python_version(), "platform": platform.platform(), "cpus": os.cpu_count(),
+           "runs": args.runs, "results": results, "cli_help_ms": round(cli, 1), "bare_python_ms": round(bare, 1)}
+    if args.json:
+        Path(args.json).write_text(json.dumps(doc, indent=2), encoding="utf-8")
+        print(f"\nWrote {args.json}")
+    if args.compare:
+        compare(doc, args.compare)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,6 +2,10 @@
 
 import re
 import json
+import time
+import logging
+import logging.handlers
+import collections
 import threading
 import queue
 import webbrowser
@@ -12,15 +16,43 @@ import customtkinter as ctk
 from tkinter import filedialog, messagebox, Listbox, END, SINGLE
 
 from rejections_core import (
+    run_campaign,
     run_sender,
+    run_sender_asyncio,
     DEFAULT_SPREADSHEET_ID,
     DEFAULT_TAB_PREFERRED,
     DEFAULT_READ_RANGE,
+    METRICS_PREFIX,
 )
 
 # Settings file lives alongside this GUI script
 APP_DIR = Path(__file__).resolve().parent
 SETTINGS_FILE = APP_DIR / "rejections_gui_settings.json"
+LEDGER_FILE = APP_DIR / "rejections_send_ledger.sqlite3"
+SNAPSHOT_FILE = APP_DIR / "rejections_sheet_snapshots.sqlite3"
+FILE_ONLY_SETTINGS = ("metrics_jsonl", "metrics_prom", "senders", "campaign", "campaign_parallel",
+                      "snapshot_max_age", "dedupe", "rejection_report")  # kept when the GUI saves settings
+LOG_FILE = APP_DIR / "rejections_run.log"
+
+LOG_VIEW_LINES = 5000      # lines kept in the Run tab; the full log goes to LOG_FILE
+LOG_DRAIN_MAX = 20000      # queue messages handled per 150 ms tick
+LOG_FILE_BYTES = 5 << 20   # rotate LOG_FILE at this size, keeping 3 old files
+
+
+def run_file_logger() -> logging.Logger:
+    """Logger writing the full run log to LOG_FILE (rotating); silent if it can't be opened."""
+    logger = logging.getLogger("rejections_gui.run")
+    logger.propagate = False
+    logger.setLevel(logging.INFO)
+    if not logger.handlers:
+        try:
+            handler = logging.handlers.RotatingFileHandler(LOG_FILE, maxBytes=LOG_FILE_BYTES, backupCount=3,
+                                                           encoding="utf-8")
+            handler.setFormatter(logging.Formatter("%(message)s"))
+        except OSError:
+            handler = logging.NullHandler()
+        logger.addHandler(handler)
+    return logger
 
 
 class App(ctk.CTk):
@@ -35,9 +67,12 @@ class App(ctk.CTk):
 
         # state
         self.attachments: List[str] = []
+        self.file_settings: dict = {}  # FILE_ONLY_SETTINGS, edited in the settings file only
         self.worker_thread: threading.Thread | None = None
         self.logq: queue.Queue = queue.Queue()
         self.stop_event = threading.Event()
+        self._file_log = run_file_logger()
+        self._log_lines = 0  # lines currently in the Run tab textbox
 
         # layout
         self._build_layout()
@@ -70,6 +105,13 @@ class App(ctk.CTk):
         self.throttle_var = ctk.StringVar(value="2.0")
         self.domain_throttle_var = ctk.StringVar(value="0.0")
         self.preview_n_var = ctk.StringVar(value="0")
+        self.workers_var = ctk.StringVar(value="1")
+        self.rate_var = ctk.StringVar(value="0")
+        self.burst_var = ctk.StringVar(value="1")
+        self.batch_size_var = ctk.StringVar(value="0")
+        self.async_engine_var = ctk.BooleanVar(value=False)
+        self.concurrency_var = ctk.StringVar(value="20")
+        self.render_processes_var = ctk.StringVar(value="0")
         self.dry_run_var = ctk.BooleanVar(value=True)
 
         # Default creds/token paths next to the GUI script
@@ -104,6 +146,25 @@ class App(ctk.CTk):
         ctk.CTkLabel(g, text="Preview N (0=off)").grid(row=row, column=2, sticky="w", padx=8, pady=(8, 0))
         ctk.CTkEntry(g, textvariable=self.preview_n_var).grid(row=row + 1, column=2, sticky="ew", padx=8)
 
+        row += 2
+        ctk.CTkLabel(g, text="Send workers (1=sequential)").grid(row=row, column=0, sticky="w", padx=8, pady=(8, 0))
+        ctk.CTkEntry(g, textvariable=self.workers_var).grid(row=row + 1, column=0, sticky="ew", padx=8)
+        ctk.CTkLabel(g, text="Max rate (msgs/sec, 0=use throttle)").grid(row=row, column=1, sticky="w", padx=8, pady=(8, 0))
+        ctk.CTkEntry(g, textvariable=self.rate_var).grid(row=row + 1, column=1, sticky="ew", padx=8)
+        ctk.CTkLabel(g, text="Burst (messages)").grid(row=row, column=2, sticky="w", padx=8, pady=(8, 0))
+        ctk.CTkEntry(g, textvariable=self.burst_var).grid(row=row + 1, column=2, sticky="ew", padx=8)
+
+        row += 2
+        ctk.CTkLabel(g, text="Gmail batch size (0=off, max 100)").grid(row=row, column=0, sticky="w", padx=8, pady=(8, 0))
+        ctk.CTkEntry(g, textvariable=self.batch_size_var).grid(row=row + 1, column=0, sticky="ew", padx=8)
+        ctk.CTkLabel(g, text="Render processes (0=off)").grid(row=row, column=1, sticky="w", padx=8, pady=(8, 0))
+        ctk.CTkEntry(g, textvariable=self.render_processes_var).grid(row=row + 1, column=1, sticky="ew", padx=8)
+
+        row += 2
+        ctk.CTkCheckBox(g, text="Async engine (needs httpx)", variable=self.async_engine_var).grid(row=row + 1, column=0, sticky="w", padx=8)
+        ctk.CTkLabel(g, text="Async sends in flight").grid(row=row, column=1, sticky="w", padx=8, pady=(8, 0))
+        ctk.CTkEntry(g, textvariable=self.concurrency_var).grid(row=row + 1, column=1, sticky="ew", padx=8)
+
         row += 2
         ctk.CTkLabel(g, text="Spreadsheet ID").grid(row=row, column=0, sticky="w", padx=8, pady=(8, 0))
         ssid_frame = ctk.CTkFrame(g)
@@ -207,6 +268,13 @@ class App(ctk.CTk):
             "throttle": self.throttle_var.get(),
             "domain_throttle": self.domain_throttle_var.get(),
             "preview_n": self.preview_n_var.get(),
+            "workers": self.workers_var.get(),
+            "rate": self.rate_var.get(),
+            "burst": self.burst_var.get(),
+            "batch_size": self.batch_size_var.get(),
+            "engine": "async" if self.async_engine_var.get() else "threaded",
+            "concurrency": self.concurrency_var.get(),
+            "render_processes": self.render_processes_var.get(),
             "dry_run": self.dry_run_var.get(),
             "credentials": self.credentials_var.get(),
             "token": self.token_var.get(),
@@ -218,6 +286,7 @@ class App(ctk.CTk):
             "attachments": self.attachments,
             "sender_name": self.sender_name_var.get(),
             "sender_title": self.sender_title_var.get(),
+            **self.file_settings,
         }
 
     def _save_settings(self):
@@ -236,6 +305,13 @@ class App(ctk.CTk):
                 self.throttle_var.set(str(data.get("throttle", self.throttle_var.get())))
                 self.domain_throttle_var.set(str(data.get("domain_throttle", self.domain_throttle_var.get())))
                 self.preview_n_var.set(str(data.get("preview_n", self.preview_n_var.get())))
+                self.workers_var.set(str(data.get("workers", self.workers_var.get())))
+                self.rate_var.set(str(data.get("rate", self.rate_var.get())))
+                self.burst_var.set(str(data.get("burst", self.burst_var.get())))
+                self.batch_size_var.set(str(data.get("batch_size", self.batch_size_var.get())))
+                self.async_engine_var.set(data.get("engine") == "async")
+                self.concurrency_var.set(str(data.get("concurrency", self.concurrency_var.get())))
+                self.render_processes_var.set(str(data.get("render_processes", self.render_processes_var.get())))
                 self.dry_run_var.set(bool(data.get("dry_run", True)))
                 self.credentials_var.set(data.get("credentials", self.credentials_var.get()))
                 self.token_var.set(data.get("token", self.token_var.get()))
@@ -247,6 +323,7 @@ class App(ctk.CTk):
                 self.attachments = list(data.get("attachments", []))
                 self.sender_name_var.set(data.get("sender_name", self.sender_name_var.get()))
                 self.sender_title_var.set(data.get("sender_title", self.sender_title_var.get()))
+                self.file_settings = {k: data[k] for k in FILE_ONLY_SETTINGS if data.get(k)}
                 self._refresh_attach_view()
             except Exception as e:
                 messagebox.showwarning("Settings", f"Could not load settings: {e}")
@@ -343,12 +420,18 @@ class App(ctk.CTk):
         # inject runtime flags
         cfg["dry_run"] = dry
         cfg["test_to_self"] = test_to_self
+        cfg["ledger"] = str(LEDGER_FILE)
+        cfg["snapshots"] = str(SNAPSHOT_FILE)
 
         self._save_settings()
         self._clear_log()
         self.prog.set(0)
         self.stop_event.clear()
-        self.worker_thread = threading.Thread(target=run_sender, args=(cfg, self.logq, self.stop_event), daemon=True)
+        if cfg.get("campaign"):
+            target = run_campaign  # tabs listed in the settings file; always the threaded engine
+        else:
+            target = run_sender_asyncio if cfg["engine"] == "async" else run_sender
+        self.worker_thread = threading.Thread(target=target, args=(cfg, self.logq, self.stop_event), daemon=True)
         self.worker_thread.start()
 
     # ------------- Logging / progress -------------
@@ -356,38 +439,58 @@ class App(ctk.CTk):
         self.log.configure(state="normal")
         self.log.delete("1.0", "end")
         self.log.configure(state="disabled")
+        self._log_lines = 0
+        self._file_log.info("==== %s run started ====", time.strftime("%Y-%m-%d %H:%M:%S"))
 
     def _write_log(self, text: str):
+        self._write_log_lines([text])
+
+    def _write_log_lines(self, lines: List[str]):
+        """Append lines in one insert, keeping only the newest LOG_VIEW_LINES in the textbox."""
+        if not lines:
+            return
+        self._file_log.info("\n".join(lines))
+        tail = collections.deque(lines, maxlen=LOG_VIEW_LINES)  # older lines would be trimmed anyway
         self.log.configure(state="normal")
-        self.log.insert("end", text + "\n")
+        self.log.insert("end", "\n".join(tail) + "\n")
+        self._log_lines += len(tail)
+        excess = self._log_lines - LOG_VIEW_LINES
+        if excess > 0:
+            self.log.delete("1.0", f"{excess + 1}.0")
+            self._log_lines -= excess
         self.log.see("end")
         self.log.configure(state="disabled")
 
     def _poll_log_queue(self):
+        lines: List[str] = []
+        progress = None
         try:
-            while True:
+            for _ in range(LOG_DRAIN_MAX):  # bounded so a flood can't stall the main loop
                 msg = self.logq.get_nowait()
                 if isinstance(msg, str) and msg.startswith("__PROG__"):
-                    try:
-                        frac = msg.split("__PROG__")[1]
-                        num_s, denom_s = frac.split("/")
-                        num, denom = int(num_s), max(1, int(denom_s))
-                        self.prog.set(max(0.01, num / denom))
-                    except Exception:
-                        pass
+                    progress = msg  # only the newest one matters
+                elif isinstance(msg, str) and msg.startswith(METRICS_PREFIX):
+                    continue  # structured events are for exports; the summary table is logged
                 else:
-                    self._write_log(msg)
+                    lines.append(str(msg))
         except queue.Empty:
             pass
+        self._write_log_lines(lines)
 
-        if self.worker_thread and not self.worker_thread.is_alive():
+        if progress is not None:
+            try:
+                num_s, denom_s = progress[len("__PROG__"):].split("/")
+                num, denom = int(num_s), max(1, int(denom_s))
+                self.prog.set(max(0.01, num / denom))
+            except Exception:
+                pass
+        if self.worker_thread and not self.worker_thread.is_alive() and self.logq.empty():
             try:
                 self.prog.set(1.0)
             except Exception:
                 pass
         self.after(150, self._poll_log_queue)
 
-
 if __name__ == "__main__":
     app = App()
     app.mainloop()
@@ -0,0 +1,164 @@
+# rejections_cli.py
+"""
+Headless entry point: runs the engine with the settings the GUI saved to
+rejections_gui_settings.json, for cron jobs and CI. Dry run unless --send is given.
+
+    python rejections_cli.py                       # dry run with the saved settings
+    python rejections_cli.py --send --quiet        # real send; only errors and the summary
+    python rejections_cli.py --test                # first eligible row to the sender
+    python rejections_cli.py --settings other.json --tab "Backend Q3" --preview 20
+    python rejections_cli.py --send --campaign q3_tabs.json   # several tabs/sheets in one run
+
+Exit status: 0 on success, 1 if the run failed or logged errors, 2 for bad settings,
+130 if interrupted (Ctrl+C / SIGTERM stop the run after the current item).
+"""
+
+import argparse
+import json
+import queue
+import re
+import signal
+import sys
+import threading
+from pathlib import Path
+
+import rejections_core as core
+
+APP_DIR = Path(__file__).resolve().parent
+SETTINGS_FILE = APP_DIR / "rejections_gui_settings.json"   # same files as the GUI
+LEDGER_FILE = APP_DIR / "rejections_send_ledger.sqlite3"
+SNAPSHOT_FILE = APP_DIR / "rejections_sheet_snapshots.sqlite3"
+
+
+def load_settings(path: Path) -> dict:
+    try:
+        return json.loads(path.read_text(encoding="utf-8"))
+    except FileNotFoundError:
+        raise SystemExit(f"No settings file at {path}. Save settings in the GUI first, or pass --settings.")
+    except ValueError as e:
+        raise SystemExit(f"Could not read {path}: {e}")
+
+
+def load_campaign(path: Path) -> list:
+    """Campaign jobs from a JSON file: a list of jobs, or {"jobs": [...]}."""
+    try:
+        doc = json.loads(path.read_text(encoding="utf-8"))
+    except (OSError, ValueError) as e:
+        raise SystemExit(f"Could not read campaign {path}: {e}")
+    jobs = doc.get("jobs") if isinstance(doc, dict) else doc
+    if not isinstance(jobs, list):
+        raise SystemExit(f"Campaign {path} must be a list of jobs or {{\"jobs\": [...]}}.")
+    return jobs
+
+
+def build_config(settings: dict, args) -> dict:
+    """The GUI's run config: saved settings, command-line overrides and runtime flags."""
+    cfg = dict(settings)
+    overrides = {
+        "spreadsheet_id": args.spreadsheet_id, "tab": args.tab, "read_range": args.range,
+        "preview_n": args.preview, "engine": args.engine, "workers": args.workers,
+        "concurrency": args.concurrency,
+        "metrics_jsonl": args.metrics_jsonl, "metrics_prom": args.metrics_prom,
+    }
+    cfg.update({k: v for k, v in overrides.items() if v is not None})
+    if args.campaign:
+        cfg["campaign"] = load_campaign(args.campaign)
+    cfg["dry_run"] = not (args.send or args.test)
+    cfg["test_to_self"] = args.test
+    cfg["ledger"] = args.ledger or str(LEDGER_FILE)
+    cfg["snapshots"] = str(SNAPSHOT_FILE)
+    if args.fresh:
+        cfg["snapshot_max_age"] = 0  # full read; the snapshot is replaced
+    if args.rejections:
+        cfg["rejection_report"] = args.rejections
+    cfg["metrics_events"] = False  # nothing here reads them off the queue
+    return cfg
+
+
+def config_problems(cfg: dict) -> list:
+    """Same checks the GUI runs before starting a run."""
+    problems = []
+    if not cfg.get("sender") or not re.match(r"[^@]+@[^@]+\.[^@]+", cfg["sender"]):
+        problems.append("Sender must be a valid email address.")
+    if not cfg.get("text_template"):
+        problems.append("Text template file is required.")
+    elif not Path(cfg["text_template"]).exists():
+        problems.append(f"Text template file must exist: {cfg['text_template']}")
+    if not cfg.get("spreadsheet_id") and not (cfg.get("campaign") and all(
+            isinstance(job, dict) and job.get("spreadsheet_id") for job in cfg["campaign"])):
+        problems.append("Spreadsheet ID is required.")
+    return problems
+
+
+def main(argv=None) -> int:
+    ap = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    mode = ap.add_mutually_exclusive_group()
+    mode.add_argument("--send", action="store_true", help="send for real (default is a dry run)")
+    mode.add_argument("--test", action="store_true", help="send the first eligible row to the sender only")
+    ap.add_argument("--settings", type=Path, default=SETTINGS_FILE, help=f"settings file (default {SETTINGS_FILE.name})")
+    ap.add_argument("--spreadsheet-id")
+    ap.add_argument("--tab")
+    ap.add_argument("--range", help="read range, e.g. A:Z")
+    ap.add_argument("--preview", type=int, help="only the first N eligible rows")
+    ap.add_argument("--engine", choices=("threaded", "async"))
+    ap.add_argument("--campaign", type=Path, help="JSON list of tabs/sheets to run as one campaign")
+    ap.add_argument("--workers", type=int)
+    ap.add_argument("--concurrency", type=int, help="sends in flight with the async engine (default 20)")
+    ap.add_argument("--ledger", help=f"send ledger (default {LEDGER_FILE.name})")
+    ap.add_argument("--fresh", action="store_true", help="read the whole sheet instead of updating the saved snapshot")
+    ap.add_argument("--rejections", help="write the rows held back or flagged (invalid or repeated emails) to this CSV")
+    ap.add_argument("--metrics-jsonl", help="append run metrics to this JSON-lines file")
+    ap.add_argument("--metrics-prom", help="keep a Prometheus textfile of run metrics here")
+    ap.add_argument("-q", "--quiet", action="store_true", help="hide per-row lines")
+    args = ap.parse_args(argv)
+
+    cfg = build_config(load_settings(args.settings), args)
+    problems = config_problems(cfg)
+    if problems:
+        for p in problems:
+            print(f"ERROR: {p}", file=sys.stderr)
+        return 2
+
+    logq: queue.Queue = queue.Queue()
+    stop_event = threading.Event()
+
+    def stop(signum, frame):
+        if stop_event.is_set():
+            raise KeyboardInterrupt
+        print("Stopping after the current item… (again to abort)", file=sys.stderr)
+        stop_event.set()
+
+    signal.signal(signal.SIGINT, stop)
+    if hasattr(signal, "SIGTERM"):
+        signal.signal(signal.SIGTERM, stop)
+
+    if cfg.get("campaign"):
+        target = core.run_campaign
+    else:
+        target = core.run_sender_asyncio if cfg.get("engine") == "async" else core.run_sender
+    worker = threading.Thread(target=target, args=(cfg, logq, stop_event), daemon=True, name="rejections-run")
+    worker.start()
+
+    failed = False
+    try:
+        while worker.is_alive() or not logq.empty():
+            try:
+                msg = logq.get(timeout=0.2)
+            except queue.Empty:
+                continue
+            if not isinstance(msg, str) or msg.startswith(("__PROG__", core.METRICS_PREFIX)):
+                continue
+            if core.is_error_line(msg):
+                failed = True
+                print(msg, file=sys.stderr, flush=True)
+            elif not (args.quiet and msg.split(core.JOB_SEP, 1)[-1].startswith("[")):
+                print(msg, flush=True)
+    except KeyboardInterrupt:
+        print("Aborted.", file=sys.stderr)
+    if stop_event.is_set():
+        return 130
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,27 +1,40 @@
 # rejections_core.py
+from __future__ import annotations
 
 import os
+import sys
 import re
 import json
+import itertools
+import collections
+import contextlib
 import time
 import random
+import heapq
+import socket
+import ssl
+import sqlite3
+import zlib
+import hashlib
 import mimetypes
 import base64
+import mmap
+import urllib.parse
+import queue
+import threading
+from array import array
 from pathlib import Path
+from operator import itemgetter, ne, not_, or_
 from datetime import datetime, timezone
-from typing import List, Dict, Tuple, Callable, Any
+from typing import TYPE_CHECKING, List, Dict, Tuple, Callable, Any, Iterable
 
-from jinja2 import Template
-from email.mime.text import MIMEText
-from email.mime.base import MIMEBase
-from email.mime.multipart import MIMEMultipart
-from email import encoders
-from email.utils import formatdate, make_msgid
+from email import policy as email_policy
+from email.utils import formataddr, formatdate, getaddresses, make_msgid, parseaddr, parsedate_to_datetime
 
-from googleapiclient.discovery import build
-from google.oauth2.credentials import Credentials
-from google_auth_oauthlib.flow import InstalledAppFlow
-from google.auth.transport.requests import Request
+# jinja2 and the Google client libraries are imported where they are first used, so
+# importing this module (the CLI, --help, config checks) stays fast.
+if TYPE_CHECKING:
+    from google.oauth2.credentials import Credentials
 
 # ----------------- DEFAULT SHEET SETTINGS (you can change in GUI) -----------------
 DEFAULT_SPREADSHEET_ID = ""
@@ -34,22 +47,433 @@ SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
 ]
 
+# ---------- Retries ----------
+RATE_LIMIT_REASONS = {"rateLimitExceeded", "userRateLimitExceeded", "RESOURCE_EXHAUSTED"}
+QUOTA_REASONS = {"dailyLimitExceeded", "quotaExceeded"}
+QUOTA_RETRY_AFTER = 15 * 60  # a rate limit asking for a longer pause means the daily quota is spent
+TRANSPORT_ERRORS: Tuple[type, ...] = (ConnectionError, TimeoutError, socket.timeout, ssl.SSLError)
+
+def _transport_errors() -> Tuple[type, ...]:
+    """TRANSPORT_ERRORS plus the client libraries' own, for those already imported."""
+    extra = []
+    if "httplib2" in sys.modules:
+        extra.append(sys.modules["httplib2"].HttpLib2Error)
+    if "google.auth.exceptions" in sys.modules:
+        extra.append(sys.modules["google.auth.exceptions"].TransportError)
+    return TRANSPORT_ERRORS + tuple(extra)
+
+def _error_status_and_reasons(exc: Exception) -> Tuple[int, set]:
+    """HTTP status and Google error reasons of a googleapiclient HttpError or ApiError."""
+    resp = getattr(exc, "resp", None)
+    status = int(getattr(exc, "status", 0) or getattr(resp, "status", 0) or 0)
+    body = getattr(exc, "content", None) or getattr(exc, "body", None) or b""
+    reasons: set = set()
+    try:
+        err = json.loads(body.decode("utf-8") if isinstance(body, bytes) else body).get("error", {})
+        reasons = {e.get("reason", "") for e in err.get("errors", [])} | {err.get("status", "")}
+    except Exception:
+        pass
+    reasons.discard("")
+    return status, reasons
+
+def classify_error(exc: Exception) -> str:
+    """
+    'quota' (daily limit spent: 403 dailyLimitExceeded, or a rate limit with a
+    Retry-After over QUOTA_RETRY_AFTER), 'rate_limit' (429, or 403
+    rate/userRateLimitExceeded), 'server' (5xx/408), 'transport' (connection/timeout),
+    else 'permanent' -- e.g. a 400 for a malformed address, which retrying cannot fix.
+    """
+    status, reasons = _error_status_and_reasons(exc)
+    if status in (403, 429) and reasons & QUOTA_REASONS:
+        return "quota"
+    if status == 429 or (status == 403 and reasons & RATE_LIMIT_REASONS):
+        if (retry_after_seconds(exc) or 0.0) > QUOTA_RETRY_AFTER:
+            return "quota"
+        return "rate_limit"
+    if status >= 500 or status == 408:
+        return "server"
+    if not status and isinstance(exc, _transport_errors()):
+        return "transport"
+    return "permanent"
+
+def retry_after_seconds(exc: Exception) -> float | None:
+    """Value of a Retry-After header (seconds or HTTP date) on the error's response, if any."""
+    resp = getattr(exc, "resp", None) or getattr(exc, "headers", None)
+    value = None
+    if resp is not None:
+        try:
+            value = resp.get("retry-after") or resp.get("Retry-After")
+        except Exception:
+            value = None
+    if not value:
+        return None
+    value = str(value).strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, (parsedate_to_datetime(value) - datetime.now(timezone.utc)).total_seconds())
+    except Exception:
+        return None
+
+class RetryStats:
+    """Thread-safe retry metrics for a run: failures by class, retries and seconds spent waiting."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.failures: Dict[str, int] = {}
+            self.retries = 0
+            self.wait_seconds = 0.0
+
+    def failure(self, kind: str):
+        with self._lock:
+            self.failures[kind] = self.failures.get(kind, 0) + 1
+
+    def retried(self):
+        with self._lock:
+            self.retries += 1
+
+    def waited(self, seconds: float):
+        with self._lock:
+            self.wait_seconds += seconds
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"retries": self.retries, "wait_seconds": round(self.wait_seconds, 3),
+                    "failures": dict(self.failures)}
+
+    def summary(self) -> str:
+        snap = self.snapshot()
+        kinds = ", ".join(f"{k} {v}" for k, v in sorted(snap["failures"].items())) or "none"
+        return f"API retries: {snap['retries']} · waited {snap['wait_seconds']:.1f}s · failures: {kinds}"
+
+class CircuitBreaker:
+    """
+    Process-wide pause shared by every API caller. A rate-limit error opens it for the
+    Retry-After time (or an exponential backoff that grows with consecutive trips), and
+    all callers wait it out together instead of each hammering the API on its own.
+    """
+
+    def __init__(self, base: float = 1.0, cap: float = 60.0, stats: RetryStats | None = None):
+        self.base = base
+        self.cap = cap
+        self.stats = stats
+        self._open_until = 0.0
+        self._trips = 0
+        self._lock = threading.Lock()
+
+    def trip(self, retry_after: float | None = None) -> float:
+        """Open (or extend) the pause; returns how long from now it lasts."""
+        with self._lock:
+            self._trips += 1
+            backoff = min(self.cap, self.base * (2 ** (self._trips - 1))) + random.uniform(0, 0.25)
+            delay = max(retry_after or 0.0, backoff)
+            now = time.monotonic()
+            self._open_until = max(self._open_until, now + delay)
+            return self._open_until - now
+
+    def success(self):
+        with self._lock:
+            if time.monotonic() >= self._open_until:
+                self._trips = 0
+
+    def remaining(self) -> float:
+        with self._lock:
+            return max(0.0, self._open_until - time.monotonic())
+
+    def wait(self, stop_event=None) -> bool:
+        """Sleep until the pause is over, even if extended meanwhile; False if `stop_event` is set first."""
+        t0, slept = time.monotonic(), False
+        while not (stop_event is not None and stop_event.is_set()):
+            delay = self.remaining()
+            if delay <= 0:
+                break
+            slept = True
+            if stop_event is None:
+                time.sleep(delay)
+            else:
+                stop_event.wait(min(delay, 0.25))  # short naps so cancel is noticed
+        if slept and self.stats:
+            self.stats.waited(time.monotonic() - t0)
+        return not (stop_event is not None and stop_event.is_set())
+
+class Cancelled(Exception):
+    """A wait before an API call was cut short by the stop event; the call was not made."""
+
+RETRY_STATS = RetryStats()
+API_BREAKER = CircuitBreaker(stats=RETRY_STATS)
+
+# ---------- Run metrics ----------
+METRICS_PREFIX = "__METRICS__"   # logq messages carrying one JSON metrics event
+METRICS_INTERVAL = 10.0          # seconds between progress events
+METRIC_STAGES = ("read", "filter", "render", "build_mime", "throttle", "send", "write_status")
+
+class RunMetrics:
+    """
+    Thread-safe timings and counters for one run. Stages accumulate calls, seconds
+    and the longest single observation; counters hold API calls (`api.<method>`, one
+    per attempt), rows, messages and bytes sent. `emit` passes a snapshot event to
+    every sink, `maybe_emit` at most once per `interval` seconds.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self, sinks: Iterable[Callable[[dict], Any]] = (), interval: float = METRICS_INTERVAL,
+              labels: Dict[str, str] | None = None):
+        with self._lock:
+            self.stages: Dict[str, List[float]] = {}  # name -> [calls, seconds, max seconds]
+            self.counters: Dict[str, float] = {}
+            self.sinks = list(sinks)
+            self.interval = interval
+            self.labels = dict(labels or {})
+            self.errors: Dict[str, str] = {}          # sink -> first export error
+            self._started = time.monotonic()
+            self._last_emit = self._started
+
+    def observe(self, stage: str, seconds: float, calls: int = 1):
+        with self._lock:
+            entry = self.stages.get(stage)
+            if entry is None:
+                entry = self.stages[stage] = [0, 0.0, 0.0]
+            entry[0] += calls
+            entry[1] += seconds
+            entry[2] = max(entry[2], seconds)
+
+    @contextlib.contextmanager
+    def timed(self, stage: str, calls: int = 1):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - t0, calls)
+
+    def timed_iter(self, iterable: Iterable[Any], stage: str):
+        """Yield from `iterable`, recording the time spent waiting for each item."""
+        it = iter(iterable)
+        while True:
+            t0 = time.perf_counter()
+            try:
+                item = next(it)
+            except StopIteration:
+                return
+            self.observe(stage, time.perf_counter() - t0)
+            yield item
+
+    def count(self, name: str, n: float = 1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self) -> Dict[str, Any]:
+        with self._lock:
+            stages = {k: {"calls": int(c), "seconds": round(t, 4), "max_ms": round(m * 1000, 2)}
+                      for k, (c, t, m) in self.stages.items()}
+            counters = dict(self.counters)
+            elapsed = time.monotonic() - self._started
+        return {"elapsed": round(elapsed, 3), "stages": stages, "counters": counters, **RETRY_STATS.snapshot()}
+
+    def emit(self, phase: str = "progress"):
+        """Send a `metrics` event to the sinks; a failing sink is noted in `errors`, never raised."""
+        event = {"event": "metrics", "phase": phase,
+                 "time": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+                 **self.labels, **self.snapshot()}
+        with self._lock:
+            self._last_emit = time.monotonic()
+            sinks = list(self.sinks)
+        for sink in sinks:
+            try:
+                sink(event)
+            except Exception as e:
+                with self._lock:
+                    self.errors.setdefault(getattr(sink, "name", repr(sink)), str(e))
+
+    def maybe_emit(self):
+        if self.sinks and time.monotonic() - self._last_emit >= self.interval:
+            self.emit()
+
+    def summary(self) -> List[str]:
+        """End-of-run table: one line per stage, then API calls and what was sent."""
+        snap = self.snapshot()
+        elapsed = snap["elapsed"] or 1e-9
+        names = [n for n in METRIC_STAGES if n in snap["stages"]]
+        names += sorted(n for n in snap["stages"] if n not in METRIC_STAGES)
+        lines = [f"Run time {_fmt_duration(elapsed)} by stage (stages overlap with workers/prefetch):",
+                 f"   {'stage':<13}{'calls':>8}{'total s':>10}{'avg ms':>9}{'max ms':>9}{'% run':>7}"]
+        for name in names:
+            st = snap["stages"][name]
+            avg = st["seconds"] / st["calls"] * 1000 if st["calls"] else 0.0
+            lines.append(f"   {name:<13}{st['calls']:>8}{st['seconds']:>10.2f}{avg:>9.2f}"
+                         f"{st['max_ms']:>9.1f}{st['seconds'] / elapsed * 100:>6.0f}%")
+        counters = snap["counters"]
+        calls = ", ".join(f"{k[4:]} {int(v)}" for k, v in sorted(counters.items()) if k.startswith("api."))
+        if calls:
+            lines.append(f"   API calls: {calls}")
+        if counters.get("messages_sent"):
+            lines.append(f"   Sent {int(counters['messages_sent'])} message(s), "
+                         f"{counters.get('bytes_sent', 0) / 2**20:.1f} MB")
+        return lines
+
+METRICS = RunMetrics()
+
+def queue_metrics_sink(logq) -> Callable[[dict], None]:
+    """Sink putting each event on `logq` as METRICS_PREFIX + JSON (the GUI skips these)."""
+    def sink(event: dict):
+        logq.put(METRICS_PREFIX + json.dumps(event))
+    sink.name = "log queue"
+    return sink
+
+class JsonLinesSink:
+    """Appends each metrics event to `path` as one JSON line."""
+
+    def __init__(self, path: str | Path):
+        self.path = Path(path)
+        self.name = str(self.path)
+        self._lock = threading.Lock()
+
+    def __call__(self, event: dict):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock, open(self.path, "a", encoding="utf-8") as f:
+            f.write(line)
+
+def _prom_labels(labels: Dict[str, Any]) -> str:
+    if not labels:
+        return ""
+    def esc(v) -> str:
+        return str(v).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return "{" + ",".join(f'{k}="{esc(v)}"' for k, v in labels.items()) + "}"
+
+class PrometheusTextfileSink:
+    """
+    Rewrites `path` in the Prometheus text format on every event (for node_exporter's
+    textfile collector). The file is replaced atomically, so scrapes never see half of it.
+    """
+
+    def __init__(self, path: str | Path, prefix: str = "rejections"):
+        self.path = Path(path)
+        self.prefix = prefix
+        self.name = str(self.path)
+        self._lock = threading.Lock()
+
+    def render(self, event: dict) -> str:
+        base = {k: event[k] for k in ("engine", "spreadsheet_id", "tab") if event.get(k)}
+        out: List[str] = []
+
+        def metric(name: str, kind: str, help_text: str, samples: List[Tuple[Dict[str, Any], float]]):
+            full = f"{self.prefix}_{name}"
+            out.append(f"# HELP {full} {help_text}")
+            out.append(f"# TYPE {full} {kind}")
+            for labels, value in samples:
+                out.append(f"{full}{_prom_labels({**base, **labels})} {value}")
+
+        stages = event["stages"]
+        counters = event["counters"]
+        metric("run_elapsed_seconds", "gauge", "Seconds since the run started.", [({}, event["elapsed"])])
+        metric("run_finished", "gauge", "1 once the run has ended.", [({}, 1 if event["phase"] == "final" else 0)])
+        metric("run_updated_timestamp_seconds", "gauge", "Unix time of this export.", [({}, round(time.time(), 3))])
+        metric("stage_seconds_total", "counter", "Time spent per pipeline stage.",
+               [({"stage": k}, v["seconds"]) for k, v in stages.items()])
+        metric("stage_calls_total", "counter", "Items handled per pipeline stage.",
+               [({"stage": k}, v["calls"]) for k, v in stages.items()])
+        metric("api_calls_total", "counter", "Google API requests, retries included.",
+               [({"method": k[4:]}, v) for k, v in counters.items() if k.startswith("api.")])
+        metric("api_retries_total", "counter", "API requests retried.", [({}, event["retries"])])
+        metric("api_failures_total", "counter", "Failed API requests by error class.",
+               [({"kind": k}, v) for k, v in event["failures"].items()])
+        metric("retry_wait_seconds_total", "counter", "Time spent backing off.", [({}, event["wait_seconds"])])
+        for name, help_text in (("rows_read", "Sheet rows read."), ("rows_eligible", "Rows passing the send gates."),
+                                ("messages_sent", "Messages accepted by Gmail."),
+                                ("bytes_sent", "Size of the messages accepted by Gmail.")):
+            metric(f"{name}_total", "counter", help_text, [({}, counters.get(name, 0))])
+        return "\n".join(out) + "\n"
+
+    def __call__(self, event: dict):
+        text = self.render(event)
+        with self._lock:
+            tmp = self.path.with_name(self.path.name + ".tmp")
+            tmp.write_text(text, encoding="utf-8")
+            os.replace(tmp, self.path)
+
+def metrics_sinks(config: dict, logq) -> List[Callable[[dict], Any]]:
+    """
+    Sinks for a run: events on `logq` (unless `metrics_events` is off), JSON lines to
+    `metrics_jsonl`, a Prometheus textfile at `metrics_prom`, and `metrics_sink` if it
+    is a callable (for callers embedding the engine).
+    """
+    sinks: List[Callable[[dict], Any]] = []
+    if config.get("metrics_events", True):
+        sinks.append(queue_metrics_sink(logq))
+    if config.get("metrics_jsonl"):
+        sinks.append(JsonLinesSink(config["metrics_jsonl"]))
+    if config.get("metrics_prom"):
+        sinks.append(PrometheusTextfileSink(config["metrics_prom"]))
+    if callable(config.get("metrics_sink")):
+        sinks.append(config["metrics_sink"])
+    return sinks
+
+def start_run_metrics(config: dict, logq, engine: str):
+    """Reset the retry and metrics collectors for a new run."""
+    RETRY_STATS.reset()
+    METRICS.reset(metrics_sinks(config, logq), float(config.get("metrics_interval") or METRICS_INTERVAL),
+                  {"engine": engine, "spreadsheet_id": config.get("spreadsheet_id", ""), "tab": config.get("tab", "")})
+
+def finish_run_metrics(log: Callable[[str], None]):
+    """Emit the final event and report exports that failed."""
+    METRICS.emit("final")
+    for sink, err in METRICS.errors.items():
+        log(f"   Error exporting metrics to {sink}: {err}")
+
 # ---------- Helpers ----------
-def _with_backoff(fn: Callable[[], Any], *, retries: int = 5, base: float = 0.8, cap: float = 8.0):
-    """Run `fn()` with exponential backoff on exceptions."""
+def _with_backoff(fn: Callable[[], Any], *, call: str = "other", retries: int = 5, base: float = 0.8,
+                  cap: float = 8.0, breaker: CircuitBreaker | None = None, stop_event=None):
+    """
+    Run `fn()`, retrying only transient failures: rate limits (through `breaker`,
+    default the shared API_BREAKER, honoring Retry-After), 5xx and transport errors.
+    Permanent and quota errors such as a 400 for a bad address are raised immediately.
+    Each attempt counts as one `api.<call>` in METRICS. Setting `stop_event` during a
+    wait raises Cancelled instead of making the next attempt.
+    """
+    breaker = breaker or API_BREAKER
     for i in range(retries):
+        if not breaker.wait(stop_event):
+            raise Cancelled(f"{call} cancelled while waiting out a rate limit")
+        METRICS.count(f"api.{call}")
         try:
-            return fn()
-        except Exception:
-            if i == retries - 1:
+            result = fn()
+        except Exception as e:
+            kind = classify_error(e)
+            RETRY_STATS.failure(kind)
+            if kind in ("permanent", "quota") or i == retries - 1:
                 raise
-            delay = min(cap, base * (2 ** i)) + random.uniform(0, 0.25)
-            time.sleep(delay)
+            RETRY_STATS.retried()
+            if kind == "rate_limit":
+                breaker.trip(retry_after_seconds(e))  # waited out at the top of the loop
+            else:
+                delay = retry_after_seconds(e) or min(cap, base * (2 ** i)) + random.uniform(0, 0.25)
+                if stop_event is not None:
+                    if stop_event.wait(delay):
+                        raise Cancelled(f"{call} cancelled before its retry")
+                else:
+                    time.sleep(delay)
+                RETRY_STATS.waited(delay)
+            continue
+        breaker.success()
+        return result
 
 def _strip_html(s: str) -> str:
     # very basic fallback if only HTML provided
     return re.sub(r"<[^>]+>", "", s or "").strip()
 
+JOB_SEP = " › "  # between a campaign job's label and its log line
+
+def is_error_line(msg: str) -> bool:
+    """True for log lines reporting a failure: FATAL/ERROR, or an indented `Error` under a row."""
+    text = msg.split(JOB_SEP, 1)[1] if JOB_SEP in msg else msg
+    return text.startswith(("FATAL", "ERROR")) or text.lstrip().startswith("Error")
+
 # ---------- Auth & services ----------
 def load_creds(credentials="credentials.json", token="token.json") -> Credentials:
     """
@@ -86,9 +510,16 @@ def load_creds(credentials="credentials.json", token="token.json") -> Credential
                 f"Update your Token JSON path in the GUI to this location."
             ) from e
 
+    from google.oauth2.credentials import Credentials
+
     creds: Credentials | None = None
     token_path = Path(token).expanduser()
-    if token_path.exists():
+    cache_key = str(token_path.resolve())
+    stamp = token_path.stat().st_mtime_ns if token_path.exists() else None
+    cached = _creds_cache.get(cache_key)
+    if cached and cached[0] == stamp:
+        creds = cached[1]  # same token file as the last run: skip re-reading it
+    elif token_path.exists():
         creds = Credentials.from_authorized_user_file(str(token_path), SCOPES)
 
     def needs_reconsent(c: Credentials | None) -> bool:
@@ -103,6 +534,7 @@ def load_creds(credentials="credentials.json", token="token.json") -> Credential
 
     # Try refresh if we have a refresh token
     if creds and creds.expired and creds.refresh_token:
+        from google.auth.transport.requests import Request
         try:
             creds.refresh(Request())
         except Exception:
@@ -110,15 +542,71 @@ def load_creds(credentials="credentials.json", token="token.json") -> Credential
 
     # New consent flow if needed
     if needs_reconsent(creds):
+        from google_auth_oauthlib.flow import InstalledAppFlow
         flow = InstalledAppFlow.from_client_secrets_file(credentials, SCOPES)
         creds = flow.run_local_server(port=0)
         # Try writing where the user asked; may raise PermissionError with fallback info
         _write_token_json(token, creds)
 
+    if token_path.exists():
+        _creds_cache[cache_key] = (token_path.stat().st_mtime_ns, creds)
     return creds  # type: ignore[return-value]
 
-def gmail_service(creds):   return build("gmail", "v1", credentials=creds)
-def sheets_service(creds):  return build("sheets", "v4", credentials=creds)
+_creds_cache: Dict[str, Tuple[int, Credentials]] = {}
+
+class PooledHttp:
+    """
+    Thread-safe stand-in for an httplib2.Http. Each request borrows an idle
+    AuthorizedHttp (creating one if all are busy) and returns it afterwards, so
+    TLS connections stay open across requests, threads and GUI runs.
+    """
+
+    def __init__(self, credentials, timeout: float = 60.0):
+        self.credentials = credentials
+        self.timeout = timeout
+        self._idle: List[Any] = []  # google_auth_httplib2.AuthorizedHttp
+        self._lock = threading.Lock()
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        with self._lock:
+            http = self._idle.pop() if self._idle else None
+        if http is None:
+            import httplib2
+            from google_auth_httplib2 import AuthorizedHttp
+            http = AuthorizedHttp(self.credentials, http=httplib2.Http(timeout=self.timeout))
+        try:
+            return http.request(uri, method, body=body, headers=headers, **kwargs)
+        finally:
+            with self._lock:
+                self._idle.append(http)
+
+    def close(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+        for http in idle:
+            http.close()
+
+_service_cache: Dict[Tuple[str, str, str, str], Any] = {}
+_service_lock = threading.Lock()
+
+def _service(api: str, version: str, creds):
+    """
+    Process-wide service for (api, version, account). Built once from the discovery
+    document bundled with googleapiclient (no network fetch) on top of a PooledHttp;
+    later runs in the same GUI session reuse it and its open connections.
+    """
+    key = (api, version, getattr(creds, "client_id", "") or "",
+           getattr(creds, "refresh_token", None) or getattr(creds, "token", "") or "")
+    with _service_lock:
+        svc = _service_cache.get(key)
+        if svc is None:
+            from googleapiclient.discovery import build
+            svc = build(api, version, http=PooledHttp(creds), static_discovery=True, cache_discovery=False)
+            _service_cache[key] = svc
+    return svc
+
+def gmail_service(creds):   return _service("gmail", "v1", creds)
+def sheets_service(creds):  return _service("sheets", "v4", creds)
 
 # ---------- Sheets helpers ----------
 def quote_tab(name: str) -> str:
@@ -132,8 +620,10 @@ def resolve_tab_title(ssvc, spreadsheet_id: str, preferred: str) -> str:
     """Prefer exact match, then case-insensitive, else first sheet title."""
     meta = _with_backoff(lambda: ssvc.spreadsheets().get(
         spreadsheetId=spreadsheet_id, fields="sheets.properties.title"
-    ).execute())
-    titles = [s["properties"]["title"] for s in meta.get("sheets", [])]
+    ).execute(), call="sheets.get")
+    return pick_tab_title([s["properties"]["title"] for s in meta.get("sheets", [])], preferred)
+
+def pick_tab_title(titles: List[str], preferred: str) -> str:
     if not titles:
         raise SystemExit("This spreadsheet has no tabs.")
     if preferred in titles:
@@ -150,6 +640,13 @@ def col_letter(n: int) -> str:
         s = chr(65 + r) + s
     return s
 
+def col_number(letters: str) -> int:
+    """Inverse of col_letter: 'A' -> 1, 'AA' -> 27."""
+    n = 0
+    for ch in letters.upper():
+        n = n * 26 + (ord(ch) - 64)
+    return n
+
 def get_headers_index(values: List[List[str]]) -> Tuple[List[str], Dict[str,int]]:
     """Return original-case headers and lowercased index map."""
     if not values:
@@ -158,32 +655,97 @@ def get_headers_index(values: List[List[str]]) -> Tuple[List[str], Dict[str,int]
     idx = {h.lower(): i for i, h in enumerate(headers)}
     return headers, idx
 
-def to_records(values: List[List[str]]) -> Tuple[List[Dict[str,str]], List[str]]:
-    headers, idx = get_headers_index(values)
-    headers_lc = [h.lower() for h in headers]
-    rows = []
-    for r, row in enumerate(values[1:], start=2):  # row numbers in UI are 1-based
-        rec = {h: (row[idx[h]].strip() if idx[h] < len(row) else "") for h in headers_lc}
-        rec["_row_number"] = r
-        rows.append(rec)
+class Record:
+    """
+    Read-only sheet row: a tuple of stripped cell values plus a lowercased-header ->
+    position map shared by every row of the same read, so a row costs one small
+    object instead of a dict. Supports the dict-style access the engine uses
+    (`get`, `[]`, `in`), including the `_row_number` pseudo-key.
+    """
+    __slots__ = ("_index", "_values", "_row_number")
+
+    def __init__(self, index: Dict[str, int], values: tuple, row_number: int):
+        self._index = index
+        self._values = values
+        self._row_number = row_number
+
+    def get(self, key: str, default=None):
+        if key == "_row_number":
+            return self._row_number
+        i = self._index.get(key)
+        return default if i is None else self._values[i]
+
+    def __getitem__(self, key: str):
+        if key == "_row_number":
+            return self._row_number
+        return self._values[self._index[key]]
+
+    def __contains__(self, key) -> bool:
+        return key == "_row_number" or key in self._index
+
+    def keys(self) -> List[str]:
+        return list(self._index) + ["_row_number"]
+
+    def as_dict(self) -> Dict[str, Any]:
+        d: Dict[str, Any] = {k: self._values[i] for k, i in self._index.items()}
+        d["_row_number"] = self._row_number
+        return d
+
+    def __repr__(self) -> str:
+        return f"Record({self.as_dict()!r})"
+
+def records_from_rows(headers: List[str], rows: List[List[str]], first_row: int,
+                      keys: Iterable[str] | None = None, row_numbers: Iterable[int] | None = None) -> List[Record]:
+    """
+    Turn raw sheet rows into Records keyed by lowercased header; `first_row` is the
+    sheet row of rows[0], or `row_numbers` gives each row's number. `keys` limits
+    records to those lowercased headers.
+    """
+    idx = {h.lower(): i for i, h in enumerate(headers)}
+    headers_lc = list(dict.fromkeys(keys)) if keys is not None else list(dict.fromkeys(h.lower() for h in headers))
+    positions = [idx[h] for h in headers_lc]
+    shared = {h: n for n, h in enumerate(headers_lc)}  # one index map for the whole read
+    numbers = row_numbers if row_numbers is not None else range(first_row, first_row + len(rows))
+    if not positions:
+        return [Record(shared, (), r) for r in numbers]
+    need = max(positions) + 1
+    pick = itemgetter(*positions) if len(positions) > 1 else (lambda row: (row[positions[0]],))
+    strip = str.strip
+    out = []
+    for r, row in zip(numbers, rows):  # row numbers in UI are 1-based
+        if len(row) < need:  # the API trims trailing empty cells
+            row = row + [""] * (need - len(row))
+        out.append(Record(shared, tuple(map(strip, pick(row))), r))
+    return out
+
+def to_records(values: List[List[str]]) -> Tuple[List[Record], List[str]]:
+    headers, _ = get_headers_index(values)
+    rows = records_from_rows(headers, values[1:], 2)
     return rows, headers  # records lowercased keys, headers original-case
 
-def ensure_columns(headers: List[str], needed: List[str], ssvc, spreadsheet_id: str, tab_title: str) -> List[str]:
-    """Ensure header row contains needed columns; update if missing and return new header list."""
-    headers_lc = [h.lower() for h in headers]
-    if all(c in headers_lc for c in needed):
-        return headers
+def is_yes(x: str) -> bool:
+    return (x or "").strip().lower() == "yes"
+
+def headers_with(headers: List[str], needed: List[str]) -> List[str]:
+    """Header row with any `needed` (lowercase) columns appended that are missing."""
     new_headers = headers[:]
     for c in needed:
         if c not in [h.lower() for h in new_headers]:
             new_headers.append(c)  # append using lowercased new column name
+    return new_headers
+
+def ensure_columns(headers: List[str], needed: List[str], ssvc, spreadsheet_id: str, tab_title: str) -> List[str]:
+    """Ensure header row contains needed columns; update if missing and return new header list."""
+    new_headers = headers_with(headers, needed)
+    if new_headers == headers:
+        return headers
     range_a1 = f"{quote_tab(tab_title)}!1:1"
     _with_backoff(lambda: ssvc.spreadsheets().values().update(
         spreadsheetId=spreadsheet_id,
         range=range_a1,
         valueInputOption="RAW",
         body={"values": [new_headers]}
-    ).execute())
+    ).execute(), call="sheets.values.update")
     return new_headers
 
 def write_status(ssvc, spreadsheet_id: str, tab_title: str, row_number: int,
@@ -200,212 +762,3017 @@ def write_status(ssvc, spreadsheet_id: str, tab_title: str, row_number: int,
                 {"range": rng_time,   "values": [[iso]]},
             ],
         },
-    ).execute())
+    ).execute(), call="sheets.values.batchUpdate")
 
-# ---------- Gmail helpers ----------
-def _attach(msg, filepath: str):
-    ctype, _ = mimetypes.guess_type(filepath)
-    if not ctype:
-        ctype = "application/octet-stream"
-    maintype, subtype = ctype.split("/", 1)
-    with open(filepath, "rb") as f:
-        part = MIMEBase(maintype, subtype); part.set_payload(f.read())
-    encoders.encode_base64(part)
-    filename = Path(filepath).name
-    part.add_header("Content-Disposition", f'attachment; filename="{filename}"')
-    part.add_header("Content-Type", f'{ctype}; name="{filename}"')
-    msg.attach(part)
+def _row_blocks(rows: Iterable[int]) -> List[List[int]]:
+    """Sorted row numbers grouped into runs of consecutive rows."""
+    blocks: List[List[int]] = []
+    for r in sorted(rows):
+        if blocks and r == blocks[-1][-1] + 1:
+            blocks[-1].append(r)
+        else:
+            blocks.append([r])
+    return blocks
 
-def build_mime(sender, to, subject, text, html=None, cc=None, bcc=None, reply_to=None, attachments=None):
-    msg = MIMEMultipart("mixed")
-    alt = MIMEMultipart("alternative")
+def status_ranges(qtab: str, status_col: int, time_col: int, pending: Dict[int, Tuple[str, str]]) -> List[dict]:
+    """batchUpdate `data` for {row: (status, timestamp)}, one block range per run of consecutive rows."""
+    blocks = _row_blocks(pending)
+    s_col, t_col = col_letter(status_col + 1), col_letter(time_col + 1)
+    data = []
+    for b in blocks:
+        first, last = b[0], b[-1]
+        if time_col == status_col + 1:
+            data.append({"range": f"{qtab}!{s_col}{first}:{t_col}{last}",
+                         "values": [[pending[r][0], pending[r][1]] for r in b]})
+        elif time_col == status_col - 1:
+            data.append({"range": f"{qtab}!{t_col}{first}:{s_col}{last}",
+                         "values": [[pending[r][1], pending[r][0]] for r in b]})
+        else:
+            data.append({"range": f"{qtab}!{s_col}{first}:{s_col}{last}",
+                         "values": [[pending[r][0]] for r in b]})
+            data.append({"range": f"{qtab}!{t_col}{first}:{t_col}{last}",
+                         "values": [[pending[r][1]] for r in b]})
+    return data
 
-    # Fallbacks
-    if not text and html:
-        text = _strip_html(html)
-    if not (text or html):
-        text = "(no content)"
+def column_ranges(qtab: str, col: int, values: Dict[int, str]) -> List[dict]:
+    """batchUpdate `data` writing {row: value} into one column, a block range per run of rows."""
+    letter = col_letter(col + 1)
+    return [{"range": f"{qtab}!{letter}{b[0]}:{letter}{b[-1]}", "values": [[values[r]] for r in b]}
+            for b in _row_blocks(values)]
 
-    alt.attach(MIMEText(text or "", "plain"))
-    if html:
-        alt.attach(MIMEText(html, "html"))
-    msg.attach(alt)
-    msg["From"] = sender
-    msg["To"] = to
-    msg["Subject"] = subject
-    msg["Date"] = formatdate(localtime=True)
-    msg["Message-ID"] = make_msgid()
-    if cc:
-        msg["Cc"] = cc
-    if bcc:
-        msg["Bcc"] = bcc
-    if reply_to:
-        msg["Reply-To"] = reply_to
-    for a in attachments or []:
-        if Path(a).exists():
-            _attach(msg, a)
-    raw = base64.urlsafe_b64encode(msg.as_bytes()).decode()
-    return {"raw": raw}
+class StatusWriter:
+    """
+    Buffers `(row_number, status, timestamp)` write-backs and sends them as a single
+    values.batchUpdate, merging runs of consecutive rows into block ranges (e.g.
+    `X10:Y50`). Flushes every `flush_rows` entries or `flush_secs` seconds; use it as
+    a context manager so pending rows are also flushed on cancel, errors and at the
+    end of a run. With `sender_col_index`, the sending account given to `add` is
+    written there too. `batch_update(data)` replaces the direct values.batchUpdate call
+    (e.g. a SheetWritePool shared with other tabs). Thread-safe: rows are buffered
+    under a short lock and written outside it, one flush at a time. After a failed
+    flush, automatic flushes wait `flush_secs` before trying again.
+    """
 
-def send_gmail(gsvc, body):
-    return _with_backoff(lambda: gsvc.users().messages().send(userId="me", body=body).execute())
+    def __init__(self, ssvc, spreadsheet_id: str, tab_title: str, status_col_index: int,
+                 time_col_index: int, flush_rows: int = 50, flush_secs: float = 10.0,
+                 log: Callable[[str], None] | None = None,
+                 on_flush: Callable[[List[int]], Any] | None = None,
+                 sender_col_index: int | None = None,
+                 batch_update: Callable[[List[dict]], Any] | None = None):
+        self.ssvc = ssvc
+        self.spreadsheet_id = spreadsheet_id
+        self.qtab = quote_tab(tab_title)
+        self.status_col = status_col_index
+        self.time_col = time_col_index
+        self.sender_col = sender_col_index
+        self.batch_update = batch_update or self._batch_update
+        self.flush_rows = max(1, flush_rows)
+        self.flush_secs = flush_secs
+        self.log = log
+        self.on_flush = on_flush  # called with the row numbers each successful flush wrote
+        self._pending: Dict[int, Tuple[str, str, str]] = {}
+        self._last_flush = time.monotonic()
+        self._retry_at = 0.0  # after a failed flush, no automatic retry before this
+        self._lock = threading.Lock()        # guards _pending and the timestamps
+        self._write_lock = threading.Lock()  # one batchUpdate in flight at a time
 
-def render_template(path: str, ctx: dict) -> str | None:
-    if not path:
-        return None
-    return Template(Path(path).read_text(encoding="utf-8")).render(**ctx)
+    def add(self, row_number: int, status: str = "sent", timestamp: str | None = None, sender: str = ""):
+        iso = timestamp or datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
+        with self._lock:
+            self._pending[row_number] = (status, iso, sender)
+        self.flush_if_due()
 
-# ---------- Worker ----------
-def run_sender(config: dict, logq, stop_event):
-    """Reads the sheet and (dry-)sends emails. Thread-safe via logq/stop_event."""
-    def log(msg: str):
-        logq.put(msg)
+    def flush_if_due(self):
+        now = time.monotonic()
+        with self._lock:
+            due = bool(self._pending) and now >= self._retry_at and (
+                len(self._pending) >= self.flush_rows
+                or now - self._last_flush >= self.flush_secs
+            )
+        if due and self._write_lock.acquire(blocking=False):  # else a flush is already writing
+            try:
+                self._flush()
+            finally:
+                self._write_lock.release()
 
-    try:
-        # Auth
-        log("Authorizing with Google… (browser window may open)")
-        creds = load_creds(config["credentials"], config["token"])
-        ssvc = sheets_service(creds)
-        gsvc = None if config["dry_run"] else gmail_service(creds)
+    def flush(self):
+        """Write all pending rows; on failure they stay pending and the error propagates."""
+        with self._write_lock:
+            self._flush()
 
-        # Resolve sheet & read
-        actual_tab = resolve_tab_title(ssvc, config["spreadsheet_id"], config["tab"])
-        qtab = quote_tab(actual_tab)
-        read_range = f"{qtab}!{config['read_range']}"
-        log(f"Reading {config['spreadsheet_id']} · tab '{actual_tab}' · range {config['read_range']}")
-        resp = _with_backoff(lambda: ssvc.spreadsheets().values().get(
-            spreadsheetId=config["spreadsheet_id"], range=read_range
-        ).execute())
-        values = resp.get("values", [])
-        if not values:
-            log(f"No rows found in tab '{actual_tab}' (range {config['read_range']}).")
-            return
+    def _flush(self):
+        with self._lock:
+            if not self._pending:
+                return
+            pending, self._pending = self._pending, {}
+            self._last_flush = time.monotonic()
+        try:
+            with METRICS.timed("write_status", len(pending)):
+                self.batch_update(self._ranges(pending))
+        except Exception:
+            with self._lock:
+                for r, v in pending.items():
+                    self._pending.setdefault(r, v)  # rows added since keep their newer value
+                self._retry_at = time.monotonic() + self.flush_secs
+            raise
+        if self.on_flush:
+            self.on_flush(sorted(pending))
 
-        records, headers_original_case = to_records(values)
+    def _batch_update(self, data: List[dict]):
+        _with_backoff(lambda: self.ssvc.spreadsheets().values().batchUpdate(
+            spreadsheetId=self.spreadsheet_id,
+            body={"valueInputOption": "RAW", "data": data},
+        ).execute(), call="sheets.values.batchUpdate")
 
-        # Ensure logging columns
-        headers_after = ensure_columns(headers_original_case, ["sent_status", "sent_at"], ssvc, config["spreadsheet_id"], actual_tab)
-        hdr_index = {h.lower(): i for i, h in enumerate(headers_after)}  # robust lowercased index
+    def _ranges(self, pending: Dict[int, Tuple[str, str, str]]) -> List[dict]:
+        data = status_ranges(self.qtab, self.status_col, self.time_col, pending)
+        senders = {r: v[2] for r, v in pending.items() if v[2]}
+        if self.sender_col is not None and senders:
+            data += column_ranges(self.qtab, self.sender_col, senders)
+        return data
 
-        # Validate required columns
-        required = {"email", "name", "role", "company"}
-        missing = [c for c in required if c not in hdr_index]
-        if missing:
-            log(f"ERROR: Missing required columns in '{actual_tab}': {', '.join(missing)}")
-            return
+    def __enter__(self):
+        return self
 
-        # Build eligible list (respect send==yes if present, skip==yes, and skip already sent)
-        def is_yes(x: str) -> bool: return (x or "").strip().lower() == "yes"
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.flush()
+        except Exception as e:
+            if self.log:
+                rows = ", ".join(str(r) for r in sorted(self._pending))
+                self.log(f"   Error: could not record sent_status for row(s) {rows}: {e}")
+            if exc_type is None:
+                raise
+        return False
 
-        eligible = []
-        for rec in records:
-            if is_yes(rec.get("skip", "")):
+# ---------- Paged reading ----------
+DEFAULT_PAGE_ROWS = 2000
+
+_A1_RANGE = re.compile(r"^([A-Za-z]*)(\d*)(?::([A-Za-z]*)(\d*))?$")
+_END = object()
+
+def split_a1(read_range: str) -> Tuple[str, int, str, int | None]:
+    """'A:Z' -> ('A', 1, 'Z', None); 'B2:F500' -> ('B', 2, 'F', 500)."""
+    m = _A1_RANGE.match(read_range.strip())
+    if not m:
+        raise SystemExit(f"Unsupported read range '{read_range}'. Use A1 notation like A:Z or A1:Z500.")
+    c1, r1, c2, r2 = m.groups()
+    return c1.upper(), int(r1 or 1), (c2 or c1).upper(), (int(r2) if r2 else None)
+
+def sheet_row_count(ssvc, spreadsheet_id: str, tab_title: str) -> int:
+    """Grid row count of a tab (0 if unknown)."""
+    meta = _with_backoff(lambda: ssvc.spreadsheets().get(
+        spreadsheetId=spreadsheet_id, fields="sheets.properties(title,gridProperties.rowCount)"
+    ).execute(), call="sheets.get")
+    for sh in meta.get("sheets", []):
+        props = sh.get("properties", {})
+        if props.get("title") == tab_title:
+            return int(props.get("gridProperties", {}).get("rowCount", 0))
+    return 0
+
+def read_header_row(ssvc, spreadsheet_id: str, tab_title: str, read_range: str) -> Tuple[List[str], int]:
+    """Fetch only the header row of `read_range`; returns (headers, header row number)."""
+    c1, r1, c2, _ = split_a1(read_range)
+    rng = f"{quote_tab(tab_title)}!{c1}{r1}:{c2}{r1}"
+    resp = _with_backoff(lambda: ssvc.spreadsheets().values().get(
+        spreadsheetId=spreadsheet_id, range=rng
+    ).execute(), call="sheets.values.get")
+    values = resp.get("values", [])
+    return ([str(h).strip() for h in values[0]] if values else []), r1
+
+def _prefetch(iterable, depth: int = 2):
+    """Iterate `iterable` on a background thread, staying up to `depth` items ahead."""
+    q: queue.Queue = queue.Queue(maxsize=depth)
+    done = threading.Event()
+
+    def put(item) -> bool:
+        while not done.is_set():
+            try:
+                q.put(item, timeout=0.2)
+                return True
+            except queue.Full:
                 continue
-            if "send" in hdr_index and not is_yes(rec.get("send", "")):
+        return False
+
+    def pump():
+        try:
+            for item in iterable:
+                if not put((item, None)):
+                    return
+            put((_END, None))
+        except BaseException as e:
+            put((_END, e))
+
+    threading.Thread(target=pump, daemon=True, name="rejections-prefetch").start()
+    try:
+        while True:
+            item, err = q.get()
+            if item is _END:
+                if err is not None:
+                    raise err
+                return
+            yield item
+    finally:
+        done.set()
+
+def _column_spans(columns: Iterable[int]) -> List[Tuple[int, int]]:
+    """[0, 1, 2, 5, 7, 8] -> [(0, 2), (5, 5), (7, 8)]"""
+    spans: List[Tuple[int, int]] = []
+    for c in sorted(set(columns)):
+        if spans and c == spans[-1][1] + 1:
+            spans[-1] = (spans[-1][0], c)
+        else:
+            spans.append((c, c))
+    return spans
+
+def _fetch_columns(ssvc, spreadsheet_id: str, qtab: str, base_col: int, spans: List[Tuple[int, int]],
+                   first: int, stop: int) -> List[List[str]]:
+    """batchGet only the column `spans` of rows first..stop, re-assembled at their original offsets."""
+    ranges = [f"{qtab}!{col_letter(base_col + a)}{first}:{col_letter(base_col + b)}{stop}" for a, b in spans]
+    resp = _with_backoff(lambda: ssvc.spreadsheets().values().batchGet(
+        spreadsheetId=spreadsheet_id, ranges=ranges
+    ).execute(), call="sheets.values.batchGet")
+    parts = [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+    height = max((len(v) for v in parts), default=0)  # each range trims its own trailing blanks
+    width = spans[-1][1] + 1
+    rows = []
+    for k in range(height):
+        row = [""] * width
+        for (a, b), vals in zip(spans, parts):
+            if k < len(vals):
+                row[a:a + len(vals[k])] = vals[k][:b - a + 1]
+        rows.append(row)
+    return rows
+
+def iter_sheet_pages(ssvc, spreadsheet_id: str, tab_title: str, read_range: str, *,
+                     start_row: int, page_rows: int = DEFAULT_PAGE_ROWS, prefetch: bool = True,
+                     columns: Iterable[int] | None = None,
+                     skip_window: Callable[[Any, int, int], bool] | None = None,
+                     row_count: int | None = None):
+    """
+    Yield `(first_row_number, rows)` windows of `page_rows` rows from `start_row` to the
+    end of `read_range` (or the tab). With `prefetch`, the next pages are fetched on a
+    background thread while the caller works, so `ssvc` must not be shared with it.
+
+    `columns` (0-based offsets within the range) projects the read: only those columns
+    are fetched via values.batchGet, and other cells in the yielded rows are "".
+
+    `skip_window(ssvc, first, stop)` may return True to leave a window unread (it runs
+    on the fetching thread and may use `ssvc` for a cheaper probe).
+
+    `row_count` is the tab's grid size if the caller already knows it (saves a
+    spreadsheets.get for ranges without an end row). Grids usually run well past the
+    data, so the read also ends at the first window with no values in it.
+    """
+    c1, _, c2, end_row = split_a1(read_range)
+    qtab = quote_tab(tab_title)
+    page_rows = max(1, page_rows)
+    spans = _column_spans(columns) if columns is not None else None
+    base_col = col_number(c1 or "A")
+
+    def pages():
+        last = end_row or row_count or sheet_row_count(ssvc, spreadsheet_id, tab_title) or None
+        first = start_row
+        while last is None or first <= last:
+            stop = first + page_rows - 1 if last is None else min(last, first + page_rows - 1)
+            if skip_window is not None and skip_window(ssvc, first, stop):
+                first = stop + 1
                 continue
-            if (rec.get("sent_status","").strip().lower() == "sent"):
+            if spans:
+                rows = _fetch_columns(ssvc, spreadsheet_id, qtab, base_col, spans, first, stop)
+            else:
+                rng = f"{qtab}!{c1}{first}:{c2}{stop}"
+                resp = _with_backoff(lambda: ssvc.spreadsheets().values().get(
+                    spreadsheetId=spreadsheet_id, range=rng
+                ).execute(), call="sheets.values.get")
+                rows = resp.get("values", [])
+            if not rows:
+                return  # the first empty window ends the read, even if the grid goes on
+            yield first, rows
+            first = stop + 1
+
+    return _prefetch(pages()) if prefetch else pages()
+
+# ---------- Send ledger ----------
+def default_ledger_path() -> Path:
+    return Path.home() / ".rejections_gui" / "send_ledger.sqlite3"
+
+class SendLedger:
+    """
+    Local SQLite record of successful sends keyed by spreadsheet, tab, row and recipient
+    email (so shifted rows are detected rather than overwritten). A send is recorded as
+    soon as Gmail accepts it; `synced` is set once its sent_status write-back reached
+    the sheet. Re-runs use it to skip fully-sent row windows and to recover sends whose
+    write-back was lost. `sender` is the account that sent it, for per-account daily
+    quotas. Thread-safe.
+    """
+
+    def __init__(self, path: str | Path):
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS sends ("
+                " spreadsheet_id TEXT NOT NULL, tab TEXT NOT NULL, row_number INTEGER NOT NULL,"
+                " email TEXT NOT NULL, sent_at TEXT NOT NULL, synced INTEGER NOT NULL DEFAULT 0,"
+                " PRIMARY KEY (spreadsheet_id, tab, row_number, email))"
+            )
+            cols = {row[1] for row in self._db.execute("PRAGMA table_info(sends)")}
+            if "sender" not in cols:  # ledgers from before sender sharding
+                try:
+                    self._db.execute("ALTER TABLE sends ADD COLUMN sender TEXT NOT NULL DEFAULT ''")
+                except sqlite3.OperationalError as e:
+                    if "duplicate column" not in str(e):  # else another connection (campaign job) added it
+                        raise
+            self._db.execute("CREATE INDEX IF NOT EXISTS sends_by_sender ON sends (sender)")
+
+    def entries(self, spreadsheet_id: str, tab: str) -> List[Tuple[int, str, str, bool]]:
+        """(row_number, email, sent_at, synced) for every send recorded on one tab."""
+        with self._lock:
+            cur = self._db.execute(
+                "SELECT row_number, email, sent_at, synced FROM sends WHERE spreadsheet_id=? AND tab=?",
+                (spreadsheet_id, tab),
+            )
+            return [(r, e, at, bool(sy)) for r, e, at, sy in cur.fetchall()]
+
+    def record(self, spreadsheet_id: str, tab: str, row_number: int, email: str, sent_at: str | None = None,
+               sender: str = ""):
+        iso = sent_at or datetime.now(timezone.utc).astimezone().isoformat(timespec="seconds")
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO sends (spreadsheet_id, tab, row_number, email, sent_at, synced, sender)"
+                " VALUES (?, ?, ?, ?, ?, 0, ?)",
+                (spreadsheet_id, tab, row_number, email.lower(), iso, sender.lower()),
+            )
+
+    def sent_by(self, sender: str, hours: float = 24.0) -> int:
+        """Sends recorded for `sender` (on any sheet) in the last `hours` -- Gmail's quota window."""
+        since = datetime.now(timezone.utc).timestamp() - hours * 3600
+        with self._lock:
+            stamps = self._db.execute("SELECT sent_at FROM sends WHERE sender=?", (sender.lower(),)).fetchall()
+        n = 0
+        for (at,) in stamps:
+            try:
+                n += datetime.fromisoformat(at).timestamp() >= since
+            except ValueError:
                 continue
-            if not (rec.get("email") and rec.get("name") and rec.get("role") and rec.get("company")):
+        return n
+
+    def email_index(self, spreadsheet_id: str, tab: str, *, everywhere: bool = False) -> Dict[int, int]:
+        """
+        email_key -> row for sends confirmed on this tab; with `everywhere`, sends from
+        other tabs and spreadsheets too (as row 0). Unconfirmed sends on this tab are
+        left out: run_sender recovers those.
+        """
+        sql = "SELECT spreadsheet_id, tab, row_number, email, synced FROM sends"
+        args: tuple = ()
+        if not everywhere:
+            sql += " WHERE spreadsheet_id=? AND tab=?"
+            args = (spreadsheet_id, tab)
+        with self._lock:
+            rows = self._db.execute(sql, args).fetchall()
+        index: Dict[int, int] = {}
+        for sid, t, r, email, synced in rows:
+            here = sid == spreadsheet_id and t == tab
+            if here and not synced:
                 continue
-            eligible.append(rec)
+            key = email_key(email)
+            if here or key not in index:
+                index[key] = r if here else 0
+        return index
 
-        total_eligible = len(eligible)
-        if total_eligible == 0:
-            log("No eligible rows to process.")
-            return
+    def mark_synced(self, spreadsheet_id: str, tab: str, rows: Iterable[int]):
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE sends SET synced=1 WHERE spreadsheet_id=? AND tab=? AND row_number=?",
+                [(spreadsheet_id, tab, r) for r in rows],
+            )
 
-        # Preview limit
-        preview_n = int(float(config.get("preview_n") or 0))
-        if preview_n > 0:
-            eligible = eligible[:preview_n]
-            total_eligible = len(eligible)
-            log(f"Preview mode: limiting to first {total_eligible} row(s).")
-
-        # Test send mode: send only first eligible row to self, prefix subject
-        test_to_self = bool(config.get("test_to_self"))
-        if test_to_self:
-            eligible = eligible[:1]
-            total_eligible = len(eligible)
-            log("Test mode: sending first eligible row to Sender address (Bcc/Cc suppressed).")
+    def rekey(self, spreadsheet_id: str, tab: str, moves: List[Tuple[int, int, str]]):
+        """Re-key `(old_row, new_row, email)` entries whose rows shifted (e.g. rows inserted above)."""
+        with self._lock, self._db:
+            self._db.executemany(
+                "UPDATE OR REPLACE sends SET row_number=?"
+                " WHERE spreadsheet_id=? AND tab=? AND row_number=? AND email=?",
+                [(new, spreadsheet_id, tab, old, email) for old, new, email in moves if old != new],
+            )
 
-        # Optional per-domain cooldown
-        last_domain_at: Dict[str, float] = {}
-        domain_cooldown = float(config.get("domain_throttle") or 0.0)
+    def close(self):
+        with self._lock:
+            self._db.close()
 
-        sent_ok = 0
-        for i, rec in enumerate(eligible, start=1):
-            if stop_event.is_set():
-                log("Cancelled by user.")
-                break
+_WAIT = object()
+
+class LedgerRecovery:
+    """
+    Sends the ledger has on one tab whose sent_status never reached the sheet. `split`
+    drops the records that are such a send: the same row and email or, for a row that
+    moved (rows inserted or deleted above it), the same email where the ledger's row no
+    longer holds it. Each ledger entry matches one row at most, so another row for the
+    same candidate (a second role) is still sent. A row that may have moved from a row
+    not read yet is held back until `release`, after the last page. Every page's raw
+    rows go through `observe` before its records reach `split`.
+    """
+
+    def __init__(self, entries: List[Tuple[int, str, str, bool]], email_col: int):
+        self.unsynced = {(r, e): at for r, e, at, synced in entries if not synced}  # (row, email) -> sent_at
+        self.by_email: Dict[str, List[int]] = {}
+        for r, e in sorted(self.unsynced):
+            self.by_email.setdefault(e, []).append(r)
+        self.email_col = email_col
+        self.current: Dict[int, str] = {}         # ledger row -> email it holds now
+        self.claimed: Dict[Tuple[int, str], int] = {}  # ledger entry -> row it was matched to
+        self.held: List[Record] = []
+
+    def __len__(self) -> int:
+        return len(self.unsynced)
 
-            email = rec.get("email", "").strip()
-            name = rec.get("name", "").strip()
-            role = rec.get("role", "").strip()
-            company = rec.get("company", "").strip()
-
-            ctx = {
-                "email": email, "name": name, "role": role, "company": company,
-                "stage": rec.get("stage", ""),
-                "reason": rec.get("reason", ""),
-                "application_date": rec.get("application_date", ""),
-                "sender_name": os.environ.get("SENDER_NAME", config.get("sender_name") or "Recruiting Team"),
-                "sender_title": os.environ.get("SENDER_TITLE", config.get("sender_title") or "Talent Acquisition"),
-            }
-
-            subject_base = Template(config["subject"]).render(**ctx)
-            subject = f"[TEST] {subject_base}" if test_to_self else subject_base
-
-            text = render_template(config.get("text_template") or "", ctx)
-            html = render_template(config.get("html_template") or "", ctx) if config.get("html_template") else None
-
-            # template guard
-            if not ((text and text.strip()) or (html and _strip_html(html))):
-                log(f"   Error: rendered templates are empty; skipping {email or '(no email)'}")
-                logq.put(f"__PROG__{i}/{total_eligible}")
+    def observe(self, first_row: int, rows: List[List[str]]):
+        col = self.email_col
+        for r, _ in self.unsynced:
+            if first_row <= r < first_row + len(rows):
+                row = rows[r - first_row]
+                self.current[r] = row[col].strip().lower() if col < len(row) else ""
+
+    def _moved_from(self, row: int, email: str, final: bool):
+        """Ledger row this row's send moved from, None, or _WAIT while that is unknown."""
+        wait = False
+        for old in self.by_email[email]:
+            if old == row or (old, email) in self.claimed:
+                continue
+            now = self.current.get(old)
+            if now is None and not final:
+                wait = True
+            elif now != email:
+                return old
+        return _WAIT if wait else None
+
+    def split(self, records: List[Record], final: bool = False) -> List[Record]:
+        """The records to send; earlier sends are claimed, rows that might be one are held."""
+        out = []
+        for rec in records:
+            email = rec.get("email", "").lower()
+            if email not in self.by_email:
+                out.append(rec)
                 continue
+            row = rec["_row_number"]
+            if (row, email) in self.unsynced and (row, email) not in self.claimed:
+                self.claimed[(row, email)] = row
+                continue
+            old = self._moved_from(row, email, final)
+            if old is _WAIT:
+                self.held.append(rec)
+            elif old is not None:
+                self.claimed[(old, email)] = row
+            else:
+                out.append(rec)
+        return out
+
+    def release(self) -> List[Record]:
+        """Held records once every page was read; a ledger row never read counts as moved."""
+        held, self.held = self.held, []
+        return self.split(held, final=True)
+
+    def recovered(self) -> List[Tuple[int, int, str, str]]:
+        """(ledger row, current row, email, sent_at) for every claimed send."""
+        return [(old, row, e, self.unsynced[(old, e)]) for (old, e), row in sorted(self.claimed.items())]
+
+def ledger_window_skipper(synced_rows: Dict[int, set], spreadsheet_id: str, tab_title: str,
+                          base_col: int, email_col: int, status_col: int):
+    """
+    `skip_window` hook for iter_sheet_pages. `synced_rows` maps row -> emails whose
+    sends were confirmed in the sheet; a window made only of such rows is verified with a
+    narrow email/sent_status probe instead of a full read.
+    """
+    spans = _column_spans([email_col, status_col])
+    qtab = quote_tab(tab_title)
+
+    def skip(ssvc, first: int, stop: int) -> bool:
+        if not all(r in synced_rows for r in range(first, stop + 1)):
+            return False
+        probe = _fetch_columns(ssvc, spreadsheet_id, qtab, base_col, spans, first, stop)
+        for k, r in enumerate(range(first, stop + 1)):
+            row = probe[k] if k < len(probe) else []
+            email = row[email_col].strip().lower() if email_col < len(row) else ""
+            status = row[status_col].strip().lower() if status_col < len(row) else ""
+            if email not in synced_rows[r] or status != "sent":
+                return False  # edited, cleared or shifted since: read it properly
+        return True
+
+    return skip
 
-            to_addr = config["sender"] if test_to_self else email
-            bcc = None if test_to_self else (config.get("bcc") or None)
-            cc  = None if test_to_self else (config.get("cc") or None)
+# ---------- Sheet snapshots ----------
+SNAPSHOT_MAX_AGE = 600.0       # seconds a snapshot's cell contents are trusted without a full re-read
+SNAPSHOT_PROBE_PAGES = 4       # a snapshot probe covers this many read pages per request
+SNAPSHOT_KEEP_DAYS = 7         # snapshots older than this are dropped when the cache is opened
 
-            body = build_mime(
-                sender=config["sender"], to=to_addr, subject=subject,
-                text=text, html=html, cc=cc, bcc=bcc, reply_to=(config.get("reply_to") or None),
-                attachments=config.get("attachments") or []
+def default_snapshot_path() -> Path:
+    return Path.home() / ".rejections_gui" / "sheet_snapshots.sqlite3"
+
+class SheetSnapshots:
+    """
+    Local SQLite cache of tab reads keyed by spreadsheet, tab and read range: the
+    header, the column projection and the rows as last read (zlib-compressed JSON),
+    with the time their contents were read. Thread-safe.
+    """
+
+    def __init__(self, path: str | Path):
+        path = Path(path).expanduser()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self._db = sqlite3.connect(str(path), check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS snapshots ("
+                " spreadsheet_id TEXT NOT NULL, tab TEXT NOT NULL, read_range TEXT NOT NULL,"
+                " header TEXT NOT NULL, columns TEXT NOT NULL, start_row INTEGER NOT NULL,"
+                " rows BLOB NOT NULL, content_at REAL NOT NULL,"
+                " PRIMARY KEY (spreadsheet_id, tab, read_range))"
             )
+            self._db.execute("DELETE FROM snapshots WHERE content_at < ?",
+                             (time.time() - SNAPSHOT_KEEP_DAYS * 86400,))
 
-            log(f"[{i}/{total_eligible}] {'DRY' if config['dry_run'] else ('TEST' if test_to_self else 'SEND')} → {to_addr} | CC: {cc or '-'} | BCC: {bcc or '-'} | {subject}")
-            logq.put(f"__PROG__{i}/{total_eligible}")
+    def get(self, spreadsheet_id: str, tab: str, read_range: str) -> dict | None:
+        with self._lock:
+            row = self._db.execute(
+                "SELECT header, columns, start_row, rows, content_at FROM snapshots"
+                " WHERE spreadsheet_id=? AND tab=? AND read_range=?", (spreadsheet_id, tab, read_range)
+            ).fetchone()
+        if row is None:
+            return None
+        header, columns, start_row, rows, content_at = row
+        return {"header": json.loads(header), "columns": json.loads(columns), "start_row": start_row,
+                "rows": json.loads(zlib.decompress(rows)), "content_at": content_at}
 
-            if config["dry_run"]:
-                continue
+    def put(self, spreadsheet_id: str, tab: str, read_range: str, *, header: List[str],
+            columns: List[int] | None, start_row: int, rows: List[List[str]], content_at: float):
+        blob = zlib.compress(json.dumps(rows, separators=(",", ":")).encode("utf-8"), 6)
+        with self._lock, self._db:
+            self._db.execute(
+                "INSERT OR REPLACE INTO snapshots VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (spreadsheet_id, tab, read_range, json.dumps(header), json.dumps(columns), start_row, blob, content_at),
+            )
 
-            # per-domain cooldown
-            if domain_cooldown:
-                domain = (to_addr.split("@")[-1] if "@" in to_addr else "").lower()
-                now = time.time()
-                last = last_domain_at.get(domain)
-                if last is not None:
-                    dt = now - last
-                    if dt < domain_cooldown:
-                        time.sleep(domain_cooldown - dt)
-                last_domain_at[domain] = time.time()
+    def close(self):
+        with self._lock:
+            self._db.close()
 
-            try:
-                send_gmail(gsvc, body)
-                if not test_to_self:
-                    write_status(
-                        ssvc=ssvc, spreadsheet_id=config["spreadsheet_id"], tab_title=actual_tab,
-                        row_number=rec["_row_number"],
-                        status_col_index=hdr_index["sent_status"],
-                        time_col_index=hdr_index["sent_at"]
-                    )
-                sent_ok += 1
-                time.sleep(float(config.get("throttle", 2.0)))
-            except Exception as e:
-                log(f"   Error: {e}")
+def snapshot_pages(snapshots: SheetSnapshots, ssvc, spreadsheet_id: str, tab_title: str, read_range: str, *,
+                   header: List[str], start_row: int, control: Dict[str, int], log: Callable[[str], None],
+                   page_rows: int = DEFAULT_PAGE_ROWS, columns: Iterable[int] | None = None,
+                   row_count: int | None = None, max_age: float = SNAPSHOT_MAX_AGE):
+    """
+    iter_sheet_pages through a snapshot cache. Without a usable snapshot (none yet,
+    header or projection changed, or contents older than `max_age`) the tab is read in
+    full and saved. Otherwise only the `control` columns are read: `email` and
+    whichever of `send`, `skip` and `sent_status` exist (0-based offsets within the
+    range). Rows whose email changed and rows that pass those gates, so may be
+    emailed, are re-read in full; rows past the snapshot are fetched as appended.
+    Only rows the gates exclude keep their other cells from the snapshot, which never
+    reach a message. The snapshot is saved when the pages are read to the end. Pages
+    are prefetched as in iter_sheet_pages.
+    """
+    c1, _, c2, end_row = split_a1(read_range)
+    qtab = quote_tab(tab_title)
+    base_col = col_number(c1 or "A")
+    columns = sorted(set(columns)) if columns is not None else None
+    spans = _column_spans(columns) if columns is not None else None
+    control_spans = _column_spans(control.values())
+    email_col = control["email"]
+    snap = snapshots.get(spreadsheet_id, tab_title, read_range)
+    if snap is not None and not (snap["header"] == header and snap["columns"] == columns
+                                 and snap["start_row"] == start_row
+                                 and time.time() - snap["content_at"] <= max_age):
+        snap = None
 
-        log(f"Done. Processed {len(eligible)} eligible rows in this run. {'Sent ' + str(sent_ok) if not config['dry_run'] else 'No emails sent (dry run).' }")
-    except Exception as e:
-        # Any PermissionError from token writing or other exceptions surface here
-        logq.put(f"FATAL: {e}")
+    def fetch(first: int, stop: int) -> List[List[str]]:
+        if spans:
+            return _fetch_columns(ssvc, spreadsheet_id, qtab, base_col, spans, first, stop)
+        rng = f"{qtab}!{c1}{first}:{c2}{stop}"
+        return _with_backoff(lambda: ssvc.spreadsheets().values().get(
+            spreadsheetId=spreadsheet_id, range=rng
+        ).execute(), call="sheets.values.get").get("values", [])
+
+    def save(rows: List[List[str]], content_at: float):
+        while rows and not any(rows[-1]):
+            rows.pop()
+        snapshots.put(spreadsheet_id, tab_title, read_range, header=header, columns=columns,
+                      start_row=start_row, rows=rows, content_at=content_at)
+
+    def full():
+        content_at = time.time()
+        rows_all: List[List[str]] = []
+        for first, rows in iter_sheet_pages(ssvc, spreadsheet_id, tab_title, read_range, start_row=start_row,
+                                            page_rows=page_rows, prefetch=False, columns=columns,
+                                            row_count=row_count):
+            rows_all.extend([[]] * (first - start_row - len(rows_all)))
+            rows_all.extend(rows)
+            yield first, rows
+        save(rows_all, content_at)
+        log(f"Sheet snapshot saved: {len(rows_all)} row(s); the next run reads only what changed or is still to send.")
+
+    def cell(row: List[str], c: int) -> str:
+        return row[c] if c < len(row) else ""
+
+    def gated_out(row: List[str]) -> bool:
+        """True if the send/skip/sent_status gates exclude the row, so its other cells go unused."""
+        if "sent_status" in control and cell(row, control["sent_status"]).strip().lower() == "sent":
+            return True
+        if "skip" in control and is_yes(cell(row, control["skip"])):
+            return True
+        return "send" in control and not is_yes(cell(row, control["send"]))
+
+    def delta():
+        cached = snap["rows"]
+        last = end_row or row_count or sheet_row_count(ssvc, spreadsheet_id, tab_title) or None
+        window = max(1, page_rows) * SNAPSHOT_PROBE_PAGES
+        merged: List[List[str]] = []
+        reused = reread = appended = 0
+        first = start_row
+        while last is None or first <= last:
+            stop = first + window - 1 if last is None else min(last, first + window - 1)
+            offset = first - start_row
+            if offset >= len(cached):  # past the snapshot: new rows
+                rows = fetch(first, stop)
+                if not rows:
+                    break  # end of the data, as in iter_sheet_pages
+                appended += sum(1 for r in rows if any(r))
+            else:
+                probe = _fetch_columns(ssvc, spreadsheet_id, qtab, base_col, control_spans, first, stop)
+                rows, changed = [], []
+                for k in range(stop - first + 1):
+                    old = cached[offset + k] if offset + k < len(cached) else []
+                    now = probe[k] if k < len(probe) else []
+                    if (cell(old, email_col).strip().lower() != cell(now, email_col).strip().lower()
+                            or not gated_out(now)):
+                        changed.append(k)
+                        rows.append(old)
+                        continue
+                    reused += offset + k < len(cached)
+                    row = list(old)
+                    for c in control.values():
+                        if c < len(row) or cell(now, c):
+                            row.extend([""] * (c + 1 - len(row)))
+                            row[c] = cell(now, c)
+                    rows.append(row)
+                if changed:  # rows that moved, changed or may be emailed: re-read that stretch
+                    fresh = fetch(first + changed[0], first + changed[-1])
+                    for k in range(changed[0], changed[-1] + 1):
+                        j = k - changed[0]
+                        rows[k] = fresh[j] if j < len(fresh) else []
+                    changed_set = set(changed)
+                    for k in range(changed[0], changed[-1] + 1):
+                        if offset + k >= len(cached):
+                            appended += any(rows[k])
+                        else:
+                            reread += 1
+                            reused -= k not in changed_set
+                while rows and not any(rows[-1]) and offset + len(rows) > len(cached):
+                    rows.pop()  # blank grid rows past the snapshot
+            merged.extend([[]] * (offset - len(merged)))
+            merged.extend(rows)
+            yield first, rows
+            first = stop + 1
+        save(merged, snap["content_at"])
+        METRICS.count("rows_from_snapshot", reused)
+        log(f"Sheet snapshot from {_fmt_duration(time.time() - snap['content_at'])} ago: {reused} row(s) reused, "
+            f"{reread} re-read (changed or still to send), {appended} new.")
+
+    return _prefetch(delta() if snap is not None else full())
+
+# ---------- Attachments ----------
+MMAP_THRESHOLD = 1 << 20  # attachments at least this large are read through mmap
+
+# (resolved path, size, mtime_ns) -> complete MIME part (headers + base64 payload) as bytes
+_attachment_cache: Dict[Tuple[str, int, int], bytes] = {}
+_attachment_lock = threading.Lock()
+
+def _read_and_encode(path: Path, size: int) -> bytes:
+    with open(path, "rb") as f:
+        if size >= MMAP_THRESHOLD:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                return base64.encodebytes(mm)
+        return base64.encodebytes(f.read())
+
+def prepared_attachment(filepath: str) -> bytes:
+    """
+    Return the serialized MIME part for `filepath`, reading, type-detecting and
+    base64-encoding the file only once per (path, size, mtime). Every message that
+    attaches it reuses the same bytes.
+    """
+    path = Path(filepath).expanduser().resolve()
+    st = path.stat()
+    key = (str(path), st.st_size, st.st_mtime_ns)
+    with _attachment_lock:
+        part = _attachment_cache.get(key)
+        if part is not None:
+            return part
+
+    ctype, _ = mimetypes.guess_type(filepath)
+    if not ctype:
+        ctype = "application/octet-stream"
+    filename = path.name.replace('"', "")
+    part = b"".join([
+        _header("Content-Type", f'{ctype}; name="{filename}"'),
+        b"MIME-Version: 1.0\n",
+        b"Content-Transfer-Encoding: base64\n",
+        _header("Content-Disposition", f'attachment; filename="{filename}"'),
+        b"\n",
+        _read_and_encode(path, st.st_size),
+    ])
+
+    with _attachment_lock:
+        # Drop stale encodings of the same file (edited between GUI runs)
+        for k in [k for k in _attachment_cache if k[0] == key[0]]:
+            del _attachment_cache[k]
+        _attachment_cache[key] = part
+    return part
+
+# ---------- Gmail helpers ----------
+# Messages at least this large are sent as a media upload (raw RFC 822 bytes)
+# instead of a base64url string inside the JSON body.
+MEDIA_UPLOAD_THRESHOLD = 4 << 20
+
+_HEADER_POLICY = email_policy.default.clone(refold_source="all")
+
+def _header(name: str, value: str) -> bytes:
+    """One header line; only non-ASCII, long or multi-line values go through the email package."""
+    line = f"{name}: {value}\n"
+    if len(line) <= 78 and line.isascii() and "\r" not in value and "\n" not in value:
+        return line.encode("ascii")
+    return _HEADER_POLICY.fold(name, value).encode("ascii")
+
+def _text_part(content: str, subtype: str) -> List[bytes]:
+    # Same encodings the email package picks: 7bit for ASCII text, else base64 UTF-8
+    if content.isascii():
+        return [f'Content-Type: text/{subtype}; charset="us-ascii"\nMIME-Version: 1.0\n'
+                f"Content-Transfer-Encoding: 7bit\n\n".encode("ascii"), content.encode("ascii"), b"\n"]
+    return [f'Content-Type: text/{subtype}; charset="utf-8"\nMIME-Version: 1.0\n'
+            f"Content-Transfer-Encoding: base64\n\n".encode("ascii"), base64.encodebytes(content.encode("utf-8"))]
+
+def build_message(sender, to, subject, text, html=None, cc=None, bcc=None, reply_to=None,
+                  attachments=None) -> bytes:
+    """
+    The RFC 822 message as bytes: multipart/mixed holding a text/HTML alternative
+    and the attachments. Parts are written straight to a list of byte chunks (the
+    attachment chunks are the cached bytes) and joined once.
+    """
+    # Fallbacks
+    if not text and html:
+        text = _strip_html(html)
+    if not (text or html):
+        text = "(no content)"
+
+    outer = f"==============={random.getrandbits(64):020d}=="
+    inner = f"==============={random.getrandbits(64):020d}=="
+    chunks = [
+        f'Content-Type: multipart/mixed; boundary="{outer}"\nMIME-Version: 1.0\n'.encode("ascii"),
+        _header("From", sender),
+        _header("To", to),
+        _header("Subject", subject),
+        _header("Date", formatdate(localtime=True)),
+        _header("Message-ID", make_msgid()),
+    ]
+    if cc:
+        chunks.append(_header("Cc", cc))
+    if bcc:
+        chunks.append(_header("Bcc", bcc))
+    if reply_to:
+        chunks.append(_header("Reply-To", reply_to))
+    chunks.append(f'\n--{outer}\nContent-Type: multipart/alternative; boundary="{inner}"\n'
+                  f"MIME-Version: 1.0\n\n--{inner}\n".encode("ascii"))
+    chunks += _text_part(text or "", "plain")
+    if html:
+        chunks.append(f"--{inner}\n".encode("ascii"))
+        chunks += _text_part(html, "html")
+    chunks.append(f"--{inner}--\n".encode("ascii"))
+    for a in attachments or []:
+        if Path(a).exists():
+            chunks.append(f"--{outer}\n".encode("ascii"))
+            chunks.append(prepared_attachment(a))
+    chunks.append(f"--{outer}--\n".encode("ascii"))
+    return b"".join(chunks)
+
+_B64_CHUNK = 3 << 14  # a multiple of 3, so chunks encode without padding
+
+def _b64url_buffer(data: bytes) -> bytes | bytearray:
+    """base64url of `data` in one preallocated buffer (urlsafe_b64encode makes two full copies)."""
+    if len(data) <= _B64_CHUNK:
+        return base64.urlsafe_b64encode(data)
+    view = memoryview(data)
+    out = bytearray((len(data) + 2) // 3 * 4)
+    pos = 0
+    for i in range(0, len(data), _B64_CHUNK):
+        enc = base64.urlsafe_b64encode(view[i:i + _B64_CHUNK])
+        out[pos:pos + len(enc)] = enc
+        pos += len(enc)
+    return out
+
+def build_mime(sender, to, subject, text, html=None, cc=None, bcc=None, reply_to=None, attachments=None):
+    # The message bytes are released as soon as they're encoded, before the str copy
+    encoded = _b64url_buffer(build_message(sender, to, subject, text, html, cc, bcc, reply_to, attachments))
+    return {"raw": encoded.decode("ascii")}
+
+def message_size(body: dict) -> int:
+    """Bytes of the RFC 822 message inside a message_body/build_mime body."""
+    return len(body["media"]) if "media" in body else len(body["raw"]) * 3 // 4
+
+def send_gmail(gsvc, body, *, breaker: CircuitBreaker | None = None, stop_event=None):
+    with METRICS.timed("send"):
+        if "media" in body:
+            from googleapiclient.http import MediaInMemoryUpload
+            media = MediaInMemoryUpload(body["media"], mimetype="message/rfc822", resumable=False)
+            resp = _with_backoff(lambda: gsvc.users().messages().send(userId="me", media_body=media).execute(),
+                                 call="gmail.send.media", breaker=breaker, stop_event=stop_event)
+        else:
+            resp = _with_backoff(lambda: gsvc.users().messages().send(userId="me", body=body).execute(),
+                                 call="gmail.send", breaker=breaker, stop_event=stop_event)
+    METRICS.count("messages_sent")
+    METRICS.count("bytes_sent", message_size(body))
+    return resp
+
+GMAIL_BATCH_LIMIT = 100  # Gmail rejects batch requests with more calls than this
+
+def send_gmail_batch(gsvc, items: List[Tuple[Any, dict]], *, http=None, retries: int = 3,
+                     base: float = 0.8, cap: float = 8.0, stop_event=None) -> List[Tuple[Any, Any, Exception | None]]:
+    """
+    Send `(key, body)` pairs as one Gmail batch HTTP request (at most GMAIL_BATCH_LIMIT).
+
+    Returns `(key, response, error)` for every item in input order. Per-item failures
+    are reported in `error` instead of raised; items failing with a rate limit or 5xx
+    are resent in a follow-up batch after backoff (rate limits via the shared breaker).
+    The batch request itself is never resent blindly: if it fails after Gmail may have
+    accepted some of it (transport error, 5xx), every item without a reply fails as
+    outcome unknown. Only a rate limit on the whole request, before any reply, is
+    retried. `http` overrides the transport (e.g. a fake for offline runs). Items
+    still pending when `stop_event` cuts a wait short fail with Cancelled.
+    """
+    if len(items) > GMAIL_BATCH_LIMIT:
+        raise ValueError(f"At most {GMAIL_BATCH_LIMIT} messages per Gmail batch.")
+    t0 = time.perf_counter()
+    results: Dict[int, Tuple[Any, Exception | None]] = {}
+    pending = list(range(len(items)))
+    for attempt in range(retries):
+        def callback(request_id, response, exception):
+            results[int(request_id)] = (response, exception)
+
+        batch = gsvc.new_batch_http_request(callback=callback)
+        for n in pending:
+            results.pop(n, None)  # replies from an earlier attempt were retryable failures
+            batch.add(gsvc.users().messages().send(userId="me", body=items[n][1]), request_id=str(n))
+        if not API_BREAKER.wait(stop_event):
+            for n in pending:
+                results[n] = (None, Cancelled("batch cancelled while waiting out a rate limit"))
+            break
+        METRICS.count("api.gmail.batch")
+        try:
+            batch.execute(http=http)
+        except Exception as e:
+            kind = classify_error(e)
+            RETRY_STATS.failure(kind)
+            unanswered = [n for n in pending if n not in results]
+            if kind == "rate_limit" and len(unanswered) == len(pending):
+                if attempt < retries - 1:  # turned away before any message was processed
+                    RETRY_STATS.retried()
+                    API_BREAKER.trip(retry_after_seconds(e))
+                    continue
+                err = e
+            else:
+                err = RuntimeError(f"Batch request failed ({e}); this message may have been sent, "
+                                   "so it is not retried.")
+            for n in unanswered:
+                results[n] = (None, err)
+            break
+        API_BREAKER.success()
+
+        failed = [n for n in pending if results.get(n, (None, None))[1] is not None]
+        kinds = {n: classify_error(results[n][1]) for n in failed}
+        for kind in kinds.values():
+            RETRY_STATS.failure(kind)
+        pending = [n for n in failed if kinds[n] not in ("permanent", "quota")]
+        if not pending or attempt == retries - 1:
+            break
+        RETRY_STATS.retried()
+        if "rate_limit" in kinds.values():
+            API_BREAKER.trip(max((retry_after_seconds(results[n][1]) or 0.0) for n in pending))
+        else:
+            delay = min(cap, base * (2 ** attempt)) + random.uniform(0, 0.25)
+            if stop_event is not None:
+                if stop_event.wait(delay):
+                    for n in pending:
+                        results[n] = (None, Cancelled("batch cancelled before its retry"))
+                    break
+            else:
+                time.sleep(delay)
+            RETRY_STATS.waited(delay)
+
+    missing = RuntimeError("No response for this message in the batch reply.")
+    out = [(key, *results.get(n, (None, missing))) for n, (key, _) in enumerate(items)]
+    ok = [n for n, (_, _, err) in enumerate(out) if err is None]
+    METRICS.observe("send", time.perf_counter() - t0, len(items))
+    METRICS.count("messages_sent", len(ok))
+    METRICS.count("bytes_sent", sum(message_size(items[n][1]) for n in ok))
+    return out
+
+# ---------- Templates ----------
+def _template_cache_dir() -> str | None:
+    """User-writable bytecode cache dir next to the token fallback; None if unavailable."""
+    d = Path.home() / ".rejections_gui" / "jinja_cache"
+    try:
+        d.mkdir(parents=True, exist_ok=True)
+        return str(d)
+    except OSError:
+        return None
+
+def _load_template_file(name: str):
+    """FunctionLoader hook: (source, filename, uptodate) with an mtime-based uptodate check."""
+    path = Path(name).expanduser().resolve()
+    if not path.is_file():
+        return None
+    mtime = path.stat().st_mtime_ns
+    source = path.read_text(encoding="utf-8")
+
+    def uptodate() -> bool:
+        try:
+            return path.stat().st_mtime_ns == mtime
+        except OSError:
+            return False
+
+    return source, str(path), uptodate
+
+_template_env = None
+_template_env_lock = threading.Lock()
+
+def template_env():
+    """
+    The Jinja environment, created on first use. Shared across runs so the GUI's
+    repeated Dry Run / Send clicks reuse compiled templates; auto_reload re-checks
+    each file's mtime when a run asks for it again.
+    """
+    global _template_env
+    with _template_env_lock:
+        if _template_env is None:
+            from jinja2 import Environment, FileSystemBytecodeCache, FunctionLoader
+            cache_dir = _template_cache_dir()
+            _template_env = Environment(
+                loader=FunctionLoader(_load_template_file),
+                bytecode_cache=FileSystemBytecodeCache(cache_dir) if cache_dir else None,
+                auto_reload=True,
+            )
+    return _template_env
+
+def _compiled_template(path: str):
+    # Resolve so the same file reached via different relative paths shares one cache entry
+    return template_env().get_template(str(Path(path).expanduser().resolve()))
+
+_PLACEHOLDER = "\x00{}\x00"
+_PLACEHOLDER_RE = re.compile("\x00([^\x00]+)\x00")
+
+def _render_plan(ast) -> Tuple[Tuple[str, ...], Tuple[str, ...]] | None:
+    """
+    Split a template's context names into (key names, bare names). Bare names are
+    only ever printed as a plain `{{ name }}`, so their values can be substituted into
+    a cached rendering; every other referenced name must be part of the cache key.
+    None if the template pulls in other templates.
+    """
+    from jinja2 import meta, nodes
+    # Statements whose output can be filtered, captured or passed around; a template
+    # containing any of them is never rendered with placeholders.
+    opaque = (nodes.FilterBlock, nodes.Macro, nodes.CallBlock, nodes.AssignBlock,
+              nodes.ScopedEvalContextModifier, nodes.EvalContextModifier)
+    if any(True for _ in meta.find_referenced_templates(ast)):
+        return None
+    undeclared = meta.find_undeclared_variables(ast)
+    if any(True for _ in ast.find_all(opaque)):
+        return tuple(sorted(undeclared)), ()
+    bare_ids = {id(n) for out in ast.find_all(nodes.Output) for n in out.nodes if isinstance(n, nodes.Name)}
+    other = {n.name for n in ast.find_all(nodes.Name) if id(n) not in bare_ids}
+    return tuple(sorted(undeclared & other)), tuple(sorted(undeclared - other))
+
+class RenderCache(collections.OrderedDict):
+    """LRU of rendered template output (split at placeholders) with hit/miss counters."""
+
+    def __init__(self, maxsize: int = 1024):
+        super().__init__()
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key) -> List[str] | None:
+        value = self.get(key)
+        if value is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+            self.move_to_end(key)
+        return value
+
+    def store(self, key, value: List[str]):
+        self[key] = value
+        if len(self) > self.maxsize:
+            self.popitem(last=False)
+
+    def summary(self) -> str:
+        total = self.hits + self.misses
+        return (f"Render cache: {self.hits} hit(s) / {self.misses} miss(es)"
+                f" ({100 * self.hits / total if total else 0:.1f}% reused, {len(self)} cached)")
+
+class TemplateSet:
+    """
+    Subject, text and HTML templates compiled once per run and rendered per row.
+
+    With `cache_size` > 0 renderings are kept in an LRU keyed by the values of the
+    variables each template actually uses. Variables that are only printed bare
+    (typically `{{ name }}`) are rendered as placeholders and filled in per row, so
+    rows differing only in those reuse one rendering of everything else.
+    """
+
+    def __init__(self, subject: str, text_path: str = "", html_path: str = "", cache_size: int = 0):
+        self.spec = (subject, text_path, html_path, cache_size)  # enough to rebuild it in another process
+        self.subject_source = subject or ""
+        env = template_env()
+        self.subject = env.from_string(self.subject_source)
+        self.text = _compiled_template(text_path) if text_path else None
+        self.html = _compiled_template(html_path) if html_path else None
+        self.cache = RenderCache(cache_size) if cache_size > 0 else None
+        self._plans = [_render_plan(env.parse(src)) for src in self._sources()] if self.cache is not None else []
+
+    def _sources(self) -> List[str]:
+        env = template_env()
+        sources = [self.subject_source]
+        for t in (self.text, self.html):
+            sources.append(env.loader.get_source(env, t.name)[0] if t is not None else "")
+        return sources
+
+    def variables(self) -> set | None:
+        """
+        Context names referenced by the subject/text/HTML templates, from their Jinja
+        AST. None if a template includes/extends/imports others and so can't be fully
+        analyzed here.
+        """
+        from jinja2 import meta
+        names: set = set()
+        for src in self._sources():
+            ast = template_env().parse(src)
+            if any(True for _ in meta.find_referenced_templates(ast)):
+                return None
+            names |= meta.find_undeclared_variables(ast)
+        return names
+
+    def render(self, ctx: dict) -> Tuple[str, str | None, str | None]:
+        """Return (subject, text, html); text/html are None when no template is set."""
+        if self.cache is None:
+            subject = self.subject.render(**ctx)
+            text = self.text.render(**ctx) if self.text else None
+            html = self.html.render(**ctx) if self.html else None
+            return subject, text, html
+        return (self._render_cached(0, self.subject, ctx),
+                self._render_cached(1, self.text, ctx) if self.text else None,
+                self._render_cached(2, self.html, ctx) if self.html else None)
+
+    def _render_cached(self, slot: int, template, ctx: dict) -> str:
+        plan = self._plans[slot]
+        if plan is None:
+            return template.render(**ctx)
+        key_names, bare = plan
+        subs = tuple(n for n in bare if n in ctx)  # names missing from ctx render as undefined
+        key = (slot, subs, tuple(ctx.get(n) for n in key_names))
+        parts = self.cache.lookup(key)
+        if parts is None:
+            out = template.render(**{**ctx, **{n: _PLACEHOLDER.format(n) for n in subs}})
+            parts = _PLACEHOLDER_RE.split(out)  # literal, name, literal, name, ..., literal
+            self.cache.store(key, parts)
+        if len(parts) == 1:
+            return parts[0]
+        autoescape = template.environment.autoescape
+        if callable(autoescape):
+            autoescape = autoescape(template.name)
+        if autoescape:
+            from markupsafe import escape
+        out = parts[:]
+        for i in range(1, len(out), 2):
+            out[i] = escape(ctx[out[i]]) if autoescape else str(ctx[out[i]])
+        return "".join(out)
+
+def render_template(path: str, ctx: dict) -> str | None:
+    if not path:
+        return None
+    return _compiled_template(path).render(**ctx)
+
+def row_context(rec: Record, config: dict) -> dict:
+    """Template variables for one sheet row."""
+    return {
+        "email": rec.get("email", "").strip(),
+        "name": rec.get("name", "").strip(),
+        "role": rec.get("role", "").strip(),
+        "company": rec.get("company", "").strip(),
+        "stage": rec.get("stage", ""),
+        "reason": rec.get("reason", ""),
+        "application_date": rec.get("application_date", ""),
+        "sender_name": os.environ.get("SENDER_NAME", config.get("sender_name") or "Recruiting Team"),
+        "sender_title": os.environ.get("SENDER_TITLE", config.get("sender_title") or "Talent Acquisition"),
+    }
+
+def render_row(rec: Record, templates: TemplateSet, config: dict, test_to_self: bool = False) -> Dict[str, Any] | None:
+    """
+    Render one row into message fields (to, cc, bcc, subject, text, html).
+    None if the templates render empty for it.
+    """
+    ctx = row_context(rec, config)
+    return row_fields(ctx, templates.render(ctx), config, test_to_self)
+
+def row_fields(ctx: dict, rendered: Tuple[str, str | None, str | None], config: dict,
+               test_to_self: bool = False) -> Dict[str, Any] | None:
+    """Message fields for a row whose (subject, text, html) are already rendered."""
+    subject_base, text, html = rendered
+    if not ((text and text.strip()) or (html and _strip_html(html))):
+        return None
+    return {
+        "to": config["sender"] if test_to_self else ctx["email"],
+        "cc": None if test_to_self else (config.get("cc") or None),
+        "bcc": None if test_to_self else (config.get("bcc") or None),
+        "subject": f"[TEST] {subject_base}" if test_to_self else subject_base,
+        "text": text,
+        "html": html,
+    }
+
+def message_body(fields: Dict[str, Any], config: dict) -> dict:
+    """
+    Gmail `messages.send` body for fields from render_row: `{"raw": base64url}`, or
+    `{"media": bytes}` for messages of MEDIA_UPLOAD_THRESHOLD or more (send_gmail
+    uploads those as message/rfc822 instead).
+    """
+    message = build_message(
+        sender=config["sender"], to=fields["to"], subject=fields["subject"],
+        text=fields["text"], html=fields["html"], cc=fields["cc"], bcc=fields["bcc"],
+        reply_to=(config.get("reply_to") or None), attachments=config.get("attachments") or [],
+    )
+    if len(message) >= MEDIA_UPLOAD_THRESHOLD:
+        return {"media": message}
+    encoded = _b64url_buffer(message)
+    del message  # only one full-size copy alive while decoding
+    return {"raw": encoded.decode("ascii")}
+
+# ---------- Parallel rendering ----------
+_worker_templates: TemplateSet | None = None
+
+def _init_render_worker(spec: Tuple[str, str, str, int]):
+    global _worker_templates
+    _worker_templates = TemplateSet(*spec)  # compiled once per worker process
+
+def _render_chunk(ctxs: List[dict]) -> List[Tuple[Tuple[str, str | None, str | None], float]]:
+    out = []
+    for ctx in ctxs:
+        t0 = time.perf_counter()
+        rendered = _worker_templates.render(ctx)
+        out.append((rendered, time.perf_counter() - t0))
+    return out
+
+def render_rows(records: Iterable[Record], templates: TemplateSet, config: dict,
+                test_to_self: bool = False, *, processes: int = 0, chunk_size: int = 64):
+    """
+    Yield `(rec, fields, seconds)` for each record in order, `fields` as from
+    render_row. With `processes` > 1 rendering runs in a process pool: contexts are
+    built here, sent in chunks of `chunk_size`, and at most two chunks per process
+    are in flight, so the sheet is still streamed. Workers are spawned, not forked:
+    the caller runs alongside other threads (GUI, page prefetch).
+    """
+    if processes <= 1:
+        for rec in records:
+            t0 = time.perf_counter()
+            fields = render_row(rec, templates, config, test_to_self)
+            yield rec, fields, time.perf_counter() - t0
+        return
+
+    import multiprocessing
+    from concurrent.futures import ProcessPoolExecutor
+    pool = ProcessPoolExecutor(processes, mp_context=multiprocessing.get_context("spawn"),
+                               initializer=_init_render_worker, initargs=(templates.spec,))
+    inflight: collections.deque = collections.deque()
+    records = iter(records)
+    try:
+        while True:
+            while len(inflight) < processes * 2:
+                chunk = list(itertools.islice(records, max(1, chunk_size)))
+                if not chunk:
+                    break
+                ctxs = [row_context(rec, config) for rec in chunk]
+                inflight.append((chunk, ctxs, pool.submit(_render_chunk, ctxs)))
+            if not inflight:
+                return
+            chunk, ctxs, future = inflight.popleft()
+            for rec, ctx, (rendered, secs) in zip(chunk, ctxs, future.result()):
+                yield rec, row_fields(ctx, rendered, config, test_to_self), secs
+    finally:
+        pool.shutdown(wait=True, cancel_futures=True)  # queued chunks are dropped
+
+# ---------- Rate limiting ----------
+class TokenBucket:
+    """
+    Thread-safe token bucket: refills `rate` tokens per second and banks at most
+    `burst`. A rate of 0 disables limiting.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(0.0, float(rate))
+        self.burst = max(1, int(burst))
+        self._tokens = float(self.burst)
+        self._last = time.monotonic()
+        self._lock = threading.Lock()
+
+    def try_acquire(self) -> float:
+        """Take a token if one is available (returns 0.0); otherwise seconds until one is."""
+        if not self.rate:
+            return 0.0
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._last) * self.rate)
+            self._last = now
+            if self._tokens >= 1:
+                self._tokens -= 1
+                return 0.0
+            return (1 - self._tokens) / self.rate
+
+    def acquire(self, stop_event=None) -> bool:
+        """Block until a token is available; False if `stop_event` is set first."""
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            if stop_event is not None:
+                stop_event.wait(wait)
+            else:
+                time.sleep(wait)
+
+    async def acquire_async(self, stop_event=None) -> bool:
+        """asyncio variant of `acquire`; `stop_event` is still a threading.Event."""
+        import asyncio
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            wait = self.try_acquire()
+            if not wait:
+                return True
+            await asyncio.sleep(min(wait, 0.25))  # short naps so cancel is noticed
+
+def rate_limiter_from_config(config: dict) -> TokenBucket:
+    """`rate` (msgs/sec) and `burst` if set; otherwise one message per `throttle` seconds."""
+    rate = float(config.get("rate") or 0.0)
+    if not rate:
+        throttle = float(config.get("throttle", 2.0) or 0.0)
+        rate = 1.0 / throttle if throttle > 0 else 0.0
+    return TokenBucket(rate, int(float(config.get("burst") or 1)))
+
+def recipient_domain(address: str) -> str:
+    return (address.rsplit("@", 1)[-1] if "@" in address else "").strip().lower()
+
+class DomainCooldown:
+    """Keeps sends to the same recipient domain at least `cooldown` seconds apart."""
+
+    def __init__(self, cooldown: float, clock: Callable[[], float] = time.monotonic):
+        self.cooldown = max(0.0, cooldown)
+        self.clock = clock
+        self._next_at: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def reserve(self, address: str) -> float:
+        """Reserve the domain's next send slot; returns seconds to wait until it."""
+        if not self.cooldown:
+            return 0.0
+        domain = recipient_domain(address)
+        with self._lock:
+            now = self.clock()
+            slot = max(now, self._next_at.get(domain, now))
+            self._next_at[domain] = slot + self.cooldown
+        return slot - now
+
+    def ready_in(self, address: str) -> float:
+        """Seconds until the domain's next send slot, without reserving it."""
+        if not self.cooldown:
+            return 0.0
+        with self._lock:
+            return max(0.0, self._next_at.get(recipient_domain(address), 0.0) - self.clock())
+
+    def wait(self, address: str, stop_event=None) -> bool:
+        """Reserve the domain's next slot and sleep until it; False if cancelled."""
+        delay = self.reserve(address)
+        if delay <= 0:
+            return True
+        if stop_event is not None:
+            return not stop_event.wait(delay)
+        time.sleep(delay)
+        return True
+
+    async def wait_async(self, address: str, stop_event=None) -> bool:
+        """asyncio variant of `wait`; `stop_event` is still a threading.Event."""
+        import asyncio
+        deadline = time.monotonic() + self.reserve(address)
+        while True:
+            if stop_event is not None and stop_event.is_set():
+                return False
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return True
+            await asyncio.sleep(min(left, 0.25))  # short naps so cancel is noticed
+
+def wait_turn(cooldown: DomainCooldown, limiter: TokenBucket, to_addr: str, stop_event) -> bool:
+    """Domain cooldown, then a token; the wait is recorded as the `throttle` stage. False if cancelled."""
+    with METRICS.timed("throttle"):
+        return cooldown.wait(to_addr, stop_event) and limiter.acquire(stop_event)
+
+# ---------- Domain scheduling ----------
+DOMAIN_LOOKAHEAD = 500
+
+class DomainScheduler:
+    """
+    Reorders sends so a per-domain cooldown is spent sending to other domains instead
+    of sleeping. Items wait in one FIFO per domain; a heap keyed by each domain's next
+    allowed send time decides which domain goes next. Order within a domain is kept.
+    The plan only picks the order -- DomainCooldown still enforces the gap.
+    """
+
+    def __init__(self, cooldown: float, clock: Callable[[], float] = time.monotonic):
+        self.cooldown = max(0.0, cooldown)
+        self.clock = clock
+        self._queues: Dict[str, collections.deque] = {}
+        self._planned: Dict[str, float] = {}
+        self._heap: List[Tuple[float, int, str]] = []
+        self._seq = itertools.count()
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def add(self, item: Any, address: str):
+        domain = recipient_domain(address)
+        q = self._queues.setdefault(domain, collections.deque())
+        if not q:
+            heapq.heappush(self._heap, (self._planned.get(domain, 0.0), next(self._seq), domain))
+        q.append(item)
+        self._size += 1
+
+    def ready(self) -> bool:
+        """True if some buffered domain may be sent to now."""
+        return bool(self._heap) and self._heap[0][0] <= self.clock()
+
+    def pop(self) -> Any:
+        """Remove and return the item whose domain is allowed soonest."""
+        at, _, domain = heapq.heappop(self._heap)
+        q = self._queues[domain]
+        item = q.popleft()
+        self._size -= 1
+        self._planned[domain] = max(at, self.clock()) + self.cooldown
+        if q:
+            heapq.heappush(self._heap, (self._planned[domain], next(self._seq), domain))
+        return item
+
+    def take(self, keep: int = 0) -> Iterable[Any]:
+        """Yield ready items, plus the soonest ones while more than `keep` are buffered."""
+        while self._size > keep or (self._size and self.ready()):
+            yield self.pop()
+
+def schedule_by_domain(items: Iterable[Any], cooldown: float, *, address: Callable[[Any], str],
+                       lookahead: int = DOMAIN_LOOKAHEAD,
+                       clock: Callable[[], float] = time.monotonic) -> Iterable[Any]:
+    """
+    Yield `items` reordered by DomainScheduler, reading at most `lookahead` items
+    ahead of the consumer. With no cooldown the order is left untouched.
+    """
+    if cooldown <= 0:
+        yield from items
+        return
+    sched = DomainScheduler(cooldown, clock)
+    for item in items:
+        sched.add(item, address(item))
+        yield from sched.take(keep=lookahead)
+    yield from sched.take()
+
+# ---------- Dry run ----------
+ADDRESS_RE = re.compile(r"^[^@\s<>(),;:\"]+@[^@\s<>(),;:\"]+\.[A-Za-z0-9-]{2,}$")
+EST_SEND_SECONDS = 0.4  # typical Gmail messages.send round trip, used for estimates
+
+def address_problems(value: str | None, field: str) -> List[str]:
+    """Problems with a comma-separated address field ('' / None is fine)."""
+    problems = []
+    for name, addr in getaddresses([value or ""]):
+        if (name or addr) and not ADDRESS_RE.match(addr):
+            problems.append(f"{field} '{addr or name}' is not a valid address")
+    return problems
+
+def _fmt_duration(seconds: float) -> str:
+    seconds = int(round(seconds))
+    h, rem = divmod(seconds, 3600)
+    m, s = divmod(rem, 60)
+    return f"{h}h {m:02d}m" if h else (f"{m}m {s:02d}s" if m else f"{s}s")
+
+class DryRunReport:
+    """
+    Validation/preview pass used by dry runs: rows are rendered and their addresses
+    checked, but the full MIME message (attachments, base64) is only built for the
+    first `mime_samples` rows. `summary()` adds render timings and an estimate of how
+    long a real send would take with the current rate settings.
+    """
+
+    def __init__(self, config: dict, mime_samples: int = 3):
+        self.config = config
+        self.mime_samples = max(0, mime_samples)
+        self.render_secs: List[Tuple[float, int]] = []  # (seconds, row number)
+        self.mime: List[Tuple[int, float]] = []         # (bytes, seconds)
+        self.domains: collections.Counter = collections.Counter()
+        self.invalid = 0
+        self.empty = 0
+        self.config_problems = (address_problems(config.get("cc"), "CC")
+                                + address_problems(config.get("bcc"), "BCC")
+                                + address_problems(config.get("reply_to"), "Reply-To"))
+
+    def row(self, rec: Record, fields: Dict[str, Any] | None, secs: float) -> List[str]:
+        """Record one rendered row; returns problems to report for it."""
+        self.render_secs.append((secs, rec["_row_number"]))
+        if fields is None:
+            self.empty += 1
+            return []
+        problems = address_problems(fields["to"], "To")
+        if problems:
+            self.invalid += 1
+            return problems
+        self.domains[recipient_domain(fields["to"])] += 1
+        if len(self.mime) < self.mime_samples:
+            t0 = time.perf_counter()
+            body = message_body(fields, self.config)
+            self.mime.append((message_size(body), time.perf_counter() - t0))
+        return []
+
+    def estimate_seconds(self) -> float:
+        """Lower-bound wall time for sending the valid rows with the current settings."""
+        n = sum(self.domains.values())
+        if not n:
+            return 0.0
+        cfg = self.config
+        rate = rate_limiter_from_config(cfg).rate
+        if (cfg.get("engine") or "") == "async":
+            parallel = int(float(cfg.get("concurrency") or 20))
+        else:
+            parallel = max(int(float(cfg.get("workers") or 1)), int(float(cfg.get("batch_size") or 0)))
+        per_msg = max(1 / rate if rate else 0.0, EST_SEND_SECONDS / max(1, parallel))
+        gap = float(cfg.get("domain_throttle") or 0.0)
+        busiest = max(self.domains.values())
+        return max(n * per_msg, (busiest - 1) * gap + EST_SEND_SECONDS)
+
+    def summary(self) -> List[str]:
+        lines = [f"Dry run: {len(self.render_secs)} row(s) rendered · {self.invalid} invalid address(es)"
+                 f" · {self.empty} empty"]
+        lines += [f"   Config: {p}" for p in self.config_problems]
+        if self.render_secs:
+            times = sorted(self.render_secs)
+            p95 = times[min(len(times) - 1, int(len(times) * 0.95))][0]
+            slowest, slowest_row = times[-1]
+            avg = sum(t for t, _ in times) / len(times)
+            lines.append(f"Render time per row: avg {avg * 1000:.2f} ms · p95 {p95 * 1000:.2f} ms"
+                         f" · max {slowest * 1000:.2f} ms (row {slowest_row})")
+        if self.mime:
+            size = sum(b for b, _ in self.mime) / len(self.mime)
+            secs = sum(t for _, t in self.mime) / len(self.mime)
+            lines.append(f"Full message sample ({len(self.mime)} row(s)): avg {size / 1024:.0f} KB,"
+                         f" {secs * 1000:.1f} ms to build")
+        if self.domains:
+            domain, count = self.domains.most_common(1)[0]
+            lines.append(f"Estimated send time for {sum(self.domains.values())} email(s) at current settings:"
+                         f" ~{_fmt_duration(self.estimate_seconds())} (busiest domain {domain} × {count})")
+        return lines
+
+# ---------- Screening ----------
+SCREEN_REASONS = {  # why a row isn't sent, in the order rows are checked
+    "sent": "already sent",
+    "skip": "skip = yes",
+    "not_send": "send is not yes",
+    "incomplete": "email, name, role or company empty",
+    "invalid": "invalid email address",
+    "duplicate": "same email as an earlier row",
+    "sent_before": "emailed in an earlier run",
+}
+SCREEN_EXAMPLES = 5  # rows listed per problem reason in the summary
+# "report" finds repeats like "tab" but still sends them; the others hold them back
+DEDUPE_SCOPES = ("off", "report", "sheet", "tab", "all")
+
+def email_key(email: str) -> int:
+    """Stable 64-bit digest of a normalized address, for compact indexes of past recipients."""
+    return int.from_bytes(hashlib.blake2b(email.strip().lower().encode("utf-8"), digest_size=8).digest(), "big")
+
+def row_screen(config: dict, hdr_index: Dict[str, int], ledger: SendLedger, tab_title: str) -> RowScreen:
+    """RowScreen for a run, with the ledger's earlier sends as `prior` when config["dedupe"] asks for them."""
+    dedupe = str(config.get("dedupe") or "report").lower()
+    prior = (ledger.email_index(config["spreadsheet_id"], tab_title, everywhere=dedupe == "all")
+             if dedupe in ("report", "tab", "all") else None)
+    return RowScreen(hdr_index, dedupe=dedupe, prior=prior)
+
+def log_screen(screen: RowScreen, config: dict, log: Callable[[str], None]):
+    """Log the screening summary and write config["rejection_report"], if set."""
+    for line in screen.summary():
+        log(line)
+    if config.get("rejection_report"):
+        try:
+            screen.write_report(config["rejection_report"])
+            log(f"Rejected rows written to {config['rejection_report']}.")
+        except OSError as e:
+            log(f"   Error writing rejection report: {e}")
+
+def email_valid(value: str) -> bool:
+    """Same rule as DryRunReport: every address in the cell must match ADDRESS_RE."""
+    return bool(ADDRESS_RE.match(value)) or (bool(value) and not address_problems(value, "To"))
+
+class RowScreen:
+    """
+    Eligibility, address validation and duplicate detection over pages of raw sheet
+    rows, one column at a time: each check runs over the rows still in play, so most
+    rows cost a few set lookups and only eligible rows become Records. Rejections are
+    counted by reason (SCREEN_REASONS); invalid and duplicate ones are also kept with
+    their row and address for the report. Duplicates are found across pages by email
+    (`dedupe` "sheet"), and with "tab"/"all" also in `prior`, an email_key -> row
+    index of earlier sends (SendLedger.email_index). "report" looks like "tab" but
+    only lists what it finds (`flagged`); those rows stay eligible. Not thread-safe.
+    """
+
+    def __init__(self, hdr_index: Dict[str, int], *, dedupe: str = "report", prior: Dict[int, int] | None = None):
+        self.cols = {k: hdr_index.get(k) for k in ("email", "name", "role", "company", "send", "skip", "sent_status")}
+        self.dedupe = dedupe if dedupe in DEDUPE_SCOPES else "report"
+        self.hold = self.dedupe != "report"  # whether duplicates are held back or only listed
+        self.prior = prior if self.dedupe in ("report", "tab", "all") else None
+        self.seen: Dict[str, int] = {}       # lowercased email -> first row that has it
+        self.rows = 0
+        self.eligible = 0
+        self.counts: collections.Counter = collections.Counter()
+        self.rejected: Dict[str, array] = {r: array("I") for r in SCREEN_REASONS}
+        self.problems: List[Tuple[int, str, str, str]] = []  # (row, reason, email, detail)
+        self.flagged: List[Tuple[int, str, str, str]] = []   # the same, for rows sent anyway
+
+    def _columns(self, rows: List[List[str]]) -> Dict[str, List[str]]:
+        """The gate columns of `rows`, one list per column (no per-row objects)."""
+        present = {k: i for k, i in self.cols.items() if i is not None}
+        if not present or not rows:
+            return {}
+        need = max(present.values()) + 1
+        if not all(map(need.__le__, map(len, rows))):  # the API trims trailing empty cells
+            rows = [row if len(row) >= need else row + [""] * (need - len(row)) for row in rows]
+        return {k: list(map(itemgetter(i), rows)) for k, i in present.items()}
+
+    def _filter(self, keep: List[int], col: List[str], values: set, wanted: bool, reason: str,
+                first_row: int) -> Tuple[List[int], List[int]]:
+        """Split `keep` on whether col[k] is in `values` (kept if that equals `wanted`); counts the rest."""
+        if not values and not wanted:
+            return keep, []
+        hits = list(map(values.__contains__, map(col.__getitem__, keep)))
+        kept = list(itertools.compress(keep, hits if wanted else map(not_, hits)))
+        if len(kept) == len(keep):
+            return kept, []
+        dropped = list(itertools.compress(keep, map(not_, hits) if wanted else hits))
+        self.counts[reason] += len(dropped)
+        self.rejected[reason].extend(map(first_row.__add__, dropped))
+        return kept, dropped
+
+    def page(self, rows: List[List[str]], first_row: int) -> array:
+        """Offsets (into `rows`) of the eligible rows of one page, in sheet order."""
+        self.rows += len(rows)
+        cols = self._columns(rows)
+        keep = list(range(len(rows)))
+        emails = cols.get("email") or [""] * len(rows)
+
+        status = cols.get("sent_status")
+        if status is not None:
+            done = {v for v in set(status) if v.strip().lower() == "sent"}
+            keep, dropped = self._filter(keep, status, done, False, "sent", first_row)
+            if self.dedupe != "off":  # an address emailed from an earlier row can't be sent again
+                for k in dropped:
+                    self.seen.setdefault(emails[k].strip().lower(), first_row + k)
+        if "skip" in cols:
+            yes = {v for v in set(cols["skip"]) if is_yes(v)}
+            keep, _ = self._filter(keep, cols["skip"], yes, False, "skip", first_row)
+        if "send" in cols:
+            yes = {v for v in set(cols["send"]) if is_yes(v)}
+            keep, _ = self._filter(keep, cols["send"], yes, True, "not_send", first_row)
+        for key in ("email", "name", "role", "company"):
+            col = cols.get(key)
+            if col is None:  # run_sender refuses sheets without these; nothing is eligible
+                keep, _ = self._filter(keep, [""] * len(rows), {""}, False, "incomplete", first_row)
+                break
+            blank = {v for v in set(col) if not v.strip()}
+            keep, _ = self._filter(keep, col, blank, False, "incomplete", first_row)
+
+        # Addresses: validate, then look for repeats, all as whole-column operations
+        addrs = list(map(str.strip, map(emails.__getitem__, keep)))
+        valid = list(map(ADDRESS_RE.match, addrs))
+        if not all(valid):
+            for i, m in enumerate(valid):
+                if m is None and not email_valid(addrs[i]):
+                    self._reject(first_row + keep[i], "invalid", addrs[i], "")
+                else:
+                    valid[i] = True
+            keep = list(itertools.compress(keep, valid))
+            addrs = list(itertools.compress(addrs, valid))
+        if self.dedupe == "off":
+            self.eligible += len(keep)
+            return array("I", keep)
+
+        lows = list(map(str.lower, addrs))
+        first_in_page = dict(zip(reversed(lows), reversed(keep)))  # earliest offset per address
+        repeats = self.seen.keys() & first_in_page.keys()
+        hashes = list(map(email_key, lows)) if self.prior else []
+        earlier = self.prior.keys() & set(hashes) if self.prior else set()
+        # Rows needing a closer look: repeats within the page or of earlier pages, earlier sends
+        flags = list(map(ne, map(first_in_page.__getitem__, lows), keep))
+        if repeats:
+            flags = list(map(or_, flags, map(repeats.__contains__, lows)))
+        if earlier:
+            flags = list(map(or_, flags, map(earlier.__contains__, hashes)))
+        ok = list(map(not_, flags))
+        self.seen.update(zip(itertools.compress(lows, ok), map(first_row.__add__, itertools.compress(keep, ok))))
+        for i in itertools.compress(range(len(keep)), flags):
+            k, low = keep[i], lows[i]
+            row = first_row + k
+            first = self.seen.get(low) if low in repeats else None
+            if first is None and first_in_page[low] != k:
+                first = first_row + first_in_page[low]
+            if first is not None:
+                if self._flag(row, "duplicate", addrs[i], f"row {first}"):
+                    continue
+            else:
+                self.seen[low] = row
+                before = self.prior[hashes[i]] if earlier and hashes[i] in earlier else None
+                if before is not None and before != row:
+                    if self._flag(row, "sent_before", addrs[i], f"row {before}" if before else "another tab"):
+                        continue
+            ok[i] = True
+        out = array("I", itertools.compress(keep, ok))
+        self.eligible += len(out)
+        return out
+
+    def _reject(self, row: int, reason: str, email: str, detail: str):
+        self.counts[reason] += 1
+        self.rejected[reason].append(row)
+        self.problems.append((row, reason, email, detail))
+
+    def _flag(self, row: int, reason: str, email: str, detail: str) -> bool:
+        """Reject a repeat, or only list it when not holding them back; True if rejected."""
+        if self.hold:
+            self._reject(row, reason, email, detail)
+        else:
+            self.flagged.append((row, reason, email, detail))
+        return self.hold
+
+    def records(self, headers: List[str], rows: List[List[str]], first_row: int,
+                keys: Iterable[str] | None = None) -> List[Record]:
+        """Records for the eligible rows of one page."""
+        offsets = self.page(rows, first_row)
+        return records_from_rows(headers, [rows[k] for k in offsets], first_row, keys,
+                                 row_numbers=[first_row + k for k in offsets])
+
+    def summary(self) -> List[str]:
+        if not self.rows:
+            return []
+        lines = [f"Screened {self.rows} row(s): {self.eligible} eligible"
+                 + "".join(f", {n} {SCREEN_REASONS[r]}" for r in SCREEN_REASONS if (n := self.counts[r]))
+                 + "."]
+        for label, found_in in (("Skipped", self.problems), ("Sent anyway", self.flagged)):
+            for reason in ("invalid", "duplicate", "sent_before"):
+                found = [p for p in found_in if p[1] == reason]
+                if not found:
+                    continue
+                shown = ", ".join(f"row {row} {email or '(blank)'}{f' ({detail})' if detail else ''}"
+                                  for row, _, email, detail in found[:SCREEN_EXAMPLES])
+                more = f" and {len(found) - SCREEN_EXAMPLES} more" if len(found) > SCREEN_EXAMPLES else ""
+                lines.append(f"   {label}, {SCREEN_REASONS[reason]}: {shown}{more}")
+        if self.flagged:
+            lines.append('   Set "dedupe" to "tab" in the settings file to hold such rows back.')
+        return lines
+
+    def write_report(self, path: str | Path):
+        """
+        CSV of every rejected row: row, reason, email and detail (the last two for
+        problem reasons), and `held` = yes. Repeats only listed ("report") are added
+        with held = no.
+        """
+        import csv
+        problems = {(row, reason): (email, detail) for row, reason, email, detail in self.problems}
+        lines = sorted([(row, reason, *problems.get((row, reason), ("", "")), "yes")
+                        for reason, rows in self.rejected.items() for row in rows]
+                       + [(*p, "no") for p in self.flagged])
+        with open(Path(path).expanduser(), "w", newline="", encoding="utf-8") as f:
+            w = csv.writer(f)
+            w.writerow(["row", "reason", "email", "detail", "held"])
+            w.writerows(lines)
+
+# ---------- Pipelined sending ----------
+def _write_statuses(status_q: queue.Queue, mark_sent: Callable[..., Any], log: Callable[[str], None],
+                    on_idle: Callable[[], Any] | None = None):
+    """Status thread: `mark_sent(*args)` for each args tuple queued, until None."""
+    while True:
+        try:
+            args = status_q.get(timeout=1.0)
+        except queue.Empty:
+            if on_idle:
+                try:
+                    on_idle()
+                except Exception as e:
+                    log(f"   Error writing statuses: {e}")
+            continue
+        if args is None:
+            return
+        try:
+            mark_sent(*args)
+        except Exception as e:
+            log(f"   Error writing status for row {args[0].get('_row_number')}: {e}")
+
+def send_pipelined(items, *, creds, mark_sent: Callable[[Record], Any], workers: int,
+                   limiter: TokenBucket, cooldown: DomainCooldown, log: Callable[[str], None],
+                   stop_event, on_idle: Callable[[], Any] | None = None) -> int:
+    """
+    Send `(rec, to_addr, body)` items with three overlapping stages: the calling
+    thread renders/builds (by iterating `items`), `workers` threads send through
+    the shared Gmail service (each request on its own pooled connection), and a
+    single thread writes statuses via `mark_sent`. `on_idle` is called by the
+    status thread when no sends completed for a moment (e.g. to flush buffered
+    writes). Returns the number of messages sent. On cancel, queued messages are
+    dropped but every message already sent still gets its status written.
+    """
+    send_q: queue.Queue = queue.Queue(maxsize=workers * 2)
+    status_q: queue.Queue = queue.Queue()
+    lock = threading.Lock()
+    sent = 0
+
+    def sender():
+        nonlocal sent
+        while True:
+            item = send_q.get()
+            if item is None:
+                return
+            rec, to_addr, body = item
+            if not wait_turn(cooldown, limiter, to_addr, stop_event):
+                continue  # cancelled: drain without sending
+            try:
+                send_gmail(gmail_service(creds), body, stop_event=stop_event)  # shared; PooledHttp is thread-safe
+            except Cancelled:
+                continue
+            except Exception as e:
+                log(f"   Error: {e}")
+                continue
+            with lock:
+                sent += 1
+            status_q.put((rec,))
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=workers + 1, thread_name_prefix="rejections") as pool:
+        writer = pool.submit(_write_statuses, status_q, mark_sent, log, on_idle)
+        senders = [pool.submit(sender) for _ in range(workers)]
+        try:
+            for item in items:
+                while not stop_event.is_set():
+                    try:
+                        send_q.put(item, timeout=0.2)
+                        break
+                    except queue.Full:
+                        continue
+                if stop_event.is_set():
+                    log("Cancelled by user.")
+                    break
+        finally:
+            for _ in senders:
+                send_q.put(None)
+            for f in senders:
+                f.result()
+            status_q.put(None)
+            writer.result()
+    return sent
+
+# ---------- Batched sending ----------
+def send_batched(items, *, gsvc, batch_size: int, mark_sent: Callable[[Record], Any],
+                 limiter: TokenBucket, cooldown: DomainCooldown, log: Callable[[str], None],
+                 stop_event, http=None) -> int:
+    """
+    Send `(rec, to_addr, body)` items in Gmail batch requests of `batch_size` calls,
+    mapping each per-item result back to its sheet row. Whole batches are paced: a
+    batch takes one token per message, and with a domain cooldown it holds at most one
+    message per recipient domain, none to a domain still cooling down. Those wait (up
+    to DOMAIN_LOOKAHEAD of them) for a later batch. Returns the number of messages sent.
+    """
+    batch_size = max(1, min(batch_size, GMAIL_BATCH_LIMIT))
+    sent = 0
+    held: collections.deque = collections.deque()  # items whose domain was busy, in sheet order
+    source = iter(items)
+    exhausted = False
+
+    def flush(chunk: List[Tuple[Record, str, dict]]):
+        nonlocal sent
+        results = send_gmail_batch(gsvc, [(rec, body) for rec, _, body in chunk if "media" not in body],
+                                   http=http, stop_event=stop_event)
+        for rec, _, body in chunk:
+            if "media" in body:  # media uploads can't go in a batch request
+                try:
+                    results.append((rec, send_gmail(gsvc, body, stop_event=stop_event), None))
+                except Exception as e:
+                    results.append((rec, None, e))
+        for rec, _, err in results:
+            if isinstance(err, Cancelled):
+                continue  # not sent; "Cancelled by user." is logged once below
+            if err is not None:
+                log(f"   Error (row {rec['_row_number']}, {rec.get('email', '')}): {err}")
+                continue
+            sent += 1
+            try:
+                mark_sent(rec)
+            except Exception as e:
+                log(f"   Error writing status: {e}")
+
+    while not stop_event.is_set():
+        chunk: List[Tuple[Record, str, dict]] = []
+        domains = set()
+
+        def join(item) -> bool:
+            domain = recipient_domain(item[1])
+            if cooldown.cooldown and (domain in domains or cooldown.ready_in(item[1]) > 0):
+                return False
+            chunk.append(item)
+            domains.add(domain)
+            return True
+
+        for _ in range(len(held)):
+            item = held.popleft()
+            if len(chunk) >= batch_size or not join(item):
+                held.append(item)
+        while len(chunk) < batch_size and len(held) < DOMAIN_LOOKAHEAD and not exhausted:
+            item = next(source, None)
+            if item is None:
+                exhausted = True
+            elif not join(item):
+                held.append(item)
+        if not chunk:
+            if not held:
+                return sent
+            # Every item left is for a cooling domain: sleep until the first one frees up
+            stop_event.wait(min(cooldown.ready_in(to_addr) for _, to_addr, _ in held))
+            continue
+        with METRICS.timed("throttle"):
+            if not all(limiter.acquire(stop_event) for _ in chunk):
+                break
+            # Another campaign job may have taken a slot since `join`
+            delay = max(cooldown.reserve(to_addr) for _, to_addr, _ in chunk)
+            if delay > 0 and stop_event.wait(delay):
+                break
+        flush(chunk)
+    log("Cancelled by user.")
+    return sent
+
+# ---------- Sender sharding ----------
+class SenderShard:
+    """
+    One sending account: From address, OAuth token file, its own pace (`limiter`) and
+    daily quota (0 = not tracked). Rate-limit pauses are per account, so one mailbox
+    backing off doesn't stall the others. `used` counts sends in the quota window,
+    earlier runs included.
+    """
+
+    def __init__(self, address: str, token: str = "", limiter: TokenBucket | None = None,
+                 daily_limit: int = 0, used: int = 0, gsvc=None):
+        self.address = address
+        self.token = token
+        self.limiter = limiter or TokenBucket(0)
+        self.breaker = CircuitBreaker(stats=RETRY_STATS)
+        self.daily_limit = max(0, daily_limit)
+        self.used = used
+        self.gsvc = gsvc
+        self.next_at = 0.0     # virtual time of the next assignment, see ShardScheduler
+        self.in_flight = 0     # assigned but not yet sent or failed
+        self.assigned = 0
+        self.sent = 0
+        self.failed = 0
+        self.exhausted = False
+        self.queue: queue.Queue | None = None
+
+    @property
+    def label(self) -> str:
+        return self.address or Path(self.token).name
+
+    def quota_left(self) -> float:
+        if self.exhausted:
+            return 0.0
+        if not self.daily_limit:
+            return float("inf")
+        return max(0.0, self.daily_limit - self.used - self.in_flight)
+
+    def connect(self, credentials: str):
+        """Gmail service for this account's token (unless one was given); fills in a missing address."""
+        if self.gsvc is None:
+            self.gsvc = gmail_service(load_creds(credentials, self.token))
+        if not self.address:
+            profile = _with_backoff(lambda: self.gsvc.users().getProfile(userId="me").execute(),
+                                    call="gmail.profile", breaker=self.breaker)
+            self.address = profile.get("emailAddress", "")
+
+class ShardScheduler:
+    """
+    Picks the sending account for each message. Each account's virtual next-send time
+    moves 1/rate ahead per assignment, so rows are spread in proportion to each account's
+    pace. Ties (e.g. unpaced accounts) go to the shortest backlog, then to the most
+    quota left. Accounts out of daily quota, or retired by a quota error, are skipped.
+    Thread-safe.
+    """
+
+    def __init__(self, shards: Iterable[SenderShard], clock: Callable[[], float] = time.monotonic):
+        self.shards = list(shards)
+        self.clock = clock
+        self._cond = threading.Condition()
+
+    def assign(self) -> SenderShard | None:
+        """Reserve one send on the best account; None when no account has quota left."""
+        with self._cond:
+            now = self.clock()
+            live = [s for s in self.shards if s.quota_left() >= 1]
+            if not live:
+                return None
+            shard = min(live, key=lambda s: (max(now, s.next_at), s.in_flight, -s.quota_left(), s.assigned))
+            if shard.limiter.rate:
+                shard.next_at = max(now, shard.next_at) + 1.0 / shard.limiter.rate
+            shard.in_flight += 1
+            shard.assigned += 1
+            return shard
+
+    def done(self, shard: SenderShard, ok: bool, *, error: bool = False, quota_spent: bool = False):
+        """Settle a reservation from `assign`: sent, failed with `error`, or handed back unsent."""
+        with self._cond:
+            shard.in_flight -= 1
+            if ok:
+                shard.sent += 1
+                shard.used += 1
+            shard.failed += error
+            shard.exhausted = shard.exhausted or quota_spent
+            self._cond.notify_all()
+
+    def wait_idle(self):
+        """Block until every reservation is settled."""
+        with self._cond:
+            self._cond.wait_for(lambda: not any(s.in_flight for s in self.shards))
+
+    def summary(self, planned: bool = False) -> List[str]:
+        lines = []
+        for s in self.shards:
+            left = "" if not s.daily_limit or s.exhausted else f" · {int(s.quota_left())} left today"
+            done = f"{s.assigned} planned" if planned else f"sent {s.sent}" + (f", {s.failed} failed" if s.failed else "")
+            lines.append(f"   {s.label}: {done}{left}{' (quota reached)' if s.exhausted else ''}")
+        return lines
+
+def sender_shards(config: dict, ledger: SendLedger | None = None) -> ShardScheduler | None:
+    """
+    Scheduler for config["senders"] -- a list of {"token", "address", "daily_limit",
+    "rate"/"throttle"/"burst"} dicts, pace defaulting to the run's own -- or None when
+    not sharding. Quota already used is read from `ledger`.
+    """
+    entries = config.get("senders") or []
+    if not entries:
+        return None
+    shards = []
+    for entry in entries:
+        if not entry.get("token"):
+            raise ValueError("Every entry in 'senders' needs a token file.")
+        address = (entry.get("address") or "").strip()
+        shards.append(SenderShard(
+            address, entry["token"], rate_limiter_from_config({**config, **entry}),
+            int(float(entry.get("daily_limit") or 0)),
+            ledger.sent_by(address) if ledger and address else 0,
+        ))
+    return ShardScheduler(shards)
+
+def shard_from(sender: str, address: str) -> str:
+    """From header for a shard's `address`, keeping the display name of the run's Sender."""
+    name = parseaddr(sender or "")[0]
+    return formataddr((name, address)) if name else address
+
+def send_sharded(items, *, sched: ShardScheduler, build: Callable[[Dict[str, Any], str], dict],
+                 mark_sent: Callable[[Record, str], Any], workers: int, cooldown: DomainCooldown,
+                 log: Callable[[str], None], stop_event, on_idle: Callable[[], Any] | None = None) -> int:
+    """
+    Send `(rec, to_addr, fields)` items across several accounts. The calling thread picks
+    an account per item and builds the message with its From address (`build(fields,
+    address)`); `workers` threads per account pace with the account's own limiter and
+    send through its own Gmail service, and one thread writes statuses via
+    `mark_sent(rec, address)`. An account that reports its daily quota spent is retired
+    and its queued messages move to the others (or stay unsent for a later run when
+    none are left). Returns the number of messages sent.
+    """
+    status_q: queue.Queue = queue.Queue()
+    lock = threading.Lock()
+    sent = 0
+    for shard in sched.shards:
+        shard.queue = queue.Queue(maxsize=workers * 2)
+
+    def dispatch(item, shard: SenderShard) -> bool:
+        rec, to_addr, fields = item
+        with METRICS.timed("build_mime"):
+            body = build(fields, shard.address)
+        while not stop_event.is_set():
+            try:
+                shard.queue.put((rec, to_addr, fields, body), timeout=0.2)
+                return True
+            except queue.Full:
+                continue
+        sched.done(shard, ok=False)
+        return False
+
+    def reroute(item):
+        other = sched.assign()
+        if other is None:
+            log(f"   Not sent, no sender quota left: row {item[0]['_row_number']} → {item[1]}")
+            return
+        dispatch(item, other)
+
+    def sender(shard: SenderShard):
+        nonlocal sent
+        while True:
+            item = shard.queue.get()
+            if item is None:
+                return
+            rec, to_addr, fields, body = item
+            if shard.exhausted:
+                sched.done(shard, ok=False)
+                reroute((rec, to_addr, fields))
+                continue
+            if not wait_turn(cooldown, shard.limiter, to_addr, stop_event):
+                sched.done(shard, ok=False)  # cancelled: drain without sending
+                continue
+            try:
+                send_gmail(shard.gsvc, body, breaker=shard.breaker, stop_event=stop_event)
+            except Cancelled:
+                sched.done(shard, ok=False)
+                continue
+            except Exception as e:
+                if classify_error(e) != "quota":
+                    sched.done(shard, ok=False, error=True)
+                    log(f"   Error ({shard.label}): {e}")
+                    continue
+                first = not shard.exhausted
+                sched.done(shard, ok=False, quota_spent=True)
+                if first:
+                    log(f"   {shard.label}: daily sending quota reached; moving its queue to the other account(s).")
+                reroute((rec, to_addr, fields))
+                continue
+            sched.done(shard, ok=True)
+            with lock:
+                sent += 1
+            status_q.put((rec, shard.address))
+
+    from concurrent.futures import ThreadPoolExecutor
+    with ThreadPoolExecutor(max_workers=len(sched.shards) * workers + 1, thread_name_prefix="rejections") as pool:
+        writer = pool.submit(_write_statuses, status_q, mark_sent, log, on_idle)
+        senders = [pool.submit(sender, shard) for shard in sched.shards for _ in range(workers)]
+        try:
+            for item in items:
+                shard = sched.assign()
+                if shard is None:
+                    log("Every sender account has used its daily quota; remaining rows are left for a later run.")
+                    break
+                if not dispatch(item, shard):
+                    log("Cancelled by user.")
+                    break
+        finally:
+            sched.wait_idle()  # rerouted messages included
+            for shard in sched.shards:
+                for _ in range(workers):
+                    shard.queue.put(None)
+            for f in senders:
+                f.result()
+            status_q.put(None)
+            writer.result()
+    return sent
+
+# ---------- Worker ----------
+class SendJob:
+    """
+    One tab's run, in the stages both engines share. `open()` resolves the tab and
+    header row, compiles the templates, opens the ledger, screen and status writer
+    and starts the page reads; `prepared()` streams the eligible rows through the
+    filter and render stages; `mark_sent()` records a send; `finish()` marks
+    recovered sends and logs the summary. Only sending differs: run_sender sends from
+    threads, the async engine from its event loop (with a SheetsBridge as `ssvc`).
+    """
+
+    def __init__(self, config: dict, ssvc, logq, stop_event, campaign: Campaign | None = None):
+        self.config = config
+        self.ssvc = ssvc
+        self.logq = logq
+        self.stop_event = stop_event
+        self.campaign = campaign
+        # Preview limit / test send mode (send only first eligible row to self, prefix subject)
+        preview_n = int(float(config.get("preview_n") or 0))
+        self.test_to_self = bool(config.get("test_to_self"))
+        self.limit = 1 if self.test_to_self else (preview_n if preview_n > 0 else None)
+        self.result: dict | None = None  # what run_sender returns when open() finds nothing to send
+        self.found = 0  # eligible rows seen so far; grows as pages arrive
+        self.processed = 0
+        self.snapshots: SheetSnapshots | None = None
+
+    def log(self, msg: str):
+        self.logq.put(msg)
+
+    def open(self) -> bool:
+        """Prepare the run up to its first eligible row; False (with `result` set) if there is nothing to send."""
+        config, ssvc, campaign, log = self.config, self.ssvc, self.campaign, self.log
+
+        # Resolve sheet & read the header row; data rows are streamed page by page below
+        if campaign:
+            actual_tab = campaign.tab_title(ssvc, config["spreadsheet_id"], config["tab"])
+            log(f"Reading {config['spreadsheet_id']} · tab '{actual_tab}' · range {config['read_range']}")
+            headers_original_case, header_row = campaign.header_row(ssvc, config["spreadsheet_id"], actual_tab,
+                                                                    config["read_range"])
+        else:
+            actual_tab = resolve_tab_title(ssvc, config["spreadsheet_id"], config["tab"])
+            log(f"Reading {config['spreadsheet_id']} · tab '{actual_tab}' · range {config['read_range']}")
+            headers_original_case, header_row = read_header_row(ssvc, config["spreadsheet_id"], actual_tab,
+                                                                config["read_range"])
+        self.actual_tab = actual_tab
+        if not headers_original_case:
+            log(f"No rows found in tab '{actual_tab}' (range {config['read_range']}).")
+            self.result = {"tab": actual_tab, "processed": 0, "sent": 0}
+            return False
+
+        # Ensure logging columns (plus sent_by when sending from several accounts)
+        logging_cols = ["sent_status", "sent_at"] + (["sent_by"] if config.get("senders") else [])
+        headers_after = ensure_columns(headers_original_case, logging_cols, ssvc, config["spreadsheet_id"], actual_tab)
+        hdr_index = {h.lower(): i for i, h in enumerate(headers_after)}  # robust lowercased index
+
+        # Validate required columns
+        required = {"email", "name", "role", "company"}
+        missing = [c for c in required if c not in hdr_index]
+        if missing:
+            log(f"ERROR: Missing required columns in '{actual_tab}': {', '.join(missing)}")
+            return False
+
+        # Compile templates once for the whole run
+        self.templates = TemplateSet(config["subject"], config.get("text_template") or "",
+                                     config.get("html_template") or "",
+                                     int(float(config.get("render_cache_size", 1024) or 0)))
+
+        # Column projection: fetch only required/gate columns plus what the templates use
+        referenced = self.templates.variables()
+        self.keys = None
+        columns = None
+        if referenced is not None:
+            wanted = {"email", "name", "role", "company", "send", "skip", "sent_status"} | referenced
+            self.keys = [h.lower() for h in headers_original_case if h.lower() in wanted]
+            columns = sorted({hdr_index[k] for k in self.keys})
+            log(f"Reading {len(columns)} of {len(headers_original_case)} column(s): "
+                f"{', '.join(dict.fromkeys(self.keys))}")
+        self.headers = headers_original_case
+
+        # Local send ledger: skips windows already sent and recovers lost write-backs
+        ledger = self.ledger = SendLedger(config.get("ledger") or default_ledger_path())
+        ledger_rows = ledger.entries(config["spreadsheet_id"], actual_tab)
+        synced_rows: Dict[int, set] = {}
+        for r, e, at, synced in ledger_rows:
+            if synced:
+                synced_rows.setdefault(r, set()).add(e)
+        self.recovery = LedgerRecovery(ledger_rows, hdr_index["email"])
+        if ledger_rows:
+            log(f"Send ledger: {len(ledger_rows)} earlier send(s) on this tab"
+                f"{f', {len(self.recovery)} not yet marked in the sheet' if self.recovery else ''}.")
+        self.screen = row_screen(config, hdr_index, ledger, actual_tab)
+        # Status write-back is buffered and flushed in batches (and always on exit)
+        self.status = StatusWriter(
+            ssvc, config["spreadsheet_id"], actual_tab,
+            status_col_index=hdr_index["sent_status"], time_col_index=hdr_index["sent_at"],
+            flush_rows=int(float(config.get("status_flush_rows") or 50)),
+            flush_secs=float(config.get("status_flush_secs") or 10.0),
+            log=log,
+            on_flush=lambda rows: ledger.mark_synced(config["spreadsheet_id"], actual_tab, rows),
+            sender_col_index=hdr_index.get("sent_by"),
+            batch_update=campaign.writer(ssvc, config["spreadsheet_id"]) if campaign else None,
+        )
+
+        skip_window = None
+        if "sent_status" in hdr_index and hdr_index["sent_status"] < len(headers_original_case):
+            skip_window = ledger_window_skipper(
+                synced_rows, config["spreadsheet_id"], actual_tab,
+                col_number(split_a1(config["read_range"])[0] or "A"),
+                hdr_index["email"], hdr_index["sent_status"],
+            )
+
+        # Pages are prefetched on a background thread while earlier pages are processed
+        page_rows = int(float(config.get("page_rows") or DEFAULT_PAGE_ROWS))
+        row_count = campaign.row_count(ssvc, config["spreadsheet_id"], actual_tab) if campaign else None
+        self.snapshots = SheetSnapshots(config["snapshots"]) if config.get("snapshots") else None
+        if self.snapshots:
+            # Local snapshot of the tab: later runs read the gate columns, then only rows that
+            # changed or may be sent
+            self.pages = snapshot_pages(
+                self.snapshots, ssvc, config["spreadsheet_id"], actual_tab, config["read_range"],
+                header=headers_after, start_row=header_row + 1, page_rows=page_rows, columns=columns,
+                control={k: hdr_index[k] for k in ("email", "send", "skip", "sent_status") if k in hdr_index},
+                row_count=row_count, log=log,
+                max_age=float(config.get("snapshot_max_age", SNAPSHOT_MAX_AGE) or 0),
+            )
+        else:
+            self.pages = iter_sheet_pages(
+                ssvc, config["spreadsheet_id"], actual_tab, config["read_range"],
+                start_row=header_row + 1, page_rows=page_rows, columns=columns, skip_window=skip_window,
+                row_count=row_count,
+            )
+
+        eligible = self._eligible_records()
+        if self.limit:
+            eligible = itertools.islice(eligible, self.limit)
+        first = next(eligible, None)
+        if first is None:
+            self.pages.close()
+            self._finish_recovered()
+            log_screen(self.screen, config, log)
+            log("No eligible rows to process.")
+            self.result = {"tab": actual_tab, "processed": 0, "sent": 0}
+            return False
+        eligible = itertools.chain([first], eligible)
+        if self.test_to_self:
+            log("Test mode: sending first eligible row to Sender address (Bcc/Cc suppressed).")
+        elif self.limit:
+            log(f"Preview mode: limiting to first {self.limit} row(s).")
+
+        # Interleave domains so the per-domain cooldown doesn't stall the run
+        domain_gap = float(config.get("domain_throttle") or 0.0)
+        if domain_gap > 0 and not (config["dry_run"] or self.test_to_self):
+            lookahead = int(float(config.get("domain_lookahead") or DOMAIN_LOOKAHEAD))
+            eligible = schedule_by_domain(eligible, domain_gap, address=lambda r: r.get("email", ""),
+                                          lookahead=lookahead)
+        self.eligible = eligible
+
+        # Rate limits: token bucket for overall pace, per-domain spacing on top (shared in a campaign)
+        self.limiter = campaign.limiter if campaign else rate_limiter_from_config(config)
+        self.cooldown = campaign.cooldown if campaign else DomainCooldown(domain_gap)
+
+        # Dry runs only render and validate; full messages are built for a few samples
+        self.report = (DryRunReport(config, int(float(config.get("dry_run_mime_samples", 3) or 0)))
+                       if config["dry_run"] else None)
+
+        self.render_processes = int(float(config.get("render_processes") or 0))
+        if self.render_processes > 1:
+            log(f"Rendering in {self.render_processes} worker process(es).")
+        return True
+
+    def _eligible_records(self):
+        for first_row, rows in METRICS.timed_iter(self.pages, "read"):
+            t0 = time.perf_counter()
+            self.recovery.observe(first_row, rows)
+            page = self.recovery.split(self.screen.records(self.headers, rows, first_row, self.keys))
+            METRICS.observe("filter", time.perf_counter() - t0, len(rows))
+            METRICS.count("rows_read", len(rows))
+            METRICS.count("rows_eligible", len(page))
+            self.found += len(page)
+            yield from page
+        page = self.recovery.release()  # rows that turned out not to be an earlier send
+        METRICS.count("rows_eligible", len(page))
+        self.found += len(page)
+        yield from page
+
+    def _total_eligible(self) -> int:
+        return min(self.found, self.limit) if self.limit else self.found
+
+    def prepared(self, build: bool = True):
+        """Render + build MIME for each eligible row; yields (rec, to_addr, body), or fields if not `build`."""
+        config, report, log = self.config, self.report, self.log
+        rendered = render_rows(self.eligible, self.templates, config, self.test_to_self,
+                               processes=self.render_processes,
+                               chunk_size=int(float(config.get("render_chunk") or 64)))
+        for i, (rec, fields, secs) in enumerate(rendered, start=1):
+            self.processed = i
+            METRICS.observe("render", secs)
+            METRICS.maybe_emit()
+            if self.stop_event.is_set():
+                log("Cancelled by user.")
+                rendered.close()
+                return
+
+            problems = report.row(rec, fields, secs) if report else []
+            if fields is None:
+                log(f"   Error: rendered templates are empty; skipping {rec.get('email', '').strip() or '(no email)'}")
+                self.logq.put(f"__PROG__{i}/{self._total_eligible()}")
+                continue
+
+            to_addr = fields["to"]
+            body = None
+            if not build:
+                body = fields
+            elif not report:
+                with METRICS.timed("build_mime"):
+                    body = message_body(fields, config)
+
+            log(f"[{i}/{self._total_eligible()}] {'DRY' if config['dry_run'] else ('TEST' if self.test_to_self else 'SEND')} → {to_addr} | CC: {fields['cc'] or '-'} | BCC: {fields['bcc'] or '-'} | {fields['subject']}")
+            for problem in problems:
+                log(f"   Invalid: {problem}")
+            self.logq.put(f"__PROG__{i}/{self._total_eligible()}")
+            yield rec, to_addr, body
+
+    def mark_sent(self, rec, sender: str = ""):
+        if not self.test_to_self:
+            self.ledger.record(self.config["spreadsheet_id"], self.actual_tab, rec["_row_number"],
+                               rec.get("email", ""), sender=sender)
+            self.status.add(rec["_row_number"], sender=sender)
+
+    def _finish_recovered(self):
+        """Mark rows sent in an earlier run whose sheet write-back was lost; never resend them."""
+        config = self.config
+        recovered = self.recovery.recovered()
+        if config["dry_run"] or self.test_to_self:
+            recovered = []
+        if recovered:
+            self.log(f"Recovered {len(recovered)} earlier send(s) from the ledger; marking them as sent.")
+            self.ledger.rekey(config["spreadsheet_id"], self.actual_tab,
+                              [(old, row, e) for old, row, e, _ in recovered])
+        with self.status:  # also writes whatever the send stage left pending
+            for _, row, _, sent_at in recovered:
+                self.status.add(row, timestamp=sent_at)
+        self.ledger.close()
+        if self.snapshots:
+            self.snapshots.close()
+
+    def finish(self, sent_ok: int, notes: Iterable[str] = ()) -> dict:
+        """Close the reads, mark recovered sends and log the summary (`notes` after the dry-run report)."""
+        config, log = self.config, self.log
+        self.pages.close()
+        self._finish_recovered()
+        log_screen(self.screen, config, log)
+        for line in self.report.summary() if self.report else []:
+            log(line)
+        for line in notes:
+            log(line)
+        if self.templates.cache is not None and self.processed:
+            log(self.templates.cache.summary())
+        for line in METRICS.summary() if self.campaign is None else []:
+            log(line)
+        log(f"Done. Processed {self.processed} eligible rows in this run. {'Sent ' + str(sent_ok) if not config['dry_run'] else 'No emails sent (dry run).' }")
+        if self.campaign is None and (RETRY_STATS.retries or RETRY_STATS.failures):
+            log(RETRY_STATS.summary())
+        return {"tab": self.actual_tab, "processed": self.processed, "sent": sent_ok}
+
+def run_sender(config: dict, logq, stop_event, campaign: Campaign | None = None):
+    """
+    Reads the sheet and (dry-)sends emails. Thread-safe via logq/stop_event. As one
+    job of a `campaign`, its reads, status writes, send budget and sending slot are
+    the campaign's, and run metrics are left to run_campaign. Returns the counts of
+    a completed run.
+    """
+    def log(msg: str):
+        logq.put(msg)
+
+    if campaign is None:
+        start_run_metrics(config, logq, "threaded")
+    try:
+        # Auth (a campaign has authorized already)
+        if campaign is None:
+            log("Authorizing with Google… (browser window may open)")
+        creds = load_creds(config["credentials"], config["token"])
+        ssvc = sheets_service(creds)
+        gsvc = None if config["dry_run"] else gmail_service(creds)
+
+        job = SendJob(config, ssvc, logq, stop_event, campaign)
+        if not job.open():
+            return job.result
+        test_to_self = job.test_to_self
+
+        shards = sender_shards(config, job.ledger)
+        over_quota = 0
+        if shards and not (config["dry_run"] or test_to_self):
+            log(f"Sending from {len(shards.shards)} account(s); connecting…")
+            for shard in shards.shards:
+                shard.connect(config["credentials"])
+                shard.used = job.ledger.sent_by(shard.address) if shard.daily_limit else 0
+
+        workers = max(1, int(float(config.get("workers") or 1)))
+        batch_size = int(float(config.get("batch_size") or 0))
+        sent_ok = 0
+        # In a campaign, wait for a sending slot; this job's first pages are already read
+        with campaign.send_slot() if campaign else contextlib.nullcontext():
+            if config["dry_run"]:
+                for _ in job.prepared():
+                    if shards and shards.assign() is None:
+                        over_quota += 1
+            elif shards and not test_to_self:
+                log(f"Sharded send: {len(shards.shards)} account(s) × {workers} sender thread(s).")
+                with job.status:
+                    sent_ok = send_sharded(
+                        job.prepared(build=False), sched=shards, mark_sent=job.mark_sent, workers=workers,
+                        build=lambda fields, address: message_body(
+                            fields, {**config, "sender": shard_from(config["sender"], address)}),
+                        cooldown=job.cooldown, log=log, stop_event=stop_event, on_idle=job.status.flush_if_due,
+                    )
+            elif batch_size > 1 and not test_to_self:
+                log(f"Batched send: up to {min(batch_size, GMAIL_BATCH_LIMIT)} message(s) per request.")
+                with job.status:
+                    sent_ok = send_batched(
+                        job.prepared(), gsvc=gsvc, batch_size=batch_size, mark_sent=job.mark_sent,
+                        limiter=job.limiter, cooldown=job.cooldown, log=log, stop_event=stop_event,
+                    )
+            elif workers > 1 and not test_to_self:
+                log(f"Pipelined send: {workers} sender thread(s).")
+                with job.status:
+                    sent_ok = send_pipelined(
+                        job.prepared(), creds=creds, mark_sent=job.mark_sent, workers=workers,
+                        limiter=job.limiter, cooldown=job.cooldown, log=log, stop_event=stop_event,
+                        on_idle=job.status.flush_if_due,
+                    )
+            else:
+                with job.status:
+                    for rec, to_addr, body in job.prepared():
+                        if not wait_turn(job.cooldown, job.limiter, to_addr, stop_event):
+                            log("Cancelled by user.")
+                            break
+                        try:
+                            send_gmail(gsvc, body, stop_event=stop_event)
+                        except Cancelled:
+                            log("Cancelled by user.")
+                            break
+                        except Exception as e:
+                            log(f"   Error: {e}")
+                            continue
+                        sent_ok += 1
+                        try:
+                            job.mark_sent(rec)
+                        except Exception as e:
+                            log(f"   Error writing status: {e}")
+
+        notes = []
+        if shards and not test_to_self:
+            notes.append("Sender accounts (planned split):" if config["dry_run"] else "Sender accounts:")
+            notes += shards.summary(planned=config["dry_run"])
+            if over_quota:
+                notes.append(f"   {over_quota} row(s) over the accounts' remaining daily quota would be left "
+                             f"for a later run.")
+        return job.finish(sent_ok, notes)
+    except Exception as e:
+        # Any PermissionError from token writing or other exceptions surface here
+        logq.put(f"FATAL: {e}")
+    finally:
+        if campaign is None:
+            finish_run_metrics(log)
+
+# ---------- Campaigns ----------
+CAMPAIGN_PROGRESS_SECS = 15.0  # how often run_campaign logs per-job progress
+
+class _PooledWrite:
+    def __init__(self):
+        self.data: List[dict] = []
+        self.done = threading.Event()
+        self.error: Exception | None = None
+
+class SheetWritePool:
+    """
+    Coalesces values.batchUpdate calls on one spreadsheet: writes arriving within
+    `linger` seconds of the first go out as one request (e.g. the status flushes of
+    several tabs in a campaign). Each caller blocks until its data is written and
+    gets the request's error, if any. Thread-safe.
+    """
+
+    def __init__(self, ssvc, spreadsheet_id: str, linger: float = 0.25):
+        self.ssvc = ssvc
+        self.spreadsheet_id = spreadsheet_id
+        self.linger = linger
+        self._open: _PooledWrite | None = None
+        self._lock = threading.Lock()
+
+    def __call__(self, data: List[dict]):
+        with self._lock:
+            batch = self._open
+            leader = batch is None
+            if leader:
+                batch = self._open = _PooledWrite()
+            batch.data.extend(data)
+        if leader:
+            time.sleep(self.linger)
+            with self._lock:
+                self._open = None
+            try:
+                _with_backoff(lambda: self.ssvc.spreadsheets().values().batchUpdate(
+                    spreadsheetId=self.spreadsheet_id,
+                    body={"valueInputOption": "RAW", "data": batch.data},
+                ).execute(), call="sheets.values.batchUpdate")
+            except Exception as e:
+                batch.error = e
+            batch.done.set()
+        else:
+            batch.done.wait()
+        if batch.error is not None:
+            raise batch.error
+
+class Campaign:
+    """
+    What the jobs of one run_campaign share: one send budget (token bucket and
+    per-domain cooldown), tab metadata and header rows read once per spreadsheet,
+    status writes pooled per spreadsheet, at most `parallel` jobs sending at a time,
+    and progress per job and in total (as `__PROG__` on `logq`). Thread-safe.
+    """
+
+    def __init__(self, config: dict, logq, parallel: int = 1):
+        self.limiter = rate_limiter_from_config(config)
+        self.cooldown = DomainCooldown(float(config.get("domain_throttle") or 0.0))
+        self.logq = logq
+        self._slots = threading.Semaphore(max(1, parallel))
+        self._props: Dict[str, Dict[str, dict]] = {}  # spreadsheet -> tab title -> properties
+        self._headers: Dict[Tuple[str, str, str], Tuple[List[str], int]] = {}
+        self._writers: Dict[str, SheetWritePool] = {}
+        self._progress: Dict[str, Tuple[int, int]] = {}
+        self._last_report = time.monotonic()
+        self._lock = threading.Lock()
+
+    def tab_props(self, ssvc, spreadsheet_id: str) -> Dict[str, dict]:
+        """Title -> properties (incl. grid size) of every tab, fetched once per spreadsheet."""
+        with self._lock:
+            props = self._props.get(spreadsheet_id)
+        if props is None:
+            meta = _with_backoff(lambda: ssvc.spreadsheets().get(
+                spreadsheetId=spreadsheet_id, fields="sheets.properties(title,gridProperties.rowCount)"
+            ).execute(), call="sheets.get")
+            props = {sh["properties"]["title"]: sh["properties"] for sh in meta.get("sheets", [])}
+            with self._lock:
+                self._props[spreadsheet_id] = props
+        return props
+
+    def tab_title(self, ssvc, spreadsheet_id: str, preferred: str) -> str:
+        """Like resolve_tab_title, but a tab that doesn't exist is an error, not the first tab."""
+        title = pick_tab_title(list(self.tab_props(ssvc, spreadsheet_id)), preferred)
+        if title.lower() != preferred.lower():
+            raise ValueError(f"No tab named '{preferred}' in {spreadsheet_id}.")
+        return title
+
+    def row_count(self, ssvc, spreadsheet_id: str, tab_title: str) -> int:
+        props = self.tab_props(ssvc, spreadsheet_id).get(tab_title, {})
+        return int(props.get("gridProperties", {}).get("rowCount", 0))
+
+    def read_headers(self, ssvc, spreadsheet_id: str, tabs: List[Tuple[str, str]]):
+        """Header rows of several `(tab_title, read_range)` of one spreadsheet, in one values.batchGet."""
+        ranges = []
+        for tab, read_range in tabs:
+            c1, r1, c2, _ = split_a1(read_range)
+            ranges.append(f"{quote_tab(tab)}!{c1}{r1}:{c2}{r1}")
+        resp = _with_backoff(lambda: ssvc.spreadsheets().values().batchGet(
+            spreadsheetId=spreadsheet_id, ranges=ranges
+        ).execute(), call="sheets.values.batchGet")
+        with self._lock:
+            for (tab, read_range), vr in zip(tabs, resp.get("valueRanges", [])):
+                values = vr.get("values", [])
+                self._headers[(spreadsheet_id, tab, read_range)] = (
+                    [str(h).strip() for h in values[0]] if values else [], split_a1(read_range)[1])
+
+    def header_row(self, ssvc, spreadsheet_id: str, tab_title: str, read_range: str) -> Tuple[List[str], int]:
+        """The header row read by read_headers (once), else read_header_row."""
+        with self._lock:
+            hit = self._headers.pop((spreadsheet_id, tab_title, read_range), None)
+        return hit or read_header_row(ssvc, spreadsheet_id, tab_title, read_range)
+
+    def writer(self, ssvc, spreadsheet_id: str) -> SheetWritePool:
+        with self._lock:
+            if spreadsheet_id not in self._writers:
+                self._writers[spreadsheet_id] = SheetWritePool(ssvc, spreadsheet_id)
+            return self._writers[spreadsheet_id]
+
+    def send_slot(self) -> threading.Semaphore:
+        return self._slots
+
+    def progress(self, label: str, done: int, total: int):
+        """Record one job's progress; forwards the campaign total and now and then a per-job line."""
+        with self._lock:
+            self._progress[label] = (done, total)
+            done_all = sum(d for d, _ in self._progress.values())
+            total_all = sum(t for _, t in self._progress.values())
+            report = time.monotonic() - self._last_report >= CAMPAIGN_PROGRESS_SECS
+            if report:
+                self._last_report = time.monotonic()
+                jobs = " · ".join(f"{k} {d}/{t}" for k, (d, t) in self._progress.items() if d < t)
+        self.logq.put(f"__PROG__{done_all}/{total_all}")
+        if report:
+            self.logq.put(f"Campaign progress: {done_all}/{total_all} row(s){f' · {jobs}' if jobs else ''}")
+
+class _JobLog:
+    """logq for one campaign job: labels its lines, counts its errors and routes its progress to the campaign."""
+
+    def __init__(self, campaign: Campaign, label: str):
+        self.campaign = campaign
+        self.label = label
+        self.errors = 0
+
+    def put(self, msg: str):
+        if msg.startswith("__PROG__"):
+            done, total = msg[len("__PROG__"):].split("/")
+            self.campaign.progress(self.label, int(done), int(total))
+            return
+        if msg.startswith(METRICS_PREFIX):
+            return
+        self.errors += is_error_line(msg)
+        self.campaign.logq.put(f"{self.label}{JOB_SEP}{msg}")
+
+def campaign_jobs(config: dict) -> List[Tuple[str, dict]]:
+    """
+    `(label, config)` per entry of config["campaign"]: each entry holds a tab (and
+    optionally spreadsheet_id, read_range, subject, templates, label or any other
+    setting) on top of the run's own settings.
+    """
+    jobs = []
+    seen = set()
+    for n, entry in enumerate(config.get("campaign") or [], start=1):
+        if isinstance(entry, str):
+            entry = {"tab": entry}
+        job = {k: v for k, v in config.items() if k != "campaign"}
+        job.update(entry)
+        if not job.get("tab") or not job.get("spreadsheet_id"):
+            raise ValueError(f"Campaign job {n} needs a tab and a spreadsheet_id.")
+        key = (job["spreadsheet_id"], job["tab"].lower())
+        if key in seen:
+            raise ValueError(f"Campaign job {n} repeats tab '{job['tab']}' of {job['spreadsheet_id']}.")
+        seen.add(key)
+        label = str(entry.get("label") or (job["tab"] if job["spreadsheet_id"] == config.get("spreadsheet_id")
+                                           else f"{job['spreadsheet_id'][:8]}…/{job['tab']}"))
+        if job.get("rejection_report") and "rejection_report" not in entry:
+            report = Path(job["rejection_report"])  # one file per job: rejected-Backend_Q3.csv
+            slug = re.sub(r"[^\w.-]+", "_", label)
+            job["rejection_report"] = str(report.with_stem(f"{report.stem}-{slug}"))
+        jobs.append((label, job))
+    return jobs
+
+def run_campaign(config: dict, logq, stop_event):
+    """
+    Thread target: run the config["campaign"] jobs with the threaded engine, up to
+    `campaign_parallel` of them sending at once on one shared send budget. One more
+    job reads its header and first pages while they send, so it can start right away.
+    """
+    def log(msg: str):
+        logq.put(msg)
+
+    start_run_metrics(config, logq, "campaign")
+    try:
+        jobs = campaign_jobs(config)
+        if not jobs:
+            log("ERROR: The campaign has no jobs.")
+            return
+        parallel = max(1, int(float(config.get("campaign_parallel") or 2)))
+        if config.get("senders") and parallel > 1:
+            parallel = 1  # each job schedules the sender accounts on its own
+            log("Several sender accounts are set; campaign jobs send one at a time.")
+        log(f"Campaign: {len(jobs)} job(s), up to {parallel} sending at a time.")
+        log("Authorizing with Google… (browser window may open)")
+        creds = load_creds(config["credentials"], config["token"])  # once; the jobs reuse it
+        ssvc = sheets_service(creds)
+        campaign = Campaign(config, logq, parallel)
+
+        # Pooled reads: one metadata fetch and one header batchGet per spreadsheet
+        by_sheet: Dict[str, List[Tuple[str, str]]] = {}
+        runnable = []
+        for label, job in jobs:
+            try:
+                title = campaign.tab_title(ssvc, job["spreadsheet_id"], job["tab"])
+            except ValueError as e:
+                log(f"ERROR: {label}: {e}")
+                continue
+            runnable.append((label, job))
+            by_sheet.setdefault(job["spreadsheet_id"], []).append((title, job["read_range"]))
+        for sid, tabs in by_sheet.items():
+            campaign.read_headers(ssvc, sid, tabs)
+
+        results: Dict[str, dict] = {}
+
+        def run_job(label: str, job: dict):
+            if stop_event.is_set():
+                return
+            jl = _JobLog(campaign, label)
+            t0 = time.perf_counter()
+            res = run_sender(job, jl, stop_event, campaign=campaign)
+            results[label] = {**(res or {}), "ok": res is not None and not jl.errors, "errors": jl.errors,
+                              "seconds": time.perf_counter() - t0}
+            log(f"{label}{JOB_SEP}finished in {_fmt_duration(results[label]['seconds'])}.")
+
+        from concurrent.futures import ThreadPoolExecutor
+        with ThreadPoolExecutor(max_workers=parallel + 1, thread_name_prefix="rejections-job") as pool:
+            for f in [pool.submit(run_job, label, job) for label, job in runnable]:
+                f.result()
+
+        log("Campaign summary:")
+        log(f"   {'job':<28} {'eligible':>8} {'sent':>6} {'errors':>6} {'time':>8}")
+        for label, _ in jobs:
+            r = results.get(label)
+            if r is None:
+                log(f"   {label[:28]:<28} {'not run':>8}")
+                continue
+            log(f"   {label[:28]:<28} {r.get('processed', 0):>8} {r.get('sent', 0):>6} {r['errors']:>6} "
+                f"{_fmt_duration(r['seconds']):>8}")
+        for line in METRICS.summary():
+            log(line)
+        processed = sum(r.get("processed", 0) for r in results.values())
+        sent = sum(r.get("sent", 0) for r in results.values())
+        failed = [label for label, r in results.items() if not r["ok"]]
+        log(f"Done. Campaign processed {processed} eligible rows in {len(results)} of {len(jobs)} job(s). "
+            f"{'Sent ' + str(sent) if not config['dry_run'] else 'No emails sent (dry run).'}"
+            f"{f' Jobs with errors: {len(failed)}.' if failed else ''}")
+        if RETRY_STATS.retries or RETRY_STATS.failures:
+            log(RETRY_STATS.summary())
+    except Exception as e:
+        logq.put(f"FATAL: {e}")
+    finally:
+        finish_run_metrics(log)
+
+# ---------- Async engine ----------
+SHEETS_API = "https://sheets.googleapis.com/v4"
+GMAIL_API = "https://gmail.googleapis.com/gmail/v1"
+
+class ApiError(Exception):
+    """Non-retryable HTTP error from the async REST client."""
+
+    def __init__(self, status: int, body: str, headers=None):
+        super().__init__(f"HTTP {status}: {body[:300]}")
+        self.status = status
+        self.body = body
+        self.headers = headers or {}
+
+class AsyncGoogleClient:
+    """
+    Minimal async REST client for the Sheets/Gmail calls the engine makes. Uses one
+    pooled httpx.AsyncClient, the OAuth Credentials from load_creds (refreshed off the
+    event loop when expired) and caps in-flight requests with a semaphore. The base
+    URLs can point at a local stub server for offline runs.
+    """
+
+    def __init__(self, creds, *, max_in_flight: int = 50, sheets_base: str = SHEETS_API,
+                 gmail_base: str = GMAIL_API, retries: int = 5):
+        try:
+            import httpx
+        except ImportError as e:
+            raise SystemExit("The async engine needs httpx: python -m pip install httpx") from e
+        self.creds = creds
+        self.sheets_base = sheets_base.rstrip("/")
+        self.gmail_base = gmail_base.rstrip("/")
+        self.retries = retries
+        import asyncio
+        self._sem = asyncio.Semaphore(max_in_flight)
+        self._http = httpx.AsyncClient(
+            timeout=60.0,
+            limits=httpx.Limits(max_connections=max_in_flight, max_keepalive_connections=max_in_flight),
+        )
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self._http.aclose()
+
+    async def _refresh(self):
+        import asyncio
+        from google.auth.transport.requests import Request
+        await asyncio.to_thread(self.creds.refresh, Request())
+
+    def single_attempt(self) -> "AsyncGoogleClient":
+        """
+        This client (same connections and credentials) making one attempt per call, with
+        no retries, breaker or metrics of its own: for callers that wrap each call in
+        _with_backoff, as SheetsBridge's do.
+        """
+        import copy
+        view = copy.copy(self)
+        view.retries = 0
+        return view
+
+    async def _attempt(self, method: str, url: str, *, params=None, json_body=None,
+                       content: bytes | None = None, content_type: str = "") -> dict:
+        """One request (re-sent once after a token refresh on 401); raises ApiError for HTTP errors."""
+        refreshed = False
+        while True:
+            if not getattr(self.creds, "valid", True):
+                await self._refresh()
+            headers = {"Authorization": f"Bearer {self.creds.token}"}
+            if content is not None:
+                headers["Content-Type"] = content_type
+            async with self._sem:
+                resp = await self._http.request(method, url, params=params, json=json_body,
+                                                content=content, headers=headers)
+            if resp.status_code == 401 and not refreshed and hasattr(self.creds, "refresh"):
+                refreshed = True
+                await self._refresh()
+                continue
+            if resp.status_code < 400:
+                return resp.json() if resp.content else {}
+            raise ApiError(resp.status_code, resp.text, resp.headers)
+
+    async def _request(self, method: str, url: str, *, call: str = "other", params=None, json_body=None,
+                       content: bytes | None = None, content_type: str = "") -> dict:
+        import asyncio
+        if not self.retries:  # single_attempt()
+            return await self._attempt(method, url, params=params, json_body=json_body,
+                                       content=content, content_type=content_type)
+        for attempt in range(self.retries):
+            pause = API_BREAKER.remaining()
+            if pause:
+                await asyncio.sleep(pause)
+                RETRY_STATS.waited(pause)
+            METRICS.count(f"api.{call}")
+            try:
+                result = await self._attempt(method, url, params=params, json_body=json_body,
+                                             content=content, content_type=content_type)
+            except ApiError as err:
+                kind = classify_error(err)
+                RETRY_STATS.failure(kind)
+                if kind in ("permanent", "quota") or attempt == self.retries - 1:
+                    raise
+                RETRY_STATS.retried()
+                if kind == "rate_limit":
+                    API_BREAKER.trip(retry_after_seconds(err))
+                    continue
+                delay = retry_after_seconds(err) or min(8.0, 0.8 * (2 ** attempt)) + random.uniform(0, 0.25)
+            else:
+                API_BREAKER.success()
+                return result
+            await asyncio.sleep(delay)
+            RETRY_STATS.waited(delay)
+
+    def _sheet_url(self, spreadsheet_id: str, suffix: str = "") -> str:
+        return f"{self.sheets_base}/spreadsheets/{urllib.parse.quote(spreadsheet_id, safe='')}{suffix}"
+
+    async def spreadsheet_meta(self, spreadsheet_id: str, fields: str) -> dict:
+        return await self._request("GET", self._sheet_url(spreadsheet_id), call="sheets.get",
+                                   params={"fields": fields})
+
+    async def values_get(self, spreadsheet_id: str, rng: str) -> List[List[str]]:
+        url = self._sheet_url(spreadsheet_id, f"/values/{urllib.parse.quote(rng, safe='')}")
+        return (await self._request("GET", url, call="sheets.values.get")).get("values", [])
+
+    async def values_batch_get(self, spreadsheet_id: str, ranges: List[str]) -> List[List[List[str]]]:
+        url = self._sheet_url(spreadsheet_id, "/values:batchGet")
+        resp = await self._request("GET", url, call="sheets.values.batchGet", params=[("ranges", r) for r in ranges])
+        return [vr.get("values", []) for vr in resp.get("valueRanges", [])]
+
+    async def values_update(self, spreadsheet_id: str, rng: str, values: List[List[str]]) -> dict:
+        url = self._sheet_url(spreadsheet_id, f"/values/{urllib.parse.quote(rng, safe='')}")
+        return await self._request("PUT", url, call="sheets.values.update", params={"valueInputOption": "RAW"},
+                                   json_body={"values": values})
+
+    async def values_batch_update(self, spreadsheet_id: str, data: List[dict]) -> dict:
+        url = self._sheet_url(spreadsheet_id, "/values:batchUpdate")
+        return await self._request("POST", url, call="sheets.values.batchUpdate",
+                                   json_body={"valueInputOption": "RAW", "data": data})
+
+    async def send_message(self, body: dict) -> dict:
+        if "media" in body:
+            upload_base = self.gmail_base.replace("/gmail/v1", "/upload/gmail/v1")
+            return await self._request("POST", f"{upload_base}/users/me/messages/send", call="gmail.send.media",
+                                       params={"uploadType": "media"}, content=body["media"],
+                                       content_type="message/rfc822")
+        return await self._request("POST", f"{self.gmail_base}/users/me/messages/send", call="gmail.send",
+                                   json_body=body)
+
+class _BridgeRequest:
+    """What a SheetsBridge method returns: the call runs on the loop when `execute()` is called."""
+
+    def __init__(self, loop, call: Callable[[], Any]):
+        self.loop = loop
+        self.call = call
+
+    def execute(self, **kwargs):
+        import asyncio
+        return asyncio.run_coroutine_threadsafe(self.call(), self.loop).result()
+
+class SheetsBridge:
+    """
+    Blocking Sheets service shaped like googleapiclient's
+    (`spreadsheets().values().get(...).execute()`) over an AsyncGoogleClient whose
+    event loop runs on another thread. The async engine runs the threaded engine's
+    read and status-write helpers on worker threads with it, while the requests go
+    out on the loop. As with googleapiclient, `execute()` makes one attempt; the
+    helpers' _with_backoff does the retrying.
+    """
+
+    def __init__(self, client: AsyncGoogleClient, loop):
+        self.client = client.single_attempt()
+        self.loop = loop
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return _BridgeValues(self.client, self.loop)
+
+    def get(self, spreadsheetId: str, fields: str = "", **kwargs):
+        return _BridgeRequest(self.loop, lambda: self.client.spreadsheet_meta(spreadsheetId, fields))
+
+class _BridgeValues:
+    def __init__(self, client: AsyncGoogleClient, loop):
+        self.client = client
+        self.loop = loop
+
+    def get(self, spreadsheetId: str, range: str, **kwargs):
+        async def call():
+            return {"values": await self.client.values_get(spreadsheetId, range)}
+        return _BridgeRequest(self.loop, call)
+
+    def batchGet(self, spreadsheetId: str, ranges: List[str], **kwargs):
+        async def call():
+            return {"valueRanges": [{"values": v} for v in await self.client.values_batch_get(spreadsheetId, ranges)]}
+        return _BridgeRequest(self.loop, call)
+
+    def update(self, spreadsheetId: str, range: str, body: dict, **kwargs):
+        return _BridgeRequest(self.loop, lambda: self.client.values_update(spreadsheetId, range, body["values"]))
+
+    def batchUpdate(self, spreadsheetId: str, body: dict, **kwargs):
+        return _BridgeRequest(self.loop, lambda: self.client.values_batch_update(spreadsheetId, body["data"]))
+
+async def run_sender_async(config: dict, logq, stop_event, *, client: AsyncGoogleClient | None = None):
+    """
+    asyncio counterpart of run_sender: the same SendJob stages (reads, gates, ledger,
+    snapshots, rendering, summary and the logq/`__PROG__` protocol) on worker threads,
+    with every Sheets/Gmail call made on the event loop and up to `concurrency` sends
+    (default 20) in flight at once, still paced by the token bucket and domain
+    cooldown. Pass `client` to target another endpoint (e.g. a stub server).
+    """
+    import asyncio
+
+    def log(msg: str):
+        logq.put(msg)
+
+    concurrency = max(1, int(float(config.get("concurrency") or 20)))
+    start_run_metrics(config, logq, "async")
+    try:
+        if client is None:
+            log("Authorizing with Google… (browser window may open)")
+            creds = await asyncio.to_thread(load_creds, config["credentials"], config["token"])
+            client = AsyncGoogleClient(creds, max_in_flight=concurrency + 2)
+        async with client:
+            await _run_async(config, client, concurrency, log, logq, stop_event)
+    except Exception as e:
+        logq.put(f"FATAL: {e}")
+    finally:
+        finish_run_metrics(log)
+
+def run_sender_asyncio(config: dict, logq, stop_event):
+    """
+    Thread target for the GUI: runs run_sender_async on a private event loop. Sending
+    from several accounts (config["senders"]) is done by the threaded engine instead.
+    """
+    if config.get("senders"):
+        logq.put("Several sender accounts are set; using the threaded engine for this run.")
+        return run_sender(config, logq, stop_event)
+    import asyncio
+    asyncio.run(run_sender_async(config, logq, stop_event))
+
+async def _run_async(config: dict, client: AsyncGoogleClient, concurrency: int,
+                     log: Callable[[str], None], logq, stop_event):
+    import asyncio
+    # The read, filter, render and report stages are run_sender's (a SendJob, reading and
+    # writing through a SheetsBridge); they block, so they run on worker threads
+    job = SendJob(config, SheetsBridge(client, asyncio.get_running_loop()), logq, stop_event)
+    if not await asyncio.to_thread(job.open):
+        return job.result
+    send_q: asyncio.Queue = asyncio.Queue(maxsize=concurrency * 2)
+    sent_ok = 0
+
+    async def sender():
+        nonlocal sent_ok
+        while True:
+            item = await send_q.get()
+            if item is None:
+                return
+            rec, to_addr, body = item
+            t0 = time.perf_counter()
+            if not (await job.cooldown.wait_async(to_addr, stop_event)
+                    and await job.limiter.acquire_async(stop_event)):
+                continue
+            t1 = time.perf_counter()
+            METRICS.observe("throttle", t1 - t0)
+            try:
+                await client.send_message(body)
+            except Exception as e:
+                log(f"   Error: {e}")
+                continue
+            finally:
+                METRICS.observe("send", time.perf_counter() - t1)
+            sent_ok += 1
+            METRICS.count("messages_sent")
+            METRICS.count("bytes_sent", message_size(body))
+            try:
+                await asyncio.to_thread(job.mark_sent, rec)
+            except Exception as e:
+                log(f"   Error writing status: {e}")
+
+    senders = [] if config["dry_run"] else [asyncio.create_task(sender()) for _ in range(concurrency)]
+    items = job.prepared()
+    try:
+        try:
+            while True:
+                chunk = await asyncio.to_thread(list, itertools.islice(items, concurrency))
+                if not chunk:
+                    break
+                for item in chunk:
+                    if senders:
+                        await send_q.put(item)
+        finally:
+            for _ in senders:
+                await send_q.put(None)
+            await asyncio.gather(*senders, return_exceptions=True)
+            await asyncio.to_thread(items.close)
+    except BaseException:
+        # As leaving run_sender's `with status:` block: write back what was sent, then re-raise
+        await asyncio.to_thread(job.status.__exit__, *sys.exc_info())
+        raise
+    return await asyncio.to_thread(job.finish, sent_ok)
@@ -0,0 +1,505 @@
+# rejections_fakes.py
+"""
+Offline stand-ins for the Google transports used by rejections_core, so batch
+sends and other API code paths can be exercised without network access.
+"""
+
+import json
+import time
+import base64
+import random
+import itertools
+import threading
+from email import message_from_bytes, message_from_string
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, List
+from urllib.parse import parse_qs, unquote, urlsplit
+
+import httplib2
+from googleapiclient.discovery import build
+from googleapiclient.errors import HttpError
+
+
+class FakeGmailHttp:
+    """
+    httplib2.Http replacement answering Gmail `messages.send`: single calls, media
+    uploads and multipart batch requests. `errors` maps a recipient address to the HTTP
+    status its send should fail with; `latency` is slept once per HTTP round trip.
+    """
+
+    def __init__(self, errors: Dict[str, int] | None = None, latency: float = 0.0):
+        self.errors = dict(errors or {})
+        self.latency = latency
+        self.sent: List[str] = []      # recipients accepted, in order
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def _send_one(self, body, media: bool = False):
+        message = body if media else base64.urlsafe_b64decode(json.loads(body or "{}").get("raw", ""))
+        to = message_from_bytes(message)["To"] or ""
+        status = self.errors.get(to, 200)
+        if status >= 300:
+            reason = "rateLimitExceeded" if status == 429 else "failedPrecondition"
+            return status, {"error": {"code": status, "message": f"fake failure for {to}",
+                                      "errors": [{"reason": reason}]}}
+        with self._lock:
+            self.sent.append(to)
+            msg_id = f"fake-{len(self.sent)}"
+        return 200, {"id": msg_id, "labelIds": ["SENT"]}
+
+    def request(self, uri, method="GET", body=None, headers=None, **kwargs):
+        with self._lock:
+            self.round_trips += 1
+        if self.latency:
+            time.sleep(self.latency)
+        headers = {k.lower(): v for k, v in (headers or {}).items()}
+        if uri.rstrip("/").endswith("/batch"):
+            return self._batch(body, headers["content-type"])
+        status, payload = self._send_one(body, media="uploadType=media" in uri)
+        resp = httplib2.Response({"status": status, "content-type": "application/json; charset=UTF-8"})
+        return resp, json.dumps(payload).encode("utf-8")
+
+    def _batch(self, body, content_type: str):
+        if isinstance(body, bytes):
+            body = body.decode("utf-8")
+        mime = message_from_string(f"content-type: {content_type}\r\n\r\n{body}")
+        boundary = "fake_batch_boundary"
+        out = []
+        for part in mime.get_payload():
+            inner = part.get_payload()
+            sep = "\r\n\r\n" if "\r\n\r\n" in inner else "\n\n"
+            status, payload = self._send_one(inner.split(sep, 1)[1])
+            cid = part["Content-ID"]
+            out.append(
+                f"--{boundary}\r\n"
+                f"Content-Type: application/http\r\n"
+                f"Content-ID: <response-{cid[1:]}\r\n\r\n"
+                f"HTTP/1.1 {status} {'OK' if status < 300 else 'Error'}\r\n"
+                f"Content-Type: application/json; charset=UTF-8\r\n\r\n"
+                f"{json.dumps(payload)}\r\n"
+            )
+        out.append(f"--{boundary}--\r\n")
+        resp = httplib2.Response({"status": 200, "content-type": f"multipart/mixed; boundary={boundary}"})
+        return resp, "".join(out).encode("utf-8")
+
+
+def fake_gmail_service(http: FakeGmailHttp | None = None):
+    """Gmail service built from the bundled discovery document over a fake transport."""
+    return build("gmail", "v1", http=http or FakeGmailHttp(), static_discovery=True)
+
+
+class _Grid:
+    """In-memory A1 reads and writes over `self.values` (header row first)."""
+    values: List[List[str]]
+
+    def _grid(self, rng: str) -> List[List[str]]:
+        """The rows a range refers to (one grid here; FakeSheetsService may hold several tabs)."""
+        return self.values
+
+    def _bounds(self, rng: str):
+        from rejections_core import split_a1, col_number
+        a1 = unquote(rng).split("!", 1)[-1]
+        c1, r1, c2, r2 = split_a1(a1)
+        first_col = col_number(c1) if c1 else 1
+        last_col = col_number(c2) if c2 else 10 ** 6
+        return r1, (r2 or len(self._grid(rng))), first_col, last_col
+
+    def _read(self, rng: str) -> List[List[str]]:
+        r1, r2, c1, c2 = self._bounds(rng)
+        rows = [row[c1 - 1:c2] for row in self._grid(rng)[r1 - 1:r2]]
+        while rows and not rows[-1]:
+            rows.pop()
+        return rows
+
+    def _write(self, rng: str, values: List[List[str]]):
+        r1, _, c1, _ = self._bounds(rng)
+        grid = self._grid(rng)
+        for dr, vals in enumerate(values):
+            while len(grid) < r1 + dr:
+                grid.append([])
+            row = grid[r1 - 1 + dr]
+            for dc, v in enumerate(vals):
+                while len(row) < c1 + dc:
+                    row.append("")
+                row[c1 - 1 + dc] = v
+
+
+class StubGoogleServer(_Grid):
+    """
+    Local HTTP server imitating the Sheets v4 and Gmail v1 REST endpoints the async
+    engine calls, backed by an in-memory grid (`values`, header row first). Use as a
+    context manager and point AsyncGoogleClient at `sheets_base` / `gmail_base`.
+    `errors` maps a recipient address to the HTTP status its send should fail with.
+    """
+
+    def __init__(self, values: List[List[str]], title: str = "Applicants",
+                 errors: Dict[str, int] | None = None, latency: float = 0.0):
+        self.values = [list(r) for r in values]
+        self.title = title
+        self.errors = dict(errors or {})
+        self.latency = latency
+        self.sent: List[str] = []
+        self.requests: List[str] = []
+        self._lock = threading.Lock()
+        self._server = None
+
+    # -- request handling --
+    def handle(self, method: str, path: str, query: Dict[str, List[str]], body: dict):
+        with self._lock:
+            self.requests.append(f"{method} {path}")
+        if self.latency:
+            time.sleep(self.latency)
+        if path.endswith("/users/me/messages/send"):
+            message = body["_message"] if "_message" in body else base64.urlsafe_b64decode(body.get("raw", ""))
+            to = message_from_bytes(message)["To"] or ""
+            status = self.errors.get(to, 200)
+            if status >= 300:
+                return status, {"error": {"code": status, "message": f"fake failure for {to}"}}
+            with self._lock:
+                self.sent.append(to)
+                return 200, {"id": f"stub-{len(self.sent)}"}
+        parts = path.split("/spreadsheets/", 1)[-1].split("/", 1)
+        tail = parts[1] if len(parts) > 1 else ""
+        if method == "GET" and not tail:
+            props = {"title": self.title,
+                     "gridProperties": {"rowCount": len(self.values) + 100, "columnCount": 26}}
+            return 200, {"sheets": [{"properties": props}]}
+        with self._lock:
+            if method == "GET" and tail == "values:batchGet":
+                return 200, {"valueRanges": [{"range": r, "values": self._read(r)} for r in query.get("ranges", [])]}
+            if method == "GET" and tail.startswith("values/"):
+                return 200, {"values": self._read(tail[len("values/"):])}
+            if method == "PUT" and tail.startswith("values/"):
+                self._write(tail[len("values/"):], body.get("values", []))
+                return 200, {}
+            if method == "POST" and tail == "values:batchUpdate":
+                for d in body.get("data", []):
+                    self._write(d["range"], d.get("values", []))
+                return 200, {}
+        return 404, {"error": {"code": 404, "message": f"stub has no route for {method} {path}"}}
+
+    def __enter__(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def _dispatch(self):
+                url = urlsplit(self.path)
+                length = int(self.headers.get("Content-Length") or 0)
+                raw = self.rfile.read(length) if length else b""
+                media = (self.headers.get("Content-Type") or "").startswith("message/")
+                status, payload = stub.handle(self.command, unquote(url.path), parse_qs(url.query),
+                                              {"_message": raw} if media else json.loads(raw or b"{}"))
+                data = json.dumps(payload).encode("utf-8")
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(data)))
+                self.end_headers()
+                self.wfile.write(data)
+
+            do_GET = do_POST = do_PUT = _dispatch
+
+            def log_message(self, *args):
+                pass
+
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self._server.daemon_threads = True
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self._server.shutdown()
+        self._server.server_close()
+
+    @property
+    def sheets_base(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/v4"
+
+    @property
+    def gmail_base(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_port}/gmail/v1"
+
+
+class StubCredentials:
+    """Stands in for google.oauth2 Credentials when talking to StubGoogleServer."""
+    token = "stub-token"
+    valid = True
+
+
+def google_error(status: int, reason: str, retry_after: float | None = None) -> HttpError:
+    """An HttpError shaped like Google's JSON error replies."""
+    headers = {"status": status, "content-type": "application/json; charset=UTF-8"}
+    if retry_after is not None:
+        headers["retry-after"] = str(int(retry_after))
+    content = json.dumps({"error": {"code": status, "message": f"injected {reason}",
+                                    "errors": [{"reason": reason}]}}).encode("utf-8")
+    return HttpError(httplib2.Response(headers), content)
+
+
+class Faults:
+    """
+    Latency and error injection for the in-memory services: every call sleeps
+    `latency` (plus up to `jitter`) seconds, then fails with a 429 rateLimitExceeded
+    with probability `rate_limit_rate` (carrying `retry_after` if set) or with a 500
+    backendError with probability `error_rate`. Seeded, so runs are repeatable.
+    """
+
+    def __init__(self, latency: float = 0.0, jitter: float = 0.0, error_rate: float = 0.0,
+                 rate_limit_rate: float = 0.0, retry_after: float | None = None, seed: int = 0):
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.rate_limit_rate = rate_limit_rate
+        self.retry_after = retry_after
+        self.calls = 0
+        self.injected: Dict[int, int] = {}  # status -> count
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def delay(self):
+        with self._lock:
+            self.calls += 1
+            secs = self.latency + (self._random.uniform(0, self.jitter) if self.jitter else 0.0)
+        if secs:
+            time.sleep(secs)
+
+    def error(self) -> HttpError | None:
+        """An injected failure for one call, or None."""
+        if not (self.error_rate or self.rate_limit_rate):
+            return None
+        with self._lock:
+            roll = self._random.random()
+        if roll < self.rate_limit_rate:
+            status, reason = 429, "rateLimitExceeded"
+        elif roll < self.rate_limit_rate + self.error_rate:
+            status, reason = 500, "backendError"
+        else:
+            return None
+        with self._lock:
+            self.injected[status] = self.injected.get(status, 0) + 1
+        return google_error(status, reason, self.retry_after if status == 429 else None)
+
+    def call(self, fn):
+        self.delay()
+        err = self.error()
+        if err is not None:
+            raise err
+        return fn()
+
+
+class _FakeRequest:
+    """What a discovery method returns: nothing happens until `execute()`."""
+
+    def __init__(self, faults: Faults, fn):
+        self.faults = faults
+        self.fn = fn
+
+    def execute(self, http=None, num_retries: int = 0):
+        return self.faults.call(self.fn)
+
+
+class FakeSheetsService(_Grid):
+    """
+    In-process stand-in for a Sheets v4 service (`spreadsheets().get` and the
+    `values()` get/batchGet/update/batchUpdate calls rejections_core makes), backed by
+    an in-memory grid with no HTTP or JSON in the way. `tabs` adds more tabs
+    (title -> rows) after the first. Thread-safe.
+    """
+
+    def __init__(self, values: List[List[str]], title: str = "Applicants", faults: Faults | None = None,
+                 tabs: Dict[str, List[List[str]]] | None = None):
+        self.values = [list(r) for r in values]
+        self.title = title
+        self.tabs = {title: self.values, **{t: [list(r) for r in rows] for t, rows in (tabs or {}).items()}}
+        self.faults = faults or Faults()
+        self.reads = 0
+        self.writes = 0
+        self._lock = threading.Lock()
+
+    def spreadsheets(self):
+        return _FakeSpreadsheets(self)
+
+    def _meta(self) -> dict:
+        return {"sheets": [{"properties": {"title": t, "gridProperties": {"rowCount": len(rows) + 100, "columnCount": 26}}}
+                           for t, rows in self.tabs.items()]}
+
+    def _grid(self, rng: str) -> List[List[str]]:
+        title = unquote(rng).split("!", 1)[0] if "!" in rng else self.title
+        if len(title) > 1 and title[0] == title[-1] == "'":
+            title = title[1:-1].replace("''", "'")
+        return self.tabs[title]
+
+    def _get(self, rng: str) -> dict:
+        with self._lock:
+            self.reads += 1
+            return {"range": rng, "values": self._read(rng)}
+
+    def _update(self, data: List[dict]) -> dict:
+        with self._lock:
+            self.writes += 1
+            for d in data:
+                self._write(d["range"], d.get("values", []))
+        return {"totalUpdatedCells": sum(len(v) for d in data for v in d.get("values", []))}
+
+
+class _FakeSpreadsheets:
+    def __init__(self, svc: FakeSheetsService):
+        self.svc = svc
+
+    def get(self, spreadsheetId: str, **kwargs):
+        return _FakeRequest(self.svc.faults, self.svc._meta)
+
+    def values(self):
+        return _FakeValues(self.svc)
+
+
+class _FakeValues:
+    def __init__(self, svc: FakeSheetsService):
+        self.svc = svc
+
+    def get(self, spreadsheetId: str, range: str, **kwargs):
+        return _FakeRequest(self.svc.faults, lambda: self.svc._get(range))
+
+    def batchGet(self, spreadsheetId: str, ranges: List[str], **kwargs):
+        return _FakeRequest(self.svc.faults, lambda: {"valueRanges": [self.svc._get(r) for r in ranges]})
+
+    def update(self, spreadsheetId: str, range: str, body: dict, **kwargs):
+        return _FakeRequest(self.svc.faults, lambda: self.svc._update([{"range": range, **body}]))
+
+    def batchUpdate(self, spreadsheetId: str, body: dict, **kwargs):
+        return _FakeRequest(self.svc.faults, lambda: self.svc._update(body.get("data", [])))
+
+
+class FakeGmailService:
+    """
+    In-process stand-in for a Gmail v1 service: `users().messages().send` with a
+    `body` or `media_body`, `users().getProfile`, and `new_batch_http_request` (one
+    `Faults` delay per batch, errors injected per message). Counts what was accepted
+    instead of parsing it. After `daily_limit` messages (0 = no limit) every send fails
+    with a 403 dailyLimitExceeded, as Gmail does once an account's quota is spent.
+    """
+
+    def __init__(self, faults: Faults | None = None, address: str = "me@example.com", daily_limit: int = 0):
+        self.faults = faults or Faults()
+        self.address = address
+        self.daily_limit = daily_limit
+        self.sent = 0
+        self.sent_bytes = 0
+        self.round_trips = 0
+        self._lock = threading.Lock()
+
+    def users(self):
+        return self
+
+    def messages(self):
+        return self
+
+    def getProfile(self, userId: str, **kwargs):
+        return _FakeRequest(self.faults, lambda: {"emailAddress": self.address, "messagesTotal": self.sent})
+
+    def send(self, userId: str, body: dict | None = None, media_body=None, **kwargs):
+        def accept():
+            size = media_body.size() if media_body is not None else len((body or {}).get("raw", "")) * 3 // 4
+            with self._lock:
+                if self.daily_limit and self.sent >= self.daily_limit:
+                    raise google_error(403, "dailyLimitExceeded")
+                self.sent += 1
+                self.sent_bytes += size
+                return {"id": f"fake-{self.sent}", "labelIds": ["SENT"]}
+        return _FakeRequest(self.faults, accept)
+
+    def new_batch_http_request(self, callback=None):
+        return _FakeBatch(self, callback)
+
+
+class _FakeBatch:
+    def __init__(self, svc: FakeGmailService, callback):
+        self.svc = svc
+        self.callback = callback
+        self.requests: List[tuple] = []
+
+    def add(self, request: _FakeRequest, callback=None, request_id: str | None = None):
+        self.requests.append((request_id or str(len(self.requests) + 1), request, callback or self.callback))
+
+    def execute(self, http=None):
+        self.svc.faults.delay()
+        with self.svc._lock:
+            self.svc.round_trips += 1
+        for request_id, request, callback in self.requests:
+            err = self.svc.faults.error()
+            response = None if err is not None else request.fn()
+            if callback:
+                callback(request_id, response, err)
+
+
+# Synthetic applicant sheets, for benchmarks: realistic cell widths and a mix of
+# webmail and company domains.
+_FIRST = ["Ana", "Ben", "Chloé", "Dmitri", "Elif", "Farah", "Grace", "Hiro", "Isabela", "Jamal",
+          "Katarzyna", "Liam", "Mei", "Nikolai", "Olu", "Priya", "Quentin", "Rosa", "Sven", "Thandiwe"]
+_LAST = ["Smith", "García", "Nguyen", "Okafor", "Kowalski", "Haddad", "Fernández-López", "Tanaka",
+         "O'Brien", "Johansson", "Abubakar", "Van der Merwe", "Rossi", "Chen", "Patel", "Müller"]
+_ROLES = ["Backend Engineer", "Senior Frontend Engineer", "Data Analyst", "Product Designer",
+          "Engineering Manager, Platform", "Customer Success Specialist", "Site Reliability Engineer",
+          "Marketing Coordinator", "Staff Machine Learning Engineer", "Recruiter"]
+_STAGES = ["application", "phone screen", "technical interview", "onsite", "final round"]
+_REASONS = ["", "", "we moved forward with candidates whose experience more closely matches the role",
+            "the position has been filled", "the role requires on-site work in Berlin"]
+_WEBMAIL = [("gmail.com", 60), ("outlook.com", 15), ("yahoo.com", 10), ("icloud.com", 5), ("hotmail.com", 4)]
+_EXTRA = ["phone", "linkedin", "location", "source", "recruiter", "notes", "salary_expectation",
+          "notice_period", "portfolio", "referrer", "resume_url", "visa_status", "tags", "score", "owner"]
+_NOTE_WORDS = ("strong communicator solid system design background referred by former colleague "
+               "asked about remote options relocation needed good culture add limited experience with "
+               "distributed systems follow up in spring salary above band").split()
+
+
+def synthetic_sheet(rows: int, *, cols: int = 26, seed: int = 0, webmail_share: float = 0.7,
+                    company_domains: int = 2000, sent_share: float = 0.05,
+                    skip_share: float = 0.02, no_share: float = 0.05) -> List[List[str]]:
+    """
+    Header row plus `rows` applicant rows over `cols` columns (the 11 the app uses, then
+    typical ATS export columns). `webmail_share` of addresses are on the big webmail
+    domains, the rest spread Zipf-like over `company_domains`; the `*_share` arguments
+    set how many rows are already sent, skipped or have send=no.
+    """
+    rnd = random.Random(seed)
+    headers = ["email", "name", "role", "company", "stage", "reason", "application_date",
+               "send", "skip", "sent_status", "sent_at"]
+    headers = (headers + _EXTRA + [f"custom_{i}" for i in range(max(0, cols - len(headers) - len(_EXTRA)))])[:cols]
+    webmail = [d for d, _ in _WEBMAIL]
+    webmail_weights = list(itertools.accumulate(w for _, w in _WEBMAIL))
+    companies = [f"{w}{i}.com" for i, w in enumerate(rnd.choices(["acme", "globex", "initech", "umbrella",
+                                                                    "hooli", "vandelay"], k=company_domains))]
+    company_weights = list(itertools.accumulate(1 / (i + 1) for i in range(company_domains)))
+    extra_cols = len(headers) - 11
+    values = [headers]
+    for r in range(rows):
+        first, last = rnd.choice(_FIRST), rnd.choice(_LAST)
+        if rnd.random() < webmail_share:
+            domain = rnd.choices(webmail, cum_weights=webmail_weights)[0]
+        else:
+            domain = rnd.choices(companies, cum_weights=company_weights)[0]
+        local = f"{first}.{last}{r}".lower().replace(" ", "").replace("'", "")
+        roll = rnd.random()
+        sent = roll < sent_share
+        row = [
+            f"{local}@{domain}", f"{first} {last}", rnd.choice(_ROLES), "Acme Robotics",
+            rnd.choice(_STAGES), rnd.choice(_REASONS), f"2025-{rnd.randint(1, 12):02d}-{rnd.randint(1, 28):02d}",
+            "no" if sent_share <= roll < sent_share + no_share else "yes",
+            "yes" if sent_share + no_share <= roll < sent_share + no_share + skip_share else "",
+            "sent" if sent else "", "2025-09-01T10:00:00+00:00" if sent else "",
+        ]
+        for c in range(extra_cols):
+            name = headers[11 + c]
+            if name == "notes":
+                row.append(" ".join(rnd.choices(_NOTE_WORDS, k=rnd.randint(0, 60))))
+            elif name in ("linkedin", "portfolio", "resume_url"):
+                row.append(f"https://example.com/{name}/{local}")
+            elif name == "phone":
+                row.append(f"+1 555 {rnd.randint(100, 999)} {rnd.randint(1000, 9999)}")
+            elif rnd.random() < 0.6:
+                row.append(rnd.choice(_NOTE_WORDS) + " " + rnd.choice(_NOTE_WORDS))
+            else:
+                row.append("")
+        values.append(row)
+    return values
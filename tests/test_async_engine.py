@@ -0,0 +1,62 @@
+import asyncio
+import queue
+import threading
+from pathlib import Path
+
+import pytest
+
+import rejections_core as rc
+from rejections_fakes import StubCredentials, StubGoogleServer
+
+pytest.importorskip("httpx")
+
+SHEET = [
+    ["email", "name", "role", "company", "send", "sent_status", "sent_at"],
+    ["ana@a.com", "Ana", "Dev", "Co", "yes", "", ""],
+    ["ben@b.com", "Ben", "Dev", "Co", "yes", "sent", "2026-01-05T09:30:00+00:00"],
+    ["cy@c.com", "Cy", "Dev", "Co", "yes", "", ""],
+    ["dee@d.com", "Dee", "Dev", "Co", "no", "", ""],
+    ["eve@a.com", "Eve", "Dev", "Co", "yes", "", ""],
+]
+
+
+def run(srv, config):
+    logq = queue.Queue()
+
+    async def main():
+        client = rc.AsyncGoogleClient(StubCredentials(), max_in_flight=6,
+                                      sheets_base=srv.sheets_base, gmail_base=srv.gmail_base)
+        await rc.run_sender_async(config, logq, threading.Event(), client=client)
+
+    asyncio.run(main())
+    logs = []
+    while not logq.empty():
+        logs.append(logq.get())
+    assert not [line for line in logs if rc.is_error_line(line)], logs
+    return logs
+
+
+def test_async_engine_sends_writes_back_and_resumes(tmp_path):
+    config = {
+        "spreadsheet_id": "S", "tab": "Applicants", "read_range": "A:Z", "dry_run": False,
+        "subject": "Your {{ role }} application", "sender": "me@example.com",
+        "text_template": str(Path(__file__).resolve().parents[1] / "EXAMPLE_TEMPLATE.txt"), "html_template": "",
+        "throttle": 0, "concurrency": 4, "ledger": str(tmp_path / "ledger.sqlite3"),
+    }
+    with StubGoogleServer(SHEET) as srv:
+        logs = run(srv, config)
+        assert sorted(srv.sent) == ["ana@a.com", "cy@c.com", "eve@a.com"]
+        assert any(line.startswith("Done.") and line.endswith("Sent 3") for line in logs)
+        status = {row[0]: row[5] for row in srv.values[1:]}
+        assert status == {"ana@a.com": "sent", "ben@b.com": "sent", "cy@c.com": "sent", "dee@d.com": "",
+                          "eve@a.com": "sent"}
+        assert all(row[6] for row in srv.values[1:] if row[0] != "dee@d.com")
+
+        ledger = rc.SendLedger(config["ledger"])
+        assert sorted((r, e, synced) for r, e, _, synced in ledger.entries("S", "Applicants")) == [
+            (2, "ana@a.com", True), (4, "cy@c.com", True), (6, "eve@a.com", True)]
+        ledger.close()
+
+        logs = run(srv, config)
+        assert len(srv.sent) == 3
+        assert "No eligible rows to process." in logs
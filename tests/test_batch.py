@@ -0,0 +1,117 @@
+import threading
+
+import pytest
+
+import rejections_core as rc
+from rejections_fakes import FakeGmailService, Faults, _FakeBatch, google_error
+
+
+class ScriptedFaults(Faults):
+    """Faults whose per-message errors come from a list, in call order (None = success)."""
+
+    def __init__(self, errors):
+        super().__init__()
+        self.script = list(errors)
+
+    def error(self):
+        return self.script.pop(0) if self.script else None
+
+
+class _CutBatch(_FakeBatch):
+    """Answers the first `answered` messages, then the connection drops."""
+
+    answered = 2
+
+    def execute(self, http=None):
+        self.requests = self.requests[:self.answered]
+        super().execute(http)
+        raise ConnectionResetError("connection reset by peer")
+
+
+class _ThrottledBatch(_FakeBatch):
+    """The whole request is turned away with a 429 once, before any message is processed."""
+
+    def execute(self, http=None):
+        if not self.svc.throttled:
+            self.svc.throttled = True
+            raise google_error(429, "rateLimitExceeded")
+        super().execute(http)
+
+
+@pytest.fixture(autouse=True)
+def quick_breaker(monkeypatch):
+    monkeypatch.setattr(rc, "API_BREAKER", rc.CircuitBreaker(base=0.01))
+
+
+def items(n):
+    return [(k, {"raw": "eA"}) for k in range(n)]
+
+
+def test_batch_resends_only_retryable_failures():
+    gsvc = FakeGmailService(ScriptedFaults([None, google_error(500, "backendError"),
+                                            google_error(400, "invalidArgument"), None]))
+    out = rc.send_gmail_batch(gsvc, items(3), base=0.01)
+    assert [key for key, _, _ in out] == [0, 1, 2]
+    assert out[0][2] is None and out[1][2] is None
+    assert rc.classify_error(out[2][2]) == "permanent"
+    assert gsvc.sent == 2
+    assert gsvc.round_trips == 2  # the follow-up batch carried only message 1
+
+
+def test_batch_interrupted_after_partial_reply_is_not_resent(monkeypatch):
+    gsvc = FakeGmailService()
+    monkeypatch.setattr(gsvc, "new_batch_http_request", lambda callback=None: _CutBatch(gsvc, callback))
+    out = rc.send_gmail_batch(gsvc, items(5), base=0.01)
+    assert gsvc.sent == 2
+    assert gsvc.round_trips == 1
+    assert [err is None for _, _, err in out] == [True, True, False, False, False]
+    assert "may have been sent" in str(out[4][2])
+
+
+def test_batch_rate_limited_before_any_reply_is_retried(monkeypatch):
+    gsvc = FakeGmailService()
+    gsvc.throttled = False
+    monkeypatch.setattr(gsvc, "new_batch_http_request", lambda callback=None: _ThrottledBatch(gsvc, callback))
+    out = rc.send_gmail_batch(gsvc, items(3), base=0.01)
+    assert [err for _, _, err in out] == [None, None, None]
+    assert gsvc.sent == 3
+
+
+def test_batch_rejects_more_than_the_gmail_limit():
+    with pytest.raises(ValueError):
+        rc.send_gmail_batch(FakeGmailService(), items(rc.GMAIL_BATCH_LIMIT + 1))
+
+
+def test_batched_sends_keep_the_domain_gap():
+    gsvc = FakeGmailService()
+    addresses = ["a1@a.com", "a2@a.com", "b1@b.com", "c1@c.com", "a3@a.com", "b2@b.com"]
+    items = [({"_row_number": n, "email": to}, to, {"raw": "eA"}) for n, to in enumerate(addresses, start=2)]
+    marked = []
+    sent = rc.send_batched(items, gsvc=gsvc, batch_size=10, mark_sent=lambda rec: marked.append(
+                               (rec["email"], rc.time.monotonic())),
+                           limiter=rc.TokenBucket(0), cooldown=rc.DomainCooldown(0.2), log=print,
+                           stop_event=threading.Event())
+    assert sent == 6
+    assert gsvc.round_trips == 3  # [a1 b1 c1], [a2 b2], [a3]
+    assert [email for email, _ in marked] == ["a1@a.com", "b1@b.com", "c1@c.com", "a2@a.com", "b2@b.com",
+                                              "a3@a.com"]
+    a_times = [t for email, t in marked if email.endswith("@a.com")]
+    assert all(later - earlier >= 0.19 for earlier, later in zip(a_times, a_times[1:]))
+
+
+def test_cancel_cuts_a_rate_limit_pause_short():
+    breaker = rc.CircuitBreaker()
+    breaker.trip(retry_after=30)
+    stop = threading.Event()
+    threading.Timer(0.1, stop.set).start()
+    gsvc = FakeGmailService()
+    t0 = rc.time.monotonic()
+    with pytest.raises(rc.Cancelled):
+        rc.send_gmail(gsvc, {"raw": "eA"}, breaker=breaker, stop_event=stop)
+    assert rc.time.monotonic() - t0 < 2
+    assert gsvc.sent == 0
+
+    rc.API_BREAKER.trip(retry_after=30)
+    out = rc.send_gmail_batch(gsvc, items(2), stop_event=stop)
+    assert all(isinstance(err, rc.Cancelled) for _, _, err in out)
+    assert gsvc.sent == 0
@@ -0,0 +1,40 @@
+from pathlib import Path
+
+import pytest
+
+from rejections_core import campaign_jobs
+
+BASE = {"spreadsheet_id": "S1", "tab": "Applicants", "subject": "Update", "read_range": "A:Z"}
+
+
+def test_jobs_inherit_settings_and_get_labels(tmp_path):
+    report = tmp_path / "rejected.csv"
+    config = {**BASE, "rejection_report": str(report), "campaign": [
+        "Backend Q3",
+        {"tab": "Frontend", "subject": "FE update"},
+        {"spreadsheet_id": "S2-interns-sheet", "tab": "Interns"},
+        {"tab": "Data", "label": "data team", "rejection_report": str(tmp_path / "data.csv")},
+    ]}
+    jobs = campaign_jobs(config)
+    assert [label for label, _ in jobs] == ["Backend Q3", "Frontend", "S2-inter…/Interns", "data team"]
+    backend, frontend, interns, data = (job for _, job in jobs)
+    assert "campaign" not in backend
+    assert backend["subject"] == "Update" and frontend["subject"] == "FE update"
+    assert interns["spreadsheet_id"] == "S2-interns-sheet" and interns["read_range"] == "A:Z"
+    assert Path(backend["rejection_report"]).name == "rejected-Backend_Q3.csv"
+    assert Path(interns["rejection_report"]).name == "rejected-S2-inter_Interns.csv"
+    assert data["rejection_report"] == str(tmp_path / "data.csv")
+
+
+def test_no_campaign_means_no_jobs():
+    assert campaign_jobs(BASE) == []
+
+
+@pytest.mark.parametrize("entries", [
+    ["Backend", "backend"],                               # same tab twice, any case
+    [{"tab": ""}],                                        # no tab
+    [{"tab": "Backend", "spreadsheet_id": ""}],           # no spreadsheet
+])
+def test_invalid_jobs_are_refused(entries):
+    with pytest.raises(ValueError):
+        campaign_jobs({**BASE, "campaign": entries})
@@ -0,0 +1,79 @@
+from rejections_core import LedgerRecovery, SendLedger
+
+AT = "2026-01-05T09:30:00+00:00"
+
+
+def rec(row, email):
+    return {"_row_number": row, "email": email}
+
+
+def rows_of(*emails):
+    return [[e, "Name", "Role", "Co"] for e in emails]
+
+
+def test_ledger_records_syncs_and_rekeys(tmp_path):
+    ledger = SendLedger(tmp_path / "ledger.sqlite3")
+    ledger.record("S", "T", 2, "Ana@X.com", sent_at=AT)
+    ledger.record("S", "T", 3, "ben@x.com", sent_at=AT)
+    ledger.record("S", "Other", 2, "cy@x.com", sent_at=AT)
+    ledger.mark_synced("S", "T", [3])
+    assert sorted(ledger.entries("S", "T")) == [(2, "ana@x.com", AT, False), (3, "ben@x.com", AT, True)]
+
+    ledger.rekey("S", "T", [(2, 5, "ana@x.com")])
+    assert sorted(ledger.entries("S", "T")) == [(3, "ben@x.com", AT, True), (5, "ana@x.com", AT, False)]
+    assert ledger.entries("S", "Other") == [(2, "cy@x.com", AT, False)]
+    ledger.close()
+
+
+def test_recovery_claims_unsynced_send_on_its_row():
+    recovery = LedgerRecovery([(2, "ana@x.com", AT, False), (3, "ben@x.com", AT, True)], email_col=0)
+    assert len(recovery) == 1  # synced sends need no recovery
+    page = rows_of("ana@x.com", "ben@x.com", "cy@x.com")
+    recovery.observe(2, page)
+    assert recovery.split([rec(2, "ana@x.com"), rec(4, "cy@x.com")]) == [rec(4, "cy@x.com")]
+    assert recovery.release() == []
+    assert recovery.recovered() == [(2, 2, "ana@x.com", AT)]
+
+
+def test_recovery_still_sends_second_row_for_same_email():
+    # Row 4 is the same candidate applying for another role: only row 2 was sent
+    recovery = LedgerRecovery([(2, "ana@x.com", AT, False)], email_col=0)
+    recovery.observe(2, rows_of("ana@x.com", "ben@x.com", "ana@x.com"))
+    out = recovery.split([rec(2, "ana@x.com"), rec(3, "ben@x.com"), rec(4, "ana@x.com")])
+    assert out == [rec(3, "ben@x.com"), rec(4, "ana@x.com")]
+    assert recovery.recovered() == [(2, 2, "ana@x.com", AT)]
+
+
+def test_recovery_follows_rows_moved_by_inserts():
+    # Two rows were inserted above both sends since the last run
+    entries = [(2, "ana@x.com", AT, False), (4, "ana@x.com", AT, False)]
+    recovery = LedgerRecovery(entries, email_col=0)
+    recovery.observe(2, rows_of("new1@x.com", "new2@x.com", "ana@x.com", "ben@x.com", "ana@x.com"))
+    out = recovery.split([rec(2, "new1@x.com"), rec(3, "new2@x.com"), rec(4, "ana@x.com"),
+                          rec(5, "ben@x.com"), rec(6, "ana@x.com")])
+    assert out == [rec(2, "new1@x.com"), rec(3, "new2@x.com"), rec(5, "ben@x.com")]
+    assert recovery.recovered() == [(2, 6, "ana@x.com", AT), (4, 4, "ana@x.com", AT)]
+
+
+def test_recovery_holds_row_until_ledger_row_is_read():
+    # A row above was deleted: the send recorded at row 5 now sits at row 4, on the first page
+    recovery = LedgerRecovery([(5, "ana@x.com", AT, False)], email_col=0)
+    recovery.observe(2, rows_of("ben@x.com", "cy@x.com", "ana@x.com"))
+    assert recovery.split([rec(2, "ben@x.com"), rec(3, "cy@x.com"), rec(4, "ana@x.com")]) == [
+        rec(2, "ben@x.com"), rec(3, "cy@x.com")]
+    recovery.observe(5, rows_of("dee@x.com"))
+    assert recovery.split([rec(5, "dee@x.com")]) == [rec(5, "dee@x.com")]
+    assert recovery.release() == []
+    assert recovery.recovered() == [(5, 4, "ana@x.com", AT)]
+
+
+def test_recovered_moves_rekey_the_ledger(tmp_path):
+    ledger = SendLedger(tmp_path / "ledger.sqlite3")
+    ledger.record("S", "T", 2, "ana@x.com", sent_at=AT)
+    recovery = LedgerRecovery(ledger.entries("S", "T"), email_col=0)
+    recovery.observe(2, rows_of("new@x.com", "ana@x.com"))
+    assert recovery.split([rec(2, "new@x.com"), rec(3, "ana@x.com")]) == [rec(2, "new@x.com")]
+    ledger.rekey("S", "T", [(old, row, e) for old, row, e, _ in recovery.recovered()])
+    ledger.mark_synced("S", "T", [3])
+    assert ledger.entries("S", "T") == [(3, "ana@x.com", AT, True)]
+    ledger.close()
@@ -0,0 +1,74 @@
+import csv
+
+import pytest
+
+import rejections_core as rc
+
+HDR = {"email": 0, "name": 1, "role": 2, "company": 3, "send": 4, "skip": 5, "sent_status": 6}
+
+
+def row(email, status=""):
+    return [email, "Name", "Role", "Co", "yes", "", status]
+
+
+ROWS = [                        # sheet rows 2..7
+    row("ana@x.com", "sent"),
+    row("ben@x.com"),
+    row("ana@x.com"),           # same address as sent row 2
+    row("BEN@x.com"),           # same address as row 3
+    row("cy@x.com"),            # sent from another tab earlier
+    row("not-an-address"),
+]
+PRIOR = {rc.email_key("cy@x.com"): 0}
+
+
+def eligible_rows(screen, rows=ROWS, first_row=2):
+    return [first_row + k for k in screen.page(rows, first_row)]
+
+
+def test_report_lists_repeats_but_sends_them(tmp_path):
+    screen = rc.RowScreen(HDR, prior=PRIOR)
+    assert screen.dedupe == "report"
+    assert eligible_rows(screen) == [3, 4, 5, 6]
+    assert [(r, reason, detail) for r, reason, _, detail in screen.flagged] == [
+        (4, "duplicate", "row 2"), (5, "duplicate", "row 3"), (6, "sent_before", "another tab")]
+    assert screen.counts["invalid"] == 1 and not screen.counts["duplicate"]
+    assert any(line.startswith("   Sent anyway") for line in screen.summary())
+
+    path = tmp_path / "rejected.csv"
+    screen.write_report(path)
+    with open(path, newline="", encoding="utf-8") as f:
+        held = {(r["row"], r["reason"]): r["held"] for r in csv.DictReader(f)}
+    assert held[("4", "duplicate")] == "no"
+    assert held[("7", "invalid")] == "yes"
+
+
+def test_tab_holds_repeats_and_earlier_sends():
+    screen = rc.RowScreen(HDR, dedupe="tab", prior=PRIOR)
+    assert eligible_rows(screen) == [3]
+    assert screen.counts["duplicate"] == 2 and screen.counts["sent_before"] == 1
+    assert not screen.flagged
+
+
+def test_sheet_ignores_earlier_runs_and_spans_pages():
+    screen = rc.RowScreen(HDR, dedupe="sheet", prior=PRIOR)
+    assert eligible_rows(screen, ROWS[:3]) == [3]
+    assert eligible_rows(screen, ROWS[3:], first_row=5) == [6]
+    assert screen.counts["duplicate"] == 2 and not screen.counts["sent_before"]
+
+
+def test_off_keeps_repeats():
+    screen = rc.RowScreen(HDR, dedupe="off", prior=PRIOR)
+    assert eligible_rows(screen) == [3, 4, 5, 6]
+    assert not screen.flagged and not screen.counts["duplicate"]
+
+
+@pytest.mark.parametrize("dedupe, loads_prior", [(None, True), ("tab", True), ("sheet", False), ("off", False)])
+def test_row_screen_uses_ledger_sends_when_needed(tmp_path, dedupe, loads_prior):
+    ledger = rc.SendLedger(tmp_path / "ledger.sqlite3")
+    ledger.record("S", "T", 9, "cy@x.com")
+    ledger.mark_synced("S", "T", [9])
+    screen = rc.row_screen({"spreadsheet_id": "S", "dedupe": dedupe}, HDR, ledger, "T")
+    assert screen.dedupe == (dedupe or "report")
+    assert (screen.prior == {rc.email_key("cy@x.com"): 9}) is loads_prior
+    ledger.close()
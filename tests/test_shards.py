@@ -0,0 +1,92 @@
+import base64
+import queue
+import threading
+from email import message_from_bytes
+from pathlib import Path
+
+import rejections_core as rc
+from rejections_fakes import FakeGmailService, FakeSheetsService
+
+TEMPLATE = str(Path(__file__).resolve().parents[1] / "EXAMPLE_TEMPLATE.txt")
+
+
+class RecordingGmail(FakeGmailService):
+    """Keeps each accepted message's From header."""
+
+    def __init__(self, **kwargs):
+        super().__init__(**kwargs)
+        self.senders = []
+
+    def send(self, userId, body=None, media_body=None, **kwargs):
+        request = super().send(userId, body=body, media_body=media_body, **kwargs)
+        accept = request.fn
+
+        def fn():
+            response = accept()
+            self.senders.append(message_from_bytes(base64.urlsafe_b64decode(body["raw"]))["From"])
+            return response
+        request.fn = fn
+        return request
+
+
+def shard(address, rate=0.0, gsvc=None, daily_limit=0):
+    return rc.SenderShard(address, f"{address}.json", rc.TokenBucket(rate), daily_limit, gsvc=gsvc)
+
+
+def test_rows_are_split_in_proportion_to_pace():
+    fast, slow = shard("fast@x.com", rate=2.0), shard("slow@x.com", rate=1.0)
+    sched = rc.ShardScheduler([fast, slow], clock=lambda: 0.0)
+    for _ in range(30):
+        sched.done(sched.assign(), ok=True)
+    assert (fast.sent, slow.sent) == (20, 10)
+
+
+def test_scheduler_stops_at_the_daily_limit():
+    a, b = shard("a@x.com", daily_limit=2), shard("b@x.com", daily_limit=3)
+    b.used = 1  # sent earlier today
+    sched = rc.ShardScheduler([a, b], clock=lambda: 0.0)
+    picked = [sched.assign() for _ in range(5)]
+    assert picked[-1] is None
+    assert (a.assigned, b.assigned) == (2, 2)
+
+
+def test_spent_quota_moves_the_queue_to_the_other_account():
+    a = shard("a@x.com", gsvc=FakeGmailService(address="a@x.com", daily_limit=3))
+    b = shard("b@x.com", gsvc=FakeGmailService(address="b@x.com"))
+    sched = rc.ShardScheduler([a, b])
+    marked, logs = [], []
+    items = [({"_row_number": n}, f"r{n}@d{n}.com", {}) for n in range(2, 22)]
+    sent = rc.send_sharded(items, sched=sched, build=lambda fields, address: {"raw": "eA"},
+                           mark_sent=lambda rec, address: marked.append((rec["_row_number"], address)),
+                           workers=2, cooldown=rc.DomainCooldown(0), log=logs.append, stop_event=threading.Event())
+    assert sent == 20
+    assert sorted(row for row, _ in marked) == list(range(2, 22))
+    assert sum(address == "a@x.com" for _, address in marked) == 3
+    assert a.exhausted and not b.exhausted
+    assert any("daily sending quota reached" in line for line in logs)
+
+
+def test_sent_by_is_written_back_with_the_display_name_kept(tmp_path, monkeypatch):
+    header = ["email", "name", "role", "company", "send"]
+    ssvc = FakeSheetsService([header] + [[f"p{n}@d{n}.com", f"P{n}", "Dev", "Co", "yes"] for n in range(6)])
+    gmail = {"a.json": RecordingGmail(address="a@x.com"), "b.json": RecordingGmail(address="b@x.com")}
+    monkeypatch.setattr(rc, "load_creds", lambda credentials, token: token)
+    monkeypatch.setattr(rc, "sheets_service", lambda creds: ssvc)
+    monkeypatch.setattr(rc, "gmail_service", lambda creds: gmail.get(creds) or FakeGmailService())
+    config = {
+        "credentials": "", "token": "", "dry_run": False, "spreadsheet_id": "S", "tab": "Applicants",
+        "read_range": "A:Z", "subject": "Your application", "text_template": TEMPLATE, "html_template": "",
+        "sender": "Recruiting Team <me@x.com>", "throttle": 0, "ledger": str(tmp_path / "ledger.sqlite3"),
+        "senders": [{"token": "a.json", "address": "a@x.com"}, {"token": "b.json"}],
+    }
+    rc.run_sender(config, queue.Queue(), threading.Event())
+
+    header = ssvc.values[0]
+    by = header.index("sent_by")
+    assert {row[header.index("sent_status")] for row in ssvc.values[1:]} == {"sent"}
+    assert {row[by] for row in ssvc.values[1:]} == {"a@x.com", "b@x.com"}
+    assert set(gmail["a.json"].senders) == {"Recruiting Team <a@x.com>"}
+    assert set(gmail["b.json"].senders) == {"Recruiting Team <b@x.com>"}
+    ledger = rc.SendLedger(config["ledger"])
+    assert ledger.sent_by("a@x.com") + ledger.sent_by("b@x.com") == 6
+    ledger.close()
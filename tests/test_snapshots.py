@@ -0,0 +1,86 @@
+import rejections_core as rc
+from rejections_fakes import FakeSheetsService
+
+HEADER = ["email", "name", "role", "company", "send", "skip", "sent_status", "sent_at"]
+CONTROL = {"email": 0, "send": 4, "skip": 5, "sent_status": 6}
+
+
+def sheet():
+    return [
+        HEADER,
+        ["ana@x.com", "Anna", "Dev", "Co", "yes", "", "", ""],
+        ["cy@x.com", "Cy", "Dev", "Co", "no", "", "", ""],
+        ["dee@x.com", "Dee", "Dev", "Co", "yes", "yes", "", ""],
+        ["ben@x.com", "Ben", "Dev", "Co", "yes", "", "sent", "2026-01-05T09:30:00+00:00"],
+    ]
+
+
+def read(snapshots, svc, log, row_count=None):
+    pages = rc.snapshot_pages(snapshots, svc, "S", "Applicants", "A:H", header=HEADER, start_row=2,
+                              control=CONTROL, log=log, page_rows=2, row_count=row_count or len(svc.values))
+    return {first + k: row for first, rows in pages for k, row in enumerate(rows)}
+
+
+def test_snapshot_rereads_rows_that_may_be_sent(tmp_path):
+    svc = FakeSheetsService(sheet())
+    snapshots = rc.SheetSnapshots(tmp_path / "snapshots.sqlite3")
+    logs = []
+    first = read(snapshots, svc, logs.append)
+    assert first[2][1] == "Anna" and first[5][0] == "ben@x.com"
+    assert any("Sheet snapshot saved" in line for line in logs)
+
+    svc.values[1][1] = "Ana"                 # typo fixed in a row that is still to send
+    svc.values[2][:2] = ["eve@x.com", "Eve"]  # a different applicant now sits on row 3
+    svc.values[4][1] = "Benjamin"            # edit in a sent row: never emailed, so not re-read
+    logs.clear()
+    second = read(snapshots, svc, logs.append)
+
+    assert second[2][1] == "Ana"
+    assert second[3][:2] == ["eve@x.com", "Eve"]
+    assert second[4][:2] == ["dee@x.com", "Dee"]
+    assert second[5][:2] == ["ben@x.com", "Ben"]
+    assert any("2 row(s) reused, 2 re-read" in line for line in logs)
+    snapshots.close()
+
+
+def test_snapshot_rereads_rows_whose_gates_opened(tmp_path):
+    svc = FakeSheetsService(sheet())
+    snapshots = rc.SheetSnapshots(tmp_path / "snapshots.sqlite3")
+    read(snapshots, svc, lambda msg: None)
+    svc.values[2][1] = "Cyrus"
+    svc.values[2][4] = "yes"  # row 3 is now to be sent: its name must be current
+    svc.values.append(["fay@x.com", "Fay", "Dev", "Co", "yes", "", "", ""])
+    second = read(snapshots, svc, lambda msg: None)
+    assert second[3][1] == "Cyrus"
+    assert second[6][:2] == ["fay@x.com", "Fay"]
+    snapshots.close()
+
+
+def test_stale_snapshot_is_read_in_full(tmp_path):
+    svc = FakeSheetsService(sheet())
+    snapshots = rc.SheetSnapshots(tmp_path / "snapshots.sqlite3")
+    read(snapshots, svc, lambda msg: None)
+    svc.values[4][1] = "Benjamin"
+    logs = []
+    pages = rc.snapshot_pages(snapshots, svc, "S", "Applicants", "A:H", header=HEADER, start_row=2,
+                              control=CONTROL, log=logs.append, page_rows=2, max_age=0)
+    rows = {first + k: row for first, rows in pages for k, row in enumerate(rows)}
+    assert rows[5][1] == "Benjamin"
+    assert not any("reused" in line for line in logs)
+    snapshots.close()
+
+
+def test_reads_stop_at_the_end_of_the_data(tmp_path):
+    svc = FakeSheetsService(sheet())
+    pages = list(rc.iter_sheet_pages(svc, "S", "Applicants", "A:H", start_row=2, page_rows=2,
+                                     prefetch=False, row_count=10_000))
+    assert [first for first, _ in pages] == [2, 4]
+    assert svc.reads == 3  # two pages, then one empty window
+
+    snapshots = rc.SheetSnapshots(tmp_path / "snapshots.sqlite3")
+    read(snapshots, svc, lambda msg: None, row_count=10_000)
+    svc.reads = 0
+    second = read(snapshots, svc, lambda msg: None, row_count=10_000)  # the delta path
+    assert sorted(second) == [2, 3, 4, 5]
+    assert svc.reads <= 4  # probe, re-read, one empty window: not one request per window of the grid
+    snapshots.close()